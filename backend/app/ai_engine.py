@@ -1,12 +1,179 @@
 from __future__ import annotations
 
-import json
-import re
-from typing import Dict, List, Set, Tuple
+import heapq
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
 
-from sqlalchemy.orm import Session
+import numpy as np
 
-from app.models import Counter, Hero, Synergy, TierList, TierListEntry
+from app.metrics import record_heroes_scored
+from app.stage_timing import stage
+
+if TYPE_CHECKING:
+    from app.hero_ratings import RatingTable
+    from app.knowledge import HeroRecord as Hero, KnowledgeSnapshot, TierEntryRecord
+
+
+class KeywordMatcher:
+    """Finds the keywords of a ``{label: [keyword, ...]}`` table in a text.
+
+    The table is compiled once into a scan plan: every distinct keyword is
+    searched at most once per text, and a keyword that contains a shorter one
+    (``heals`` contains ``heal``) is skipped when the shorter one is absent.
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]], extra_keywords: Iterable[str] = ()):
+        self.table = {label: tuple(keywords) for label, keywords in table.items()}
+        keywords = list(dict.fromkeys(
+            [keyword for label_keywords in self.table.values() for keyword in label_keywords] + list(extra_keywords)
+        ))
+
+        plan = []
+        for keyword in sorted(keywords, key=len):
+            contained = [other for other in keywords if other != keyword and other in keyword]
+            plan.append((keyword, max(contained, key=len) if contained else None))
+        self._plan = tuple(plan)
+
+    def find(self, text: str) -> Set[str]:
+        """Return every keyword that occurs in ``text``"""
+        found: Set[str] = set()
+        for keyword, required in self._plan:
+            if required is not None and required not in found:
+                continue
+            if keyword in text:
+                found.add(keyword)
+        return found
+
+    def labels_for(self, found: Set[str]) -> Dict[str, str]:
+        """Map each label with a keyword in ``found`` to its first such keyword"""
+        labels: Dict[str, str] = {}
+        for label, keywords in self.table.items():
+            for keyword in keywords:
+                if keyword in found:
+                    labels[label] = keyword
+                    break
+        return labels
+
+    def match(self, text: str) -> Dict[str, str]:
+        return self.labels_for(self.find(text))
+
+
+# (partner has any of, hero has any of, hero has none of, score, reason template)
+PairRule = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], float, str]
+
+
+def _compile_pair_rules(rules: Tuple[PairRule, ...], trait_bits: Dict[str, int]) -> Tuple[Tuple[int, int, int], ...]:
+    def mask(traits: Tuple[str, ...]) -> int:
+        return sum(trait_bits[trait] for trait in traits)
+
+    return tuple((mask(partner_any), mask(hero_any), mask(hero_none)) for partner_any, hero_any, hero_none, _, _ in rules)
+
+
+def _rule_code_scores(rules: Tuple[PairRule, ...]) -> np.ndarray:
+    """Score of every combination of fired rules, indexed by rule bitmask"""
+    scores = np.zeros(1 << len(rules), dtype=np.float64)
+    for code in range(len(scores)):
+        score = 0.0
+        for bit, rule in enumerate(rules):
+            if code >> bit & 1:
+                score += rule[3]
+        scores[code] = score
+    scores.setflags(write=False)
+    return scores
+
+
+# (selected tier entry or None, tier score including lane bonus, lane label)
+TierSelection = Tuple[Optional["TierEntryRecord"], float, Optional[str]]
+
+
+@dataclass
+class ScoredPool:
+    """Numeric scores for every available hero in one draft state.
+
+    Scores are rounded the way they are reported. Reasons are kept as the
+    role balance and safety rule codes; ``DraftAI._materialize`` turns them
+    into text only for the heroes that are actually returned.
+    """
+
+    team_picks: List[int]
+    enemy_picks: List[int]
+    team_heroes: List["Hero"]
+    enemy_heroes: List["Hero"]
+    role_balance_counts: Dict[str, int]
+    heroes: List["Hero"]
+    tier_selections: List[TierSelection]
+    lane_fits: List[Optional[str]]
+    role_codes: List[int]
+    safety_codes: List[int]
+    overall: List[float]
+    counter: List[float]
+    synergy: List[float]
+    safe: List[float]
+    suggestions: Dict[Tuple[int, bool], Dict] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.heroes)
+
+    def top(self, metric_key: str, n: int) -> List[int]:
+        """Positions of the ``n`` highest scores of a metric, ties kept in pool order"""
+        values = getattr(self, metric_key)
+        return heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+
+    def bottom(self, n: int) -> List[int]:
+        """Positions of the ``n`` least safe heroes, lowest overall score breaking ties"""
+        return heapq.nsmallest(n, range(len(self.heroes)), key=lambda position: (self.safe[position], self.overall[position]))
+
+    def without(self, hero_ids: Set[int]) -> "ScoredPool":
+        """The same pool with some heroes left out, as if they were also banned"""
+        keep = [position for position, hero in enumerate(self.heroes) if hero.id not in hero_ids]
+        return replace(
+            self,
+            heroes=[self.heroes[position] for position in keep],
+            tier_selections=[self.tier_selections[position] for position in keep],
+            lane_fits=[self.lane_fits[position] for position in keep],
+            role_codes=[self.role_codes[position] for position in keep],
+            safety_codes=[self.safety_codes[position] for position in keep],
+            overall=[self.overall[position] for position in keep],
+            counter=[self.counter[position] for position in keep],
+            synergy=[self.synergy[position] for position in keep],
+            safe=[self.safe[position] for position in keep],
+            suggestions={},
+        )
+
+    def team_slots(self, snapshot: "KnowledgeSnapshot") -> np.ndarray:
+        return snapshot.slots_for(hero.id for hero in self.team_heroes)
+
+    def enemy_slots(self, snapshot: "KnowledgeSnapshot") -> np.ndarray:
+        return snapshot.slots_for(hero.id for hero in self.enemy_heroes)
+
+
+# (bans, blue_picks, red_picks, current_team)
+DraftStateArgs = Tuple[List[int], List[int], List[int], str]
+
+
+@dataclass
+class DraftContext:
+    """Team-level inputs of ``DraftAI._score_heroes`` for one draft state.
+
+    ``DraftAI.build_context`` builds it from scratch; a draft session keeps
+    the same aggregates up to date one ban or pick at a time. The score
+    arrays are indexed by snapshot slot: what every hero scores against the
+    enemy picks (counters) or next to the team picks (synergy).
+    """
+
+    team_picks: List[int]
+    enemy_picks: List[int]
+    available_heroes: List["Hero"]
+    team_heroes: List["Hero"]
+    enemy_heroes: List["Hero"]
+    role_balance_counts: Dict[str, int]
+    team_trait_counts: Dict[str, int]
+    enemy_trait_counts: Dict[str, int]
+    team_role_counts: Dict[str, int]
+    counter_scores: np.ndarray
+    skill_counter_scores: np.ndarray
+    synergy_scores: np.ndarray
+    skill_synergy_scores: np.ndarray
 
 
 class DraftAI:
@@ -45,6 +212,28 @@ class DraftAI:
         "support": 0  # Optional, can replace with extra fighter/tank
     }
 
+    # Role balance reason templates, keyed by the code DraftAI._role_balance returns
+    ROLE_BALANCE_REASONS = {
+        1: "Fills needed {role} role",
+        2: "Adds {role} to team composition",
+        3: "Team already has {count} {role}(s)",
+    }
+
+    # (score, reason) in evaluation order; bit i of a safety code is rule i
+    SAFETY_RULES = (
+        (1.2, "Stabilizes your frontline"),
+        (1.0, "Can keep your carry safer"),
+        (0.6, "Reliable blind-pick profile"),
+        (0.5, "Adds dependable control"),
+        (0.4, "Rounds out your {role} slot"),
+        (-1.1, "Unsafe backliner into enemy dive"),
+        (-0.8, "Can get punished by enemy anti-mobility"),
+        (-0.8, "Overloads your draft with another {role}"),
+        (-0.6, "Needs frontline cover first"),
+        (-0.9, "Double marksman is risky here"),
+        (-0.4, "Another mage leaves the draft fragile"),
+    )
+
     TRAIT_KEYWORDS = {
         "crowd_control": ["stun", "immobil", "knock", "airborne", "taunt", "freeze", "suppression", "paraly", "pull", "push", "silence", "slow"],
         "mobility": ["dash", "blink", "leap", "charge", "movement speed", "conceal", "untargetable"],
@@ -58,6 +247,26 @@ class DraftAI:
         "anti_tank": ["max hp", "true damage", "physical defense reduced", "magic defense reduced", "armor reduction", "percent damage"],
     }
 
+    # Ability text checked outside TRAIT_KEYWORDS when deriving traits
+    TEXT_HINTS = ("basic attack", "shield", "heal", "control immunity", "dash")
+
+    ROLE_TRAITS = {
+        "tank": ("frontline", "engage", "crowd_control"),
+        "fighter": ("frontline", "dive", "sustained_damage"),
+        "assassin": ("burst", "mobility", "dive"),
+        "mage": ("burst", "aoe", "backline_carry"),
+        "marksman": ("backline_carry", "sustained_damage"),
+        "support": ("support", "protect"),
+    }
+
+    SECONDARY_ROLE_TRAITS = {
+        "support": ("support", "protect"),
+        "tank": ("frontline", "engage"),
+        "assassin": ("mobility", "dive"),
+        "mage": ("burst",),
+        "marksman": ("backline_carry",),
+    }
+
     SPECIALTY_TRAITS = {
         "crowd control": {"crowd_control", "anti_mobility"},
         "initiator": {"engage", "frontline"},
@@ -73,6 +282,44 @@ class DraftAI:
         "counter-mobility": {"anti_mobility", "crowd_control"},
     }
 
+    TRAIT_MATCHER = KeywordMatcher(TRAIT_KEYWORDS, extra_keywords=TEXT_HINTS)
+    SPECIALTY_MATCHER = KeywordMatcher({phrase: (phrase,) for phrase in SPECIALTY_TRAITS})
+
+    # Bit order of trait masks; append only, cached masks depend on it
+    TRAIT_NAMES = (
+        "crowd_control", "mobility", "anti_mobility", "burst", "aoe", "poke", "sustain", "protect", "engage",
+        "anti_tank", "frontline", "dive", "sustained_damage", "backline_carry", "support", "short_range", "ranged",
+    )
+    TRAIT_BITS = {trait: 1 << bit for bit, trait in enumerate(TRAIT_NAMES)}
+    # The only team trait counts _safety reads
+    SAFETY_TEAM_TRAIT_MASK = TRAIT_BITS["frontline"] | TRAIT_BITS["backline_carry"] | TRAIT_BITS["crowd_control"]
+
+    # Skill-derived pair rules, evaluated on trait masks. The bit of a rule in
+    # the snapshot's pair code tables is its position in the tuple.
+    SKILL_SYNERGY_RULES: Tuple[PairRule, ...] = (
+        (("engage",), ("burst", "aoe", "poke"), (), 0.9, "Can follow {name}'s engage"),
+        (("crowd_control",), ("burst", "aoe", "poke"), (), 0.8, "Can capitalize on {name}'s crowd control"),
+        (("frontline",), ("backline_carry", "poke"), (), 0.7, "Gets cover from {name}'s frontline"),
+        (("support",), ("dive", "backline_carry"), (), 0.6, "Benefits from {name}'s support tools"),
+        (("dive", "backline_carry"), ("support",), (), 0.6, "Supports {name}'s win condition"),
+        (("dive",), ("dive",), (), 0.4, "Can dive together with {name}"),
+    )
+
+    SKILL_COUNTER_RULES: Tuple[PairRule, ...] = (
+        (("mobility",), ("anti_mobility", "crowd_control"), (), 0.9, "Can punish {name}'s mobility"),
+        (("backline_carry",), ("dive", "burst"), (), 0.8, "Can pressure {name}"),
+        (("frontline",), ("anti_tank", "sustained_damage"), (), 0.7, "Has tools into {name}'s frontline"),
+        (("sustain",), ("burst",), (), 0.3, "Can cut through {name}'s sustain windows"),
+        (("anti_mobility",), ("mobility",), (), -0.9, "Risky into {name}'s anti-mobility"),
+        (("crowd_control",), ("dive",), ("protect",), -0.6, "Can get stopped by {name}'s control"),
+        (("dive",), ("backline_carry",), ("frontline", "protect"), -0.7, "Unsafe pick into {name}'s dive"),
+    )
+
+    SKILL_SYNERGY_MASKS = _compile_pair_rules(SKILL_SYNERGY_RULES, TRAIT_BITS)
+    SKILL_COUNTER_MASKS = _compile_pair_rules(SKILL_COUNTER_RULES, TRAIT_BITS)
+    SKILL_SYNERGY_CODE_SCORES = _rule_code_scores(SKILL_SYNERGY_RULES)
+    SKILL_COUNTER_CODE_SCORES = _rule_code_scores(SKILL_COUNTER_RULES)
+
     LANE_PREFERENCES = {
         "tank": ["Roam", "EXP"],
         "fighter": ["EXP", "Gold"],
@@ -90,41 +337,16 @@ class DraftAI:
         "Roam": "roamer",
     }
     
-    def __init__(self, db: Session):
-        self.db = db
-        self._skill_cache: Dict[int, dict] = {}
-        self._trait_cache: Dict[int, Set[str]] = {}
-        self._hero_map: Dict[int, Hero] = {}
-        self._tier_entry_cache: Dict[int, List[TierListEntry]] = {}
+    def __init__(self, snapshot: KnowledgeSnapshot, ratings: Optional[RatingTable] = None):
+        self.snapshot = snapshot
+        self.ratings = ratings
 
     def _get_heroes(self, hero_ids: List[int]) -> List[Hero]:
-        if not hero_ids:
-            return []
-
-        missing_ids = [hero_id for hero_id in hero_ids if hero_id not in self._hero_map]
-        if missing_ids:
-            heroes = self.db.query(Hero).filter(Hero.id.in_(missing_ids)).all()
-            for hero in heroes:
-                self._hero_map[hero.id] = hero
-
-        return [self._hero_map[hero_id] for hero_id in hero_ids if hero_id in self._hero_map]
+        heroes = self.snapshot.heroes
+        return [heroes[hero_id] for hero_id in hero_ids if hero_id in heroes]
 
-    def _parse_skills(self, hero: Hero) -> dict:
-        if hero.id in self._skill_cache:
-            return self._skill_cache[hero.id]
-
-        payload = {}
-        if hero.skills:
-            try:
-                payload = json.loads(hero.skills)
-            except json.JSONDecodeError:
-                payload = {}
-
-        self._skill_cache[hero.id] = payload
-        return payload
-
-    def _hero_text_blob(self, hero: Hero) -> str:
-        payload = self._parse_skills(hero)
+    @staticmethod
+    def _hero_text_blob(hero: Hero, payload: dict) -> str:
         text_parts = [hero.name or "", hero.role or "", hero.secondary_role or "", hero.specialty or "", hero.description or ""]
 
         for ability in payload.get("abilities", []):
@@ -138,125 +360,96 @@ class DraftAI:
         return " ".join(text_parts).lower()
 
     def get_hero_traits(self, hero: Hero) -> Set[str]:
-        if hero.id in self._trait_cache:
-            return self._trait_cache[hero.id]
+        return self.snapshot.traits.get(hero.id, frozenset())
 
-        traits: Set[str] = set()
+    @classmethod
+    def derive_hero_traits(cls, hero: Hero, skills: dict) -> Set[str]:
+        """Derive gameplay traits from a hero's role, specialty and skills payload"""
+        return set(cls.derive_trait_sources(hero, skills))
+
+    @classmethod
+    def derive_trait_sources(cls, hero: Hero, skills: dict) -> Dict[str, str]:
+        """Map each derived trait to the role, specialty phrase or ability keyword that first produced it"""
+        sources: Dict[str, str] = {}
         role = (hero.role or "").lower()
         secondary_role = (hero.secondary_role or "").lower()
         specialty = (hero.specialty or "").lower()
-        text_blob = self._hero_text_blob(hero)
-
-        if role == "tank":
-            traits.update({"frontline", "engage", "crowd_control"})
-        elif role == "fighter":
-            traits.update({"frontline", "dive", "sustained_damage"})
-        elif role == "assassin":
-            traits.update({"burst", "mobility", "dive"})
-        elif role == "mage":
-            traits.update({"burst", "aoe", "backline_carry"})
-        elif role == "marksman":
-            traits.update({"backline_carry", "sustained_damage"})
-        elif role == "support":
-            traits.update({"support", "protect"})
-
-        if secondary_role == "support":
-            traits.update({"support", "protect"})
-        if secondary_role == "tank":
-            traits.update({"frontline", "engage"})
-        if secondary_role == "assassin":
-            traits.update({"mobility", "dive"})
-        if secondary_role == "mage":
-            traits.add("burst")
-        if secondary_role == "marksman":
-            traits.add("backline_carry")
-
-        for phrase, phrase_traits in self.SPECIALTY_TRAITS.items():
-            if phrase in specialty:
-                traits.update(phrase_traits)
-
-        for trait, keywords in self.TRAIT_KEYWORDS.items():
-            if any(keyword in text_blob for keyword in keywords):
-                traits.add(trait)
-
-        if "basic attack" in text_blob or role == "marksman":
-            traits.add("sustained_damage")
+        keywords = cls.TRAIT_MATCHER.find(cls._hero_text_blob(hero, skills))
+
+        def add(traits: Iterable[str], source: str) -> None:
+            for trait in traits:
+                sources.setdefault(trait, source)
+
+        add(cls.ROLE_TRAITS.get(role, ()), f"role:{role}")
+        add(cls.SECONDARY_ROLE_TRAITS.get(secondary_role, ()), f"secondary_role:{secondary_role}")
+
+        for phrase in cls.SPECIALTY_MATCHER.match(specialty):
+            add(sorted(cls.SPECIALTY_TRAITS[phrase]), f"specialty:{phrase}")
+
+        for trait, keyword in cls.TRAIT_MATCHER.labels_for(keywords).items():
+            add((trait,), f"keyword:{keyword}")
+
+        if "basic attack" in keywords:
+            add(("sustained_damage",), "keyword:basic attack")
+        if role == "marksman":
+            add(("sustained_damage",), f"role:{role}")
         if role in {"fighter", "tank", "support"}:
-            traits.add("short_range")
+            add(("short_range",), f"role:{role}")
         if role in {"mage", "marksman"}:
-            traits.add("ranged")
-        if "shield" in text_blob or "heal" in text_blob or "control immunity" in text_blob:
-            traits.add("protect")
-        if "dash" in text_blob and "burst" in traits:
-            traits.add("dive")
-        if "frontline" in traits and "support" in traits:
-            traits.add("protect")
+            add(("ranged",), f"role:{role}")
+        for hint in ("shield", "heal", "control immunity"):
+            if hint in keywords:
+                add(("protect",), f"keyword:{hint}")
+                break
+        if "dash" in keywords and "burst" in sources:
+            add(("dive",), "keyword:dash")
+        if "frontline" in sources and "support" in sources:
+            add(("protect",), "traits:frontline+support")
 
-        self._trait_cache[hero.id] = traits
-        return traits
+        return sources
 
     def _push_reason(self, reason_map: Dict[str, float], reason: str, value: float) -> None:
         current = reason_map.get(reason)
         if current is None or abs(value) > abs(current):
             reason_map[reason] = value
 
-    def _pair_skill_synergy(self, hero: Hero, ally: Hero) -> Tuple[float, Dict[str, float]]:
-        hero_traits = self.get_hero_traits(hero)
-        ally_traits = self.get_hero_traits(ally)
-        score = 0.0
+    @classmethod
+    def trait_mask(cls, traits: Iterable[str]) -> int:
+        mask = 0
+        for trait in traits:
+            mask |= cls.TRAIT_BITS.get(trait, 0)
+        return mask
+
+    @classmethod
+    def traits_from_mask(cls, mask: int) -> FrozenSet[str]:
+        return frozenset(trait for trait, bit in cls.TRAIT_BITS.items() if mask & bit)
+
+    @staticmethod
+    def build_pair_codes(trait_masks: np.ndarray, compiled_rules: Tuple[Tuple[int, int, int], ...]) -> np.ndarray:
+        """N x N table whose [i, j] bits are the pair rules hero slot i fires with partner slot j"""
+        codes = np.zeros((len(trait_masks), len(trait_masks)), dtype=np.uint8)
+        for bit, (partner_any, hero_any, hero_none) in enumerate(compiled_rules):
+            hero_ok = ((trait_masks & hero_any) != 0) & ((trait_masks & hero_none) == 0)
+            partner_ok = (trait_masks & partner_any) != 0
+            codes[np.outer(hero_ok, partner_ok)] |= 1 << bit
+        return codes
+
+    def _pair_rule_reasons(self, code: int, rules: Tuple[PairRule, ...], partner: Hero) -> Dict[str, float]:
         reasons: Dict[str, float] = {}
+        for bit, (_, _, _, value, template) in enumerate(rules):
+            if code >> bit & 1:
+                self._push_reason(reasons, template.format(name=partner.name), value)
+        return reasons
 
-        if "engage" in ally_traits and ({"burst", "aoe", "poke"} & hero_traits):
-            score += 0.9
-            self._push_reason(reasons, f"Can follow {ally.name}'s engage", 0.9)
-        if "crowd_control" in ally_traits and ({"burst", "aoe", "poke"} & hero_traits):
-            score += 0.8
-            self._push_reason(reasons, f"Can capitalize on {ally.name}'s crowd control", 0.8)
-        if "frontline" in ally_traits and ({"backline_carry", "poke"} & hero_traits):
-            score += 0.7
-            self._push_reason(reasons, f"Gets cover from {ally.name}'s frontline", 0.7)
-        if "support" in ally_traits and ({"dive", "backline_carry"} & hero_traits):
-            score += 0.6
-            self._push_reason(reasons, f"Benefits from {ally.name}'s support tools", 0.6)
-        if "support" in hero_traits and ({"dive", "backline_carry"} & ally_traits):
-            score += 0.6
-            self._push_reason(reasons, f"Supports {ally.name}'s win condition", 0.6)
-        if "dive" in hero_traits and "dive" in ally_traits:
-            score += 0.4
-            self._push_reason(reasons, f"Can dive together with {ally.name}", 0.4)
-
-        return score, reasons
+    def _pair_skill_synergy(self, hero: Hero, ally: Hero) -> Tuple[float, Dict[str, float]]:
+        slots = self.snapshot.hero_slots
+        code = int(self.snapshot.skill_synergy_codes[slots[hero.id], slots[ally.id]])
+        return float(self.SKILL_SYNERGY_CODE_SCORES[code]), self._pair_rule_reasons(code, self.SKILL_SYNERGY_RULES, ally)
 
     def _pair_skill_counter(self, hero: Hero, enemy: Hero) -> Tuple[float, Dict[str, float]]:
-        hero_traits = self.get_hero_traits(hero)
-        enemy_traits = self.get_hero_traits(enemy)
-        score = 0.0
-        reasons: Dict[str, float] = {}
-
-        if "mobility" in enemy_traits and ({"anti_mobility", "crowd_control"} & hero_traits):
-            score += 0.9
-            self._push_reason(reasons, f"Can punish {enemy.name}'s mobility", 0.9)
-        if "backline_carry" in enemy_traits and ({"dive", "burst"} & hero_traits):
-            score += 0.8
-            self._push_reason(reasons, f"Can pressure {enemy.name}", 0.8)
-        if "frontline" in enemy_traits and ({"anti_tank", "sustained_damage"} & hero_traits):
-            score += 0.7
-            self._push_reason(reasons, f"Has tools into {enemy.name}'s frontline", 0.7)
-        if "sustain" in enemy_traits and "burst" in hero_traits:
-            score += 0.3
-            self._push_reason(reasons, f"Can cut through {enemy.name}'s sustain windows", 0.3)
-
-        if "anti_mobility" in enemy_traits and "mobility" in hero_traits:
-            score -= 0.9
-            self._push_reason(reasons, f"Risky into {enemy.name}'s anti-mobility", -0.9)
-        if "crowd_control" in enemy_traits and "dive" in hero_traits and "protect" not in hero_traits:
-            score -= 0.6
-            self._push_reason(reasons, f"Can get stopped by {enemy.name}'s control", -0.6)
-        if "dive" in enemy_traits and "backline_carry" in hero_traits and "frontline" not in hero_traits and "protect" not in hero_traits:
-            score -= 0.7
-            self._push_reason(reasons, f"Unsafe pick into {enemy.name}'s dive", -0.7)
-
-        return score, reasons
+        slots = self.snapshot.hero_slots
+        code = int(self.snapshot.skill_counter_codes[slots[hero.id], slots[enemy.id]])
+        return float(self.SKILL_COUNTER_CODE_SCORES[code]), self._pair_rule_reasons(code, self.SKILL_COUNTER_RULES, enemy)
     
     def get_available_heroes(
         self, 
@@ -266,23 +459,32 @@ class DraftAI:
     ) -> List[Hero]:
         """Get heroes that are not banned or picked"""
         unavailable_ids = set(bans + blue_picks + red_picks)
-        heroes = self.db.query(Hero).filter(~Hero.id.in_(unavailable_ids)).all()
-        return heroes
+        return [hero for hero_id, hero in self.snapshot.heroes.items() if hero_id not in unavailable_ids]
     
-    def _get_lane_preferences(self, hero: Hero, team_picks: List[int]) -> List[str]:
-        role = (hero.role or "").lower()
-        preferences = list(self.LANE_PREFERENCES.get(role, []))
+    @classmethod
+    def base_lane_preferences(cls, hero: Hero) -> List[str]:
+        """Lanes a hero can play from its roles, before looking at the rest of the team"""
+        preferences = list(cls.LANE_PREFERENCES.get((hero.role or "").lower(), []))
 
         secondary_role = (hero.secondary_role or "").lower()
-        for lane in self.LANE_PREFERENCES.get(secondary_role, []):
+        for lane in cls.LANE_PREFERENCES.get(secondary_role, []):
             if lane not in preferences:
                 preferences.append(lane)
 
+        return preferences
+
+    def _get_lane_preferences(self, hero: Hero, team_picks: List[int], team_roles: List[str] | None = None) -> List[str]:
+        role = (hero.role or "").lower()
+        preferences = self.snapshot.lane_preferences.get(hero.id)
+        if preferences is None:
+            preferences = self.base_lane_preferences(hero)
+
         if not preferences:
             return []
 
         preferred_lane = preferences[0]
-        team_roles = [picked_hero.role.lower() for picked_hero in self._get_heroes(team_picks) if picked_hero.role]
+        if team_roles is None:
+            team_roles = self._team_roles(self._get_heroes(team_picks))
 
         if role == "marksman" and "marksman" in team_roles:
             preferred_lane = preferences[-1]
@@ -295,33 +497,28 @@ class DraftAI:
         ordered.extend([lane for lane in preferences if lane != preferred_lane])
         return ordered
 
-    def _get_active_tier_entries(self, hero: Hero) -> List[TierListEntry]:
-        if hero.id in self._tier_entry_cache:
-            return self._tier_entry_cache[hero.id]
+    @staticmethod
+    def _team_roles(team_heroes: List[Hero]) -> List[str]:
+        return [picked_hero.role.lower() for picked_hero in team_heroes if picked_hero.role]
 
-        entries = self.db.query(TierListEntry).join(TierList).filter(
-            TierListEntry.hero_id == hero.id,
-            TierList.is_active == True
-        ).all()
-        self._tier_entry_cache[hero.id] = entries
-        return entries
+    def _get_active_tier_entries(self, hero: Hero) -> Tuple[TierEntryRecord, ...]:
+        return self.snapshot.tier_entries.get(hero.id, ())
 
     def get_hero_tier_context(self, hero: Hero, team_picks: List[int] | None = None) -> Dict[str, object]:
-        entries = self._get_active_tier_entries(hero)
         preferred_lanes = self._get_lane_preferences(hero, team_picks or [])
-        preferred_lane_codes = [self.TIER_LIST_LANE_MAP[lane] for lane in preferred_lanes if lane in self.TIER_LIST_LANE_MAP]
+        return self._tier_context(self._select_tier_entry(hero, preferred_lanes))
 
+    def _select_tier_entry(self, hero: Hero, preferred_lanes: List[str]) -> TierSelection:
+        return self.select_tier_entry(self._get_active_tier_entries(hero), preferred_lanes)
+
+    @classmethod
+    def select_tier_entry(cls, entries: Tuple[TierEntryRecord, ...], preferred_lanes: List[str]) -> TierSelection:
+        """Pick the active tier entry that rates a hero, preferring its best lane"""
         if not entries:
-            return {
-                "tier": "C",
-                "score": 2.0,
-                "reasons": [],
-                "lane": None,
-                "notes": None,
-                "version": None,
-            }
+            return None, 2.0, None
 
-        entry_by_lane = {entry.tier_list.lane: entry for entry in entries}
+        preferred_lane_codes = [cls.TIER_LIST_LANE_MAP[lane] for lane in preferred_lanes if lane in cls.TIER_LIST_LANE_MAP]
+        entry_by_lane = {entry.lane: entry for entry in entries}
         selected_entry = None
         lane_bonus = 0.0
         lane_label = None
@@ -335,24 +532,38 @@ class DraftAI:
                 break
 
         if selected_entry is None:
-            selected_entry = max(entries, key=lambda entry: self.TIER_SCORES.get(entry.tier, 2))
+            selected_entry = max(entries, key=lambda entry: cls.TIER_SCORES.get(entry.tier, 2))
             lane_label = next(
-                (label for label, code in self.TIER_LIST_LANE_MAP.items() if code == selected_entry.tier_list.lane),
-                selected_entry.tier_list.lane,
+                (label for label, code in cls.TIER_LIST_LANE_MAP.items() if code == selected_entry.lane),
+                selected_entry.lane,
             )
 
-        base_score = float(self.TIER_SCORES.get(selected_entry.tier, 2))
+        base_score = float(cls.TIER_SCORES.get(selected_entry.tier, 2))
+        return selected_entry, round(base_score + lane_bonus, 2), lane_label
+
+    def _tier_context(self, selection: TierSelection) -> Dict[str, object]:
+        selected_entry, score, lane_label = selection
+        if selected_entry is None:
+            return {
+                "tier": "C",
+                "score": score,
+                "reasons": [],
+                "lane": None,
+                "notes": None,
+                "version": None,
+            }
+
         reasons = [f"Your active {lane_label} tier list rates this hero {selected_entry.tier}-tier"]
         if selected_entry.notes:
             reasons.append(selected_entry.notes.strip())
 
         return {
             "tier": selected_entry.tier,
-            "score": round(base_score + lane_bonus, 2),
+            "score": score,
             "reasons": reasons[:2],
             "lane": lane_label,
             "notes": selected_entry.notes,
-            "version": selected_entry.tier_list.version,
+            "version": selected_entry.version,
         }
 
     def get_hero_tier(self, hero: Hero) -> Tuple[str, float]:
@@ -362,196 +573,215 @@ class DraftAI:
     
     def get_counter_score(self, hero: Hero, enemy_picks: List[int]) -> Tuple[float, List[str]]:
         """Calculate counter score against enemy team"""
-        score = 0
+        slot = self.snapshot.hero_slots[hero.id]
+        score = float(self.snapshot.counter_matrix[slot] @ self.snapshot.pick_mask(enemy_picks))
+        return score, self._counter_reasons(hero, enemy_picks)
+
+    def get_counter_scores(self, heroes: List[Hero], enemy_picks: List[int]) -> np.ndarray:
+        """Counter scores for many heroes from one matrix-vector product against the enemy picks"""
+        scores = self.snapshot.counter_matrix @ self.snapshot.pick_mask(enemy_picks)
+        return scores[self.snapshot.slots_for(hero.id for hero in heroes)]
+
+    def _counter_reasons(self, hero: Hero, enemy_picks: List[int]) -> List[str]:
         reasons = []
-        enemy_heroes = self._get_heroes(enemy_picks)
-        enemy_map = {enemy.id: enemy for enemy in enemy_heroes}
+        if not enemy_picks:
+            return reasons
+
+        enemy_map = {enemy.id: enemy for enemy in self._get_heroes(enemy_picks)}
         
         # Check if this hero counters any enemy picks
-        counters = self.db.query(Counter).filter(
-            Counter.countered_by_id == hero.id,
-            Counter.hero_id.in_(enemy_picks)
-        ).all()
-        
-        for counter in counters:
-            bonus = self.COUNTER_BONUS.get(counter.strength, 1.0)
-            score += bonus
-            countered_hero = enemy_map.get(counter.hero_id)
+        for countered_id, strength in self.snapshot.counters.get(hero.id, ()):
+            countered_hero = enemy_map.get(countered_id)
             if countered_hero:
-                reasons.append(f"Counters {countered_hero.name} ({counter.strength})")
+                reasons.append(f"Counters {countered_hero.name} ({strength})")
         
         # Check if enemy picks counter this hero (negative)
-        countered_by = self.db.query(Counter).filter(
-            Counter.hero_id == hero.id,
-            Counter.countered_by_id.in_(enemy_picks)
-        ).all()
-        
-        for counter in countered_by:
-            penalty = self.COUNTER_BONUS.get(counter.strength, 1.0) * 0.5
-            score -= penalty
-            counter_hero = enemy_map.get(counter.countered_by_id)
+        for counter_id, strength in self.snapshot.countered_by.get(hero.id, ()):
+            counter_hero = enemy_map.get(counter_id)
             if counter_hero:
-                reasons.append(f"Countered by {counter_hero.name} ({counter.strength})")
+                reasons.append(f"Countered by {counter_hero.name} ({strength})")
         
-        return score, reasons
+        return reasons
     
     def get_synergy_score(self, hero: Hero, team_picks: List[int]) -> Tuple[float, List[str]]:
         """Calculate synergy score with team"""
-        score = 0
+        slot = self.snapshot.hero_slots[hero.id]
+        score = float(self.snapshot.synergy_matrix[slot] @ self.snapshot.pick_mask(team_picks))
+        return score, self._synergy_reasons(hero, team_picks)
+
+    def get_synergy_scores(self, heroes: List[Hero], team_picks: List[int]) -> np.ndarray:
+        """Synergy scores for many heroes from one matrix-vector product against the team picks"""
+        scores = self.snapshot.synergy_matrix @ self.snapshot.pick_mask(team_picks)
+        return scores[self.snapshot.slots_for(hero.id for hero in heroes)]
+
+    def _synergy_reasons(self, hero: Hero, team_picks: List[int]) -> List[str]:
         reasons = []
-        
         if not team_picks:
-            return score, reasons
+            return reasons
 
-        team_heroes = self._get_heroes(team_picks)
-        team_map = {ally.id: ally for ally in team_heroes}
+        team_map = {ally.id: ally for ally in self._get_heroes(team_picks)}
         
         # Check synergies with team picks
-        synergies = self.db.query(Synergy).filter(
-            ((Synergy.hero_1_id == hero.id) & (Synergy.hero_2_id.in_(team_picks))) |
-            ((Synergy.hero_2_id == hero.id) & (Synergy.hero_1_id.in_(team_picks)))
-        ).all()
-        
-        for synergy in synergies:
-            bonus = self.SYNERGY_BONUS.get(synergy.strength, 0.5)
-            score += bonus
-            
-            # Find the teammate
-            teammate_id = synergy.hero_2_id if synergy.hero_1_id == hero.id else synergy.hero_1_id
+        for teammate_id, strength in self.snapshot.synergies.get(hero.id, ()):
             teammate = team_map.get(teammate_id)
             if teammate:
-                reasons.append(f"Synergy with {teammate.name} ({synergy.strength})")
+                reasons.append(f"Synergy with {teammate.name} ({strength})")
         
-        return score, reasons
+        return reasons
 
     def get_skill_counter_score(self, hero: Hero, enemy_picks: List[int]) -> Tuple[float, List[str]]:
-        score = 0.0
-        reason_scores: Dict[str, float] = {}
+        enemies = self._get_heroes(enemy_picks)
+        codes = self.snapshot.skill_counter_codes[self.snapshot.hero_slots[hero.id], self.snapshot.slots_for(enemy.id for enemy in enemies)]
+        score = float(self.SKILL_COUNTER_CODE_SCORES[codes].sum())
+        return score, self._skill_reasons(codes, enemies, self.SKILL_COUNTER_RULES)
 
-        for enemy in self._get_heroes(enemy_picks):
-            pair_score, pair_reasons = self._pair_skill_counter(hero, enemy)
-            score += pair_score
-            for reason, value in pair_reasons.items():
-                self._push_reason(reason_scores, reason, value)
-
-        ordered = sorted(reason_scores.items(), key=lambda item: abs(item[1]), reverse=True)
-        return score, [reason for reason, _ in ordered[:3]]
+    def get_skill_counter_scores(self, heroes: List[Hero], enemy_picks: List[int]) -> np.ndarray:
+        return self._skill_scores(self.snapshot.skill_counter_codes, self.SKILL_COUNTER_CODE_SCORES, heroes, enemy_picks)
 
     def get_skill_synergy_score(self, hero: Hero, team_picks: List[int]) -> Tuple[float, List[str]]:
-        score = 0.0
-        reason_scores: Dict[str, float] = {}
+        allies = self._get_heroes(team_picks)
+        codes = self.snapshot.skill_synergy_codes[self.snapshot.hero_slots[hero.id], self.snapshot.slots_for(ally.id for ally in allies)]
+        score = float(self.SKILL_SYNERGY_CODE_SCORES[codes].sum())
+        return score, self._skill_reasons(codes, allies, self.SKILL_SYNERGY_RULES)
 
-        for ally in self._get_heroes(team_picks):
-            pair_score, pair_reasons = self._pair_skill_synergy(hero, ally)
-            score += pair_score
-            for reason, value in pair_reasons.items():
+    def get_skill_synergy_scores(self, heroes: List[Hero], team_picks: List[int]) -> np.ndarray:
+        return self._skill_scores(self.snapshot.skill_synergy_codes, self.SKILL_SYNERGY_CODE_SCORES, heroes, team_picks)
+
+    def _skill_scores(self, code_table: np.ndarray, code_scores: np.ndarray, heroes: List[Hero], partner_picks: List[int]) -> np.ndarray:
+        """Sum the pair rule scores of every hero against the partner picks"""
+        hero_slots = self.snapshot.slots_for(hero.id for hero in heroes)
+        partner_slots = self.snapshot.slots_for(partner.id for partner in self._get_heroes(partner_picks))
+        return code_scores[code_table[np.ix_(hero_slots, partner_slots)]].sum(axis=1)
+
+    def _skill_reasons(self, codes: np.ndarray, partners: List[Hero], rules: Tuple[PairRule, ...]) -> List[str]:
+        reason_scores: Dict[str, float] = {}
+        for partner, code in zip(partners, codes.tolist()):
+            for reason, value in self._pair_rule_reasons(code, rules, partner).items():
                 self._push_reason(reason_scores, reason, value)
 
         ordered = sorted(reason_scores.items(), key=lambda item: abs(item[1]), reverse=True)
-        return score, [reason for reason, _ in ordered[:3]]
+        return [reason for reason, _ in ordered[:3]]
     
     def get_role_balance_score(self, hero: Hero, team_picks: List[int]) -> Tuple[float, List[str]]:
         """Calculate role balance score"""
-        score = 0
-        reasons = []
-        
-        # Count current team roles
-        team_heroes = self.db.query(Hero).filter(Hero.id.in_(team_picks)).all() if team_picks else []
+        role_counts = self._role_balance_counts(self._get_heroes(sorted(set(team_picks))))
+        score, code = self._role_balance(hero, role_counts)
+        return score, self._role_balance_reasons(hero, role_counts, code)
+
+    def _role_balance_counts(self, team_heroes: List[Hero]) -> Dict[str, int]:
         role_counts = {role: 0 for role in self.IDEAL_ROLES.keys()}
-        
         for h in team_heroes:
             if h.role in role_counts:
                 role_counts[h.role] += 1
-        
+        return role_counts
+
+    def _role_balance(self, hero: Hero, role_counts: Dict[str, int]) -> Tuple[float, int]:
+        """Role balance score and the ROLE_BALANCE_REASONS code that produced it (0 for none)"""
         hero_role = hero.role.lower() if hero.role else "fighter"
-        
+
         # Check if this role is needed
         current_count = role_counts.get(hero_role, 0)
         ideal_count = self.IDEAL_ROLES.get(hero_role, 0)
-        
+
         if current_count < ideal_count:
-            score += 1.5
-            reasons.append(f"Fills needed {hero_role} role")
-        elif current_count == 0 and hero_role in ["tank", "marksman", "mage"]:
-            score += 1.0
-            reasons.append(f"Adds {hero_role} to team composition")
-        elif current_count >= 2:
-            score -= 0.5
-            reasons.append(f"Team already has {current_count} {hero_role}(s)")
-        
-        return score, reasons
+            return 1.5, 1
+        if current_count == 0 and hero_role in ["tank", "marksman", "mage"]:
+            return 1.0, 2
+        if current_count >= 2:
+            return -0.5, 3
+        return 0.0, 0
+
+    def _role_balance_reasons(self, hero: Hero, role_counts: Dict[str, int], code: int) -> List[str]:
+        if not code:
+            return []
+        hero_role = hero.role.lower() if hero.role else "fighter"
+        return [self.ROLE_BALANCE_REASONS[code].format(role=hero_role, count=role_counts.get(hero_role, 0))]
 
     def get_lane_fit(self, hero: Hero, team_picks: List[int]) -> str | None:
         preferences = self._get_lane_preferences(hero, team_picks)
         return preferences[0] if preferences else None
 
     def get_safety_score(self, hero: Hero, team_picks: List[int], enemy_picks: List[int]) -> Tuple[float, List[str], List[str]]:
-        hero_traits = self.get_hero_traits(hero)
         team_heroes = self._get_heroes(team_picks)
-        enemy_heroes = self._get_heroes(enemy_picks)
-        team_trait_counts: Dict[str, int] = {}
-        enemy_trait_counts: Dict[str, int] = {}
-
-        for picked_hero in team_heroes:
-            for trait in self.get_hero_traits(picked_hero):
-                team_trait_counts[trait] = team_trait_counts.get(trait, 0) + 1
+        score, code = self._safety(
+            hero,
+            self._trait_counts(team_heroes),
+            self._trait_counts(self._get_heroes(enemy_picks)),
+            self._role_counts(team_heroes),
+        )
+        positive_reasons, negative_reasons = self._safety_reasons(hero, code)
+        return score, positive_reasons, negative_reasons
 
-        for picked_hero in enemy_heroes:
+    def _trait_counts(self, heroes: List[Hero]) -> Dict[str, int]:
+        trait_counts: Dict[str, int] = {}
+        for picked_hero in heroes:
             for trait in self.get_hero_traits(picked_hero):
-                enemy_trait_counts[trait] = enemy_trait_counts.get(trait, 0) + 1
+                trait_counts[trait] = trait_counts.get(trait, 0) + 1
+        return trait_counts
 
+    @staticmethod
+    def _role_counts(heroes: List[Hero]) -> Dict[str, int]:
         role_counts: Dict[str, int] = {}
-        for picked_hero in team_heroes:
+        for picked_hero in heroes:
             role_name = (picked_hero.role or "").lower()
             if role_name:
                 role_counts[role_name] = role_counts.get(role_name, 0) + 1
+        return role_counts
 
+    def _safety(
+        self,
+        hero: Hero,
+        team_trait_counts: Dict[str, int],
+        enemy_trait_counts: Dict[str, int],
+        role_counts: Dict[str, int],
+    ) -> Tuple[float, int]:
+        """Safety score and the bitmask of SAFETY_RULES that fired"""
+        hero_traits = self.get_hero_traits(hero)
         role = (hero.role or "").lower()
+
+        fired = (
+            "frontline" in hero_traits and team_trait_counts.get("frontline", 0) == 0,
+            "protect" in hero_traits and team_trait_counts.get("backline_carry", 0) >= 1,
+            "ranged" in hero_traits and bool({"protect", "poke", "mobility"} & hero_traits),
+            "crowd_control" in hero_traits and team_trait_counts.get("crowd_control", 0) == 0,
+            bool(role) and role_counts.get(role, 0) == 0 and role in {"tank", "marksman", "mage", "support"},
+            enemy_trait_counts.get("dive", 0) >= 1 and "backline_carry" in hero_traits and "protect" not in hero_traits and "mobility" not in hero_traits,
+            enemy_trait_counts.get("anti_mobility", 0) >= 1 and "mobility" in hero_traits,
+            bool(role) and role_counts.get(role, 0) >= 2,
+            "backline_carry" in hero_traits and team_trait_counts.get("frontline", 0) == 0 and "protect" not in hero_traits,
+            role == "marksman" and role_counts.get("marksman", 0) >= 1,
+            role == "mage" and role_counts.get("mage", 0) >= 1 and team_trait_counts.get("frontline", 0) == 0,
+        )
+
         score = 0.0
+        code = 0
+        for bit, ((value, _), hit) in enumerate(zip(self.SAFETY_RULES, fired)):
+            if hit:
+                score += value
+                code |= 1 << bit
+        return score, code
+
+    def _safety_reasons(self, hero: Hero, code: int) -> Tuple[List[str], List[str]]:
+        role = (hero.role or "").lower()
         positive_reasons: List[str] = []
         negative_reasons: List[str] = []
-
-        if "frontline" in hero_traits and team_trait_counts.get("frontline", 0) == 0:
-            score += 1.2
-            positive_reasons.append("Stabilizes your frontline")
-        if "protect" in hero_traits and team_trait_counts.get("backline_carry", 0) >= 1:
-            score += 1.0
-            positive_reasons.append("Can keep your carry safer")
-        if "ranged" in hero_traits and ({"protect", "poke", "mobility"} & hero_traits):
-            score += 0.6
-            positive_reasons.append("Reliable blind-pick profile")
-        if "crowd_control" in hero_traits and team_trait_counts.get("crowd_control", 0) == 0:
-            score += 0.5
-            positive_reasons.append("Adds dependable control")
-        if role and role_counts.get(role, 0) == 0 and role in {"tank", "marksman", "mage", "support"}:
-            score += 0.4
-            positive_reasons.append(f"Rounds out your {role} slot")
-
-        if enemy_trait_counts.get("dive", 0) >= 1 and "backline_carry" in hero_traits and "protect" not in hero_traits and "mobility" not in hero_traits:
-            score -= 1.1
-            negative_reasons.append("Unsafe backliner into enemy dive")
-        if enemy_trait_counts.get("anti_mobility", 0) >= 1 and "mobility" in hero_traits:
-            score -= 0.8
-            negative_reasons.append("Can get punished by enemy anti-mobility")
-        if role and role_counts.get(role, 0) >= 2:
-            score -= 0.8
-            negative_reasons.append(f"Overloads your draft with another {role}")
-        if "backline_carry" in hero_traits and team_trait_counts.get("frontline", 0) == 0 and "protect" not in hero_traits:
-            score -= 0.6
-            negative_reasons.append("Needs frontline cover first")
-        if role == "marksman" and role_counts.get("marksman", 0) >= 1:
-            score -= 0.9
-            negative_reasons.append("Double marksman is risky here")
-        if role == "mage" and role_counts.get("mage", 0) >= 1 and team_trait_counts.get("frontline", 0) == 0:
-            score -= 0.4
-            negative_reasons.append("Another mage leaves the draft fragile")
-
-        return score, positive_reasons[:3], negative_reasons[:4]
+        for bit, (value, template) in enumerate(self.SAFETY_RULES):
+            if code >> bit & 1:
+                (positive_reasons if value > 0 else negative_reasons).append(template.format(role=role))
+        return positive_reasons[:3], negative_reasons[:4]
 
     def get_global_winrate_score(self, hero: Hero) -> Tuple[float, List[str]]:
         if hero.global_rg_win_rate is None:
             return 0.0, []
 
+        score = self.global_winrate_value(hero)
+        return score, self._global_winrate_reasons(hero, score)
+
+    @staticmethod
+    def global_winrate_value(hero: Hero) -> float:
+        if hero.global_rg_win_rate is None:
+            return 0.0
+
         win_rate = float(hero.global_rg_win_rate)
         score = 0.0
 
@@ -566,9 +796,49 @@ class DraftAI:
         elif win_rate <= 49:
             score = -0.3
 
+        return score
+
+    def _global_winrate_reasons(self, hero: Hero, score: float) -> List[str]:
+        if hero.global_rg_win_rate is None:
+            return []
+
+        win_rate = float(hero.global_rg_win_rate)
         source = f" from {hero.global_rg_source}" if hero.global_rg_source else ""
         reason = f"High global RG win rate{source}: {win_rate:.1f}%" if score >= 0 else f"Low global RG win rate{source}: {win_rate:.1f}%"
-        return score, [reason]
+        return [reason]
+
+    def get_rating_scores(self, heroes: List[Hero], team_picks: List[int], enemy_picks: List[int]) -> np.ndarray:
+        """Saved-draft rating of each hero, plus its pair ratings with the team and against the enemy"""
+        if self.ratings is None:
+            return np.zeros(len(heroes))
+
+        return self.ratings.scores(
+            self.snapshot.slots_for(hero.id for hero in heroes),
+            self.snapshot.slots_for(hero.id for hero in self._get_heroes(team_picks)),
+            self.snapshot.slots_for(hero.id for hero in self._get_heroes(enemy_picks)),
+        )
+
+    def _rating_reasons(self, hero: Hero, team_picks: List[int], enemy_picks: List[int]) -> List[str]:
+        if self.ratings is None:
+            return []
+
+        ratings = self.ratings
+        slot = self.snapshot.hero_slots[hero.id]
+        reasons = []
+        if abs(ratings.hero_scores[slot]) >= 0.3:
+            label = "Strong" if ratings.hero_scores[slot] > 0 else "Weak"
+            reasons.append(
+                f"{label} saved-draft rating: {ratings.hero_points[slot]:+.0f} over {ratings.hero_games[slot]} games"
+            )
+        for ally in self._get_heroes(team_picks):
+            value = ratings.ally_scores[slot, self.snapshot.hero_slots[ally.id]]
+            if abs(value) >= 0.3:
+                reasons.append(f"{'Wins' if value > 0 else 'Loses'} often alongside {ally.name}")
+        for enemy in self._get_heroes(enemy_picks):
+            value = ratings.versus_scores[slot, self.snapshot.hero_slots[enemy.id]]
+            if abs(value) >= 0.3:
+                reasons.append(f"{'Good' if value > 0 else 'Poor'} saved-draft record against {enemy.name}")
+        return reasons
 
     def _dedupe_reasons(self, reasons: List[str], limit: int) -> List[str]:
         unique_reasons: List[str] = []
@@ -579,19 +849,260 @@ class DraftAI:
                 break
         return unique_reasons
 
+    def _score_heroes(
+        self,
+        bans: List[int],
+        blue_picks: List[int],
+        red_picks: List[int],
+        current_team: str = "blue",
+    ) -> ScoredPool:
+        """Score every available hero numerically; reasons are left as codes"""
+        return self._score_context(self.build_context(bans, blue_picks, red_picks, current_team))
+
+    def build_context(
+        self,
+        bans: List[int],
+        blue_picks: List[int],
+        red_picks: List[int],
+        current_team: str = "blue",
+    ) -> DraftContext:
+        """Team context of a draft state, which is the same for every candidate"""
+        return self.build_contexts([(bans, blue_picks, red_picks, current_team)])[0]
+
+    def build_contexts(self, states: List[DraftStateArgs]) -> List[DraftContext]:
+        """Team contexts of many draft states, with one counter and one synergy product for all of them"""
+        snapshot = self.snapshot
+        sides = [
+            (blue_picks, red_picks) if current_team == "blue" else (red_picks, blue_picks)
+            for _, blue_picks, red_picks, current_team in states
+        ]
+        # 0/1 pick masks as columns; the float32 matrices hold small dyadic values, so every sum is exact
+        with stage("pair_scores"):
+            counter_scores = snapshot.counter_matrix @ np.stack(
+                [snapshot.pick_mask(enemy_picks) for _, enemy_picks in sides], axis=1
+            ) if states else None
+            synergy_scores = snapshot.synergy_matrix @ np.stack(
+                [snapshot.pick_mask(team_picks) for team_picks, _ in sides], axis=1
+            ) if states else None
+
+        contexts = []
+        with stage("team_context"):
+            for index, ((bans, blue_picks, red_picks, _), (team_picks, enemy_picks)) in enumerate(zip(states, sides)):
+                team_heroes = self._get_heroes(team_picks)
+                enemy_heroes = self._get_heroes(enemy_picks)
+                team_slots = snapshot.slots_for(hero.id for hero in team_heroes)
+                enemy_slots = snapshot.slots_for(hero.id for hero in enemy_heroes)
+                contexts.append(DraftContext(
+                    team_picks=team_picks,
+                    enemy_picks=enemy_picks,
+                    available_heroes=self.get_available_heroes(bans, blue_picks, red_picks),
+                    team_heroes=team_heroes,
+                    enemy_heroes=enemy_heroes,
+                    role_balance_counts=self._role_balance_counts(self._get_heroes(sorted(set(team_picks)))),
+                    team_trait_counts=self._trait_counts(team_heroes),
+                    enemy_trait_counts=self._trait_counts(enemy_heroes),
+                    team_role_counts=self._role_counts(team_heroes),
+                    counter_scores=counter_scores[:, index],
+                    skill_counter_scores=self.SKILL_COUNTER_CODE_SCORES[snapshot.skill_counter_codes[:, enemy_slots]].sum(axis=1),
+                    synergy_scores=synergy_scores[:, index],
+                    skill_synergy_scores=self.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[:, team_slots]].sum(axis=1),
+                ))
+        return contexts
+
+    def score_states(self, states: List[DraftStateArgs]) -> List[ScoredPool]:
+        """Scored pools of many draft states.
+
+        A hero's scores depend on the bans only through whether it is
+        available, so states with the same picks for the same side are scored
+        once with the bans they all share, and each leaves out its own.
+        """
+        groups: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], List[int]] = {}
+        for index, (_, blue_picks, red_picks, current_team) in enumerate(states):
+            team_picks, enemy_picks = (blue_picks, red_picks) if current_team == "blue" else (red_picks, blue_picks)
+            groups.setdefault((tuple(team_picks), tuple(enemy_picks)), []).append(index)
+
+        shared_bans = [set.intersection(*(set(states[index][0]) for index in indexes)) for indexes in groups.values()]
+        contexts = self.build_contexts([
+            (sorted(bans), list(team_picks), list(enemy_picks), "blue")
+            for bans, (team_picks, enemy_picks) in zip(shared_bans, groups)
+        ])
+
+        pools: List[ScoredPool] = [None] * len(states)
+        for bans, context, indexes in zip(shared_bans, contexts, groups.values()):
+            pool = self._score_context(context)
+            for index in indexes:
+                own_bans = set(states[index][0]) - bans
+                pools[index] = pool.without(own_bans) if own_bans else pool
+        return pools
+
+    def _score_context(self, context: DraftContext) -> ScoredPool:
+        """Score every available hero of a draft context"""
+        team_picks = context.team_picks
+        enemy_picks = context.enemy_picks
+        available_heroes = context.available_heroes
+        team_heroes = context.team_heroes
+        enemy_heroes = context.enemy_heroes
+        team_roles = self._team_roles(team_heroes)
+        role_balance_counts = context.role_balance_counts
+        team_trait_counts = context.team_trait_counts
+        enemy_trait_counts = context.enemy_trait_counts
+        team_role_counts = context.team_role_counts
+
+        count = len(available_heroes)
+        record_heroes_scored(count)
+        tier_scores = np.empty(count)
+        role_scores = np.empty(count)
+        safety_scores = np.empty(count)
+        winrate_scores = np.empty(count)
+        tier_selections: List[TierSelection] = []
+        lane_fits: List[str | None] = []
+        role_codes: List[int] = []
+        safety_codes: List[int] = []
+
+        # One pass per stage, so each can be timed on its own
+        with stage("tier"):
+            for position, hero in enumerate(available_heroes):
+                preferred_lanes = self._get_lane_preferences(hero, team_picks, team_roles)
+                lane_fits.append(preferred_lanes[0] if preferred_lanes else None)
+
+                selection = self._select_tier_entry(hero, preferred_lanes)
+                tier_selections.append(selection)
+                tier_scores[position] = selection[1]
+
+        with stage("role_balance"):
+            for position, hero in enumerate(available_heroes):
+                role_scores[position], role_code = self._role_balance(hero, role_balance_counts)
+                role_codes.append(role_code)
+
+        with stage("safety"):
+            for position, hero in enumerate(available_heroes):
+                safety_scores[position], safety_code = self._safety(hero, team_trait_counts, enemy_trait_counts, team_role_counts)
+                safety_codes.append(safety_code)
+
+        with stage("winrate"):
+            for position, hero in enumerate(available_heroes):
+                winrate_scores[position] = self.global_winrate_value(hero)
+
+        with stage("ratings"):
+            rating_scores = self.get_rating_scores(available_heroes, team_picks, enemy_picks)
+
+        with stage("totals"):
+            slots = self.snapshot.slots_for(hero.id for hero in available_heroes)
+            counter_component = (
+                context.counter_scores[slots].astype(np.float64) * 1.5 +
+                context.skill_counter_scores[slots] * 1.1
+            )
+            synergy_component = (
+                context.synergy_scores[slots].astype(np.float64) * 1.2 +
+                context.skill_synergy_scores[slots] * 1.0
+            )
+            role_component = role_scores * 0.8
+
+            total_scores = (
+                tier_scores * 1.0 +
+                counter_component +
+                synergy_component +
+                role_component +
+                safety_scores +
+                winrate_scores +
+                rating_scores
+            )
+            safe_scores = tier_scores * 0.7 + role_component + safety_scores + winrate_scores + rating_scores
+            overall = [round(value, 2) for value in total_scores.tolist()]
+            counter = [round(value, 2) for value in counter_component.tolist()]
+            synergy = [round(value, 2) for value in synergy_component.tolist()]
+            safe = [round(value, 2) for value in safe_scores.tolist()]
+
+        return ScoredPool(
+            team_picks=team_picks,
+            enemy_picks=enemy_picks,
+            team_heroes=team_heroes,
+            enemy_heroes=enemy_heroes,
+            role_balance_counts=role_balance_counts,
+            heroes=available_heroes,
+            tier_selections=tier_selections,
+            lane_fits=lane_fits,
+            role_codes=role_codes,
+            safety_codes=safety_codes,
+            overall=overall,
+            counter=counter,
+            synergy=synergy,
+            safe=safe,
+        )
+
+    def _materialize(self, pool: ScoredPool, position: int, with_reasons: bool = True) -> Dict:
+        """Build the suggestion dict for one scored hero, formatting its reasons on demand"""
+        cache_key = (position, with_reasons)
+        suggestion = pool.suggestions.get(cache_key)
+        if suggestion is not None:
+            return suggestion
+
+        hero = pool.heroes[position]
+        tier_context = self._tier_context(pool.tier_selections[position])
+        tier = str(tier_context["tier"])
+        suggestion = {
+            "hero": hero,
+            "score": pool.overall[position],
+            "tier": tier,
+            "lane_fit": pool.lane_fits[position],
+            "reasons": [],
+            "breakdown": {
+                "overall": pool.overall[position],
+                "counter": pool.counter[position],
+                "synergy": pool.synergy[position],
+                "safe": pool.safe[position],
+            },
+            "category_reasons": {},
+        }
+        pool.suggestions[cache_key] = suggestion
+        if not with_reasons:
+            return suggestion
+
+        slot = self.snapshot.hero_slots[hero.id]
+        tier_reasons = self._dedupe_reasons(list(tier_context["reasons"]), 2) or [f"Tier {tier} hero"]
+        winrate_reasons = (
+            self._global_winrate_reasons(hero, self.global_winrate_value(hero)) +
+            self._rating_reasons(hero, pool.team_picks, pool.enemy_picks)
+        )
+        counter_reasons = self._counter_reasons(hero, pool.enemy_picks)
+        skill_counter_reasons = self._skill_reasons(
+            self.snapshot.skill_counter_codes[slot, pool.enemy_slots(self.snapshot)], pool.enemy_heroes, self.SKILL_COUNTER_RULES
+        )
+        synergy_reasons = self._synergy_reasons(hero, pool.team_picks)
+        skill_synergy_reasons = self._skill_reasons(
+            self.snapshot.skill_synergy_codes[slot, pool.team_slots(self.snapshot)], pool.team_heroes, self.SKILL_SYNERGY_RULES
+        )
+        role_reasons = self._role_balance_reasons(hero, pool.role_balance_counts, pool.role_codes[position])
+        safe_reasons, negative_reasons = self._safety_reasons(hero, pool.safety_codes[position])
+
+        overall_reasons = self._dedupe_reasons(
+            tier_reasons + winrate_reasons + counter_reasons + skill_counter_reasons + synergy_reasons + skill_synergy_reasons + role_reasons + safe_reasons + negative_reasons,
+            6,
+        )
+        suggestion["reasons"] = overall_reasons
+        suggestion["category_reasons"] = {
+            "overall": overall_reasons,
+            "tier": self._dedupe_reasons(tier_reasons + winrate_reasons, 3),
+            "counter": self._dedupe_reasons(counter_reasons + skill_counter_reasons, 4),
+            "synergy": self._dedupe_reasons(synergy_reasons + skill_synergy_reasons, 4),
+            "safe": self._dedupe_reasons(safe_reasons + role_reasons + tier_reasons + winrate_reasons, 4),
+            "negative": self._dedupe_reasons(negative_reasons, 4),
+        }
+        return suggestion
+
     def _build_category_suggestions(
         self,
-        suggestions: List[Dict],
+        pool: ScoredPool,
         metric_key: str,
         top_n: int,
         primary_reason_key: str,
         fallback_reason_keys: List[str],
-        reverse: bool = True,
+        with_reasons: bool = True,
     ) -> List[Dict]:
-        ordered = sorted(suggestions, key=lambda item: item["breakdown"].get(metric_key, 0), reverse=reverse)
         picks: List[Dict] = []
 
-        for suggestion in ordered:
+        for position in pool.top(metric_key, top_n):
+            suggestion = self._materialize(pool, position, with_reasons)
             category_reasons = suggestion["category_reasons"]
             reasons = list(category_reasons.get(primary_reason_key, []))
             for fallback_key in fallback_reason_keys:
@@ -602,96 +1113,20 @@ class DraftAI:
                 "reasons": self._dedupe_reasons(reasons, 4),
             })
 
-            if len(picks) >= top_n:
-                break
-
         return picks
 
-    def _score_heroes(
-        self,
-        bans: List[int],
-        blue_picks: List[int],
-        red_picks: List[int],
-        current_team: str = "blue",
-    ) -> List[Dict]:
-        team_picks = blue_picks if current_team == "blue" else red_picks
-        enemy_picks = red_picks if current_team == "blue" else blue_picks
-
-        available_heroes = self.get_available_heroes(bans, blue_picks, red_picks)
-        suggestions = []
-
-        for hero in available_heroes:
-            lane_fit = self.get_lane_fit(hero, team_picks)
-            tier_context = self.get_hero_tier_context(hero, team_picks)
-            tier = str(tier_context["tier"])
-            tier_score = float(tier_context["score"])
-            tier_reasons = self._dedupe_reasons(list(tier_context["reasons"]), 2) or [f"Tier {tier} hero"]
-
-            counter_score, counter_reasons = self.get_counter_score(hero, enemy_picks)
-            synergy_score, synergy_reasons = self.get_synergy_score(hero, team_picks)
-            role_score, role_reasons = self.get_role_balance_score(hero, team_picks)
-            skill_counter_score, skill_counter_reasons = self.get_skill_counter_score(hero, enemy_picks)
-            skill_synergy_score, skill_synergy_reasons = self.get_skill_synergy_score(hero, team_picks)
-
-            safety_score, safe_reasons, negative_reasons = self.get_safety_score(hero, team_picks, enemy_picks)
-            winrate_score, winrate_reasons = self.get_global_winrate_score(hero)
-
-            counter_component = counter_score * 1.5 + skill_counter_score * 1.1
-            synergy_component = synergy_score * 1.2 + skill_synergy_score * 1.0
-            role_component = role_score * 0.8
-            safe_component = safety_score
-
-            total_score = (
-                tier_score * 1.0 +
-                counter_component +
-                synergy_component +
-                role_component +
-                safe_component +
-                winrate_score
-            )
-
-            overall_reasons = self._dedupe_reasons(
-                tier_reasons + winrate_reasons + counter_reasons + skill_counter_reasons + synergy_reasons + skill_synergy_reasons + role_reasons + safe_reasons + negative_reasons,
-                6,
-            )
-
-            suggestions.append({
-                "hero": hero,
-                "score": round(total_score, 2),
-                "tier": tier,
-                "lane_fit": lane_fit,
-                "reasons": overall_reasons,
-                "breakdown": {
-                    "overall": round(total_score, 2),
-                    "counter": round(counter_component, 2),
-                    "synergy": round(synergy_component, 2),
-                    "safe": round(tier_score * 0.7 + role_component + safe_component + winrate_score, 2),
-                },
-                "category_reasons": {
-                    "overall": overall_reasons,
-                    "tier": self._dedupe_reasons(tier_reasons + winrate_reasons, 3),
-                    "counter": self._dedupe_reasons(counter_reasons + skill_counter_reasons, 4),
-                    "synergy": self._dedupe_reasons(synergy_reasons + skill_synergy_reasons, 4),
-                    "safe": self._dedupe_reasons(safe_reasons + role_reasons + tier_reasons + winrate_reasons, 4),
-                    "negative": self._dedupe_reasons(negative_reasons, 4),
-                }
-            })
-
-        return suggestions
-    
     def get_suggestions(
         self,
         bans: List[int],
         blue_picks: List[int],
         red_picks: List[int],
         current_team: str = "blue",
-        top_n: int = 5
+        top_n: int = 5,
+        with_reasons: bool = True
     ) -> List[Dict]:
         """Get top hero suggestions with scores and reasons"""
-        suggestions = self._score_heroes(bans, blue_picks, red_picks, current_team)
-        suggestions.sort(key=lambda x: x["score"], reverse=True)
-
-        return suggestions[:top_n]
+        pool = self._score_heroes(bans, blue_picks, red_picks, current_team)
+        return self._select_top(pool, top_n, with_reasons)
 
     def get_counter_suggestions(
         self,
@@ -699,10 +1134,11 @@ class DraftAI:
         blue_picks: List[int],
         red_picks: List[int],
         current_team: str = "blue",
-        top_n: int = 3
+        top_n: int = 3,
+        with_reasons: bool = True
     ) -> List[Dict]:
-        suggestions = self._score_heroes(bans, blue_picks, red_picks, current_team)
-        return self._build_category_suggestions(suggestions, "counter", top_n, "counter", ["safe", "tier"])
+        pool = self._score_heroes(bans, blue_picks, red_picks, current_team)
+        return self._build_category_suggestions(pool, "counter", top_n, "counter", ["safe", "tier"], with_reasons)
 
     def get_synergy_suggestions(
         self,
@@ -710,10 +1146,11 @@ class DraftAI:
         blue_picks: List[int],
         red_picks: List[int],
         current_team: str = "blue",
-        top_n: int = 3
+        top_n: int = 3,
+        with_reasons: bool = True
     ) -> List[Dict]:
-        suggestions = self._score_heroes(bans, blue_picks, red_picks, current_team)
-        return self._build_category_suggestions(suggestions, "synergy", top_n, "synergy", ["safe", "tier"])
+        pool = self._score_heroes(bans, blue_picks, red_picks, current_team)
+        return self._build_category_suggestions(pool, "synergy", top_n, "synergy", ["safe", "tier"], with_reasons)
 
     def get_safe_suggestions(
         self,
@@ -721,10 +1158,11 @@ class DraftAI:
         blue_picks: List[int],
         red_picks: List[int],
         current_team: str = "blue",
-        top_n: int = 3
+        top_n: int = 3,
+        with_reasons: bool = True
     ) -> List[Dict]:
-        suggestions = self._score_heroes(bans, blue_picks, red_picks, current_team)
-        return self._build_category_suggestions(suggestions, "safe", top_n, "safe", ["tier", "synergy"])
+        pool = self._score_heroes(bans, blue_picks, red_picks, current_team)
+        return self._build_category_suggestions(pool, "safe", top_n, "safe", ["tier", "synergy"], with_reasons)
 
     def get_avoid_suggestions(
         self,
@@ -732,13 +1170,47 @@ class DraftAI:
         blue_picks: List[int],
         red_picks: List[int],
         current_team: str = "blue",
-        bottom_n: int = 3
+        bottom_n: int = 3,
+        with_reasons: bool = True
     ) -> List[Dict]:
-        suggestions = self._score_heroes(bans, blue_picks, red_picks, current_team)
-        suggestions.sort(key=lambda x: (x["breakdown"].get("safe", 0), x["score"]))
+        pool = self._score_heroes(bans, blue_picks, red_picks, current_team)
+        return self._select_avoid(pool, bottom_n, with_reasons)
 
+    def get_suggestion_groups(
+        self,
+        bans: List[int],
+        blue_picks: List[int],
+        red_picks: List[int],
+        current_team: str = "blue",
+        top_n: int = 5,
+        category_n: int = 3,
+        avoid_n: int = 3,
+        with_reasons: bool = True,
+        context: Optional[DraftContext] = None,
+        pool: Optional[ScoredPool] = None,
+    ) -> Dict[str, List[Dict]]:
+        """Score the available pool once and derive every suggestion group from it"""
+        if pool is None:
+            if context is None:
+                context = self.build_context(bans, blue_picks, red_picks, current_team)
+            pool = self._score_context(context)
+
+        with stage("reasons"):
+            return {
+                "overall": self._select_top(pool, top_n, with_reasons),
+                "counter": self._build_category_suggestions(pool, "counter", category_n, "counter", ["safe", "tier"], with_reasons),
+                "synergy": self._build_category_suggestions(pool, "synergy", category_n, "synergy", ["safe", "tier"], with_reasons),
+                "safe": self._build_category_suggestions(pool, "safe", category_n, "safe", ["tier", "synergy"], with_reasons),
+                "avoid": self._select_avoid(pool, avoid_n, with_reasons),
+            }
+
+    def _select_top(self, pool: ScoredPool, top_n: int, with_reasons: bool = True) -> List[Dict]:
+        return [self._materialize(pool, position, with_reasons) for position in pool.top("overall", top_n)]
+
+    def _select_avoid(self, pool: ScoredPool, bottom_n: int, with_reasons: bool = True) -> List[Dict]:
         avoid = []
-        for suggestion in suggestions:
+        for position in pool.bottom(bottom_n):
+            suggestion = self._materialize(pool, position, with_reasons)
             negative_reasons = suggestion["category_reasons"].get("negative", [])
 
             avoid.append({
@@ -746,13 +1218,352 @@ class DraftAI:
                 "reasons": negative_reasons[:4] or suggestion["reasons"][:3]
             })
 
-            if len(avoid) >= bottom_n:
-                break
-
         return avoid
-    
+
+    def get_ban_suggestions(
+        self,
+        bans: List[int],
+        blue_picks: List[int],
+        red_picks: List[int],
+        current_team: str = "blue",
+        top_n: int = 5,
+        with_reasons: bool = True
+    ) -> List[Dict]:
+        """Rank available heroes by the threat they pose to the current team in enemy hands"""
+        team_picks = blue_picks if current_team == "blue" else red_picks
+        enemy_picks = red_picks if current_team == "blue" else blue_picks
+
+        available_heroes = self.get_available_heroes(bans, blue_picks, red_picks)
+        slots = self.snapshot.slots_for(hero.id for hero in available_heroes)
+        tier_scores = self.snapshot.base_tier_scores[slots]
+        winrate_scores = self.snapshot.winrate_scores[slots]
+        # The hero's own pick score from the enemy side: countering our picks, synergy with theirs
+        counter_threat = (
+            self.get_counter_scores(available_heroes, team_picks).astype(np.float64) * 1.5 +
+            self.get_skill_counter_scores(available_heroes, team_picks) * 1.1
+        )
+        synergy_threat = (
+            self.get_synergy_scores(available_heroes, enemy_picks).astype(np.float64) * 1.2 +
+            self.get_skill_synergy_scores(available_heroes, enemy_picks) * 1.0
+        )
+        rating_threat = self.get_rating_scores(available_heroes, enemy_picks, team_picks)
+        threat = [
+            round(value, 2)
+            for value in (tier_scores + winrate_scores + counter_threat + synergy_threat + rating_threat).tolist()
+        ]
+
+        team_heroes = self._get_heroes(team_picks)
+        team_map = {hero.id: hero for hero in team_heroes}
+        team_slots = self.snapshot.slots_for(hero.id for hero in team_heroes)
+        suggestions = []
+        for position in heapq.nlargest(top_n, range(len(threat)), key=threat.__getitem__):
+            hero = available_heroes[position]
+            preferred_lanes = self._get_lane_preferences(hero, [], [])
+            tier_context = self._tier_context(self._select_tier_entry(hero, preferred_lanes))
+            suggestion = {
+                "hero": hero,
+                "score": threat[position],
+                "tier": str(tier_context["tier"]),
+                "lane_fit": preferred_lanes[0] if preferred_lanes else None,
+                "reasons": [],
+                "breakdown": {
+                    "tier": float(tier_scores[position]),
+                    "winrate": float(winrate_scores[position]),
+                    "rating": round(float(rating_threat[position]), 2),
+                    "counter": round(float(counter_threat[position]), 2),
+                    "synergy": round(float(synergy_threat[position]), 2),
+                },
+            }
+            if with_reasons:
+                counter_reasons = [
+                    f"Counters your {team_map[countered_id].name} ({strength})"
+                    for countered_id, strength in self.snapshot.counters.get(hero.id, ())
+                    if countered_id in team_map
+                ]
+                skill_counter_reasons = self._skill_reasons(
+                    self.snapshot.skill_counter_codes[self.snapshot.hero_slots[hero.id], team_slots],
+                    team_heroes,
+                    self.SKILL_COUNTER_RULES,
+                )
+                suggestion["reasons"] = self._dedupe_reasons(
+                    counter_reasons +
+                    skill_counter_reasons +
+                    self._synergy_reasons(hero, enemy_picks) +
+                    list(tier_context["reasons"]) +
+                    self._global_winrate_reasons(hero, float(winrate_scores[position])) +
+                    self._rating_reasons(hero, enemy_picks, team_picks),
+                    4,
+                ) or [f"Tier {suggestion['tier']} hero"]
+            suggestions.append(suggestion)
+
+        return suggestions
+
+    def get_member_scores(self, team_picks: List[int], enemy_picks: List[int]) -> np.ndarray:
+        """Score every picked hero as _score_heroes would if it were the last pick, given the rest of both teams"""
+        team_heroes = self._get_heroes(team_picks)
+        enemy_heroes = self._get_heroes(enemy_picks)
+        team_slots = self.snapshot.slots_for(hero.id for hero in team_heroes)
+        enemy_slots = self.snapshot.slots_for(hero.id for hero in enemy_heroes)
+        versus = np.ix_(team_slots, enemy_slots)
+        within = np.ix_(team_slots, team_slots)
+
+        counter_scores = self.snapshot.counter_matrix[versus].astype(np.float64).sum(axis=1)
+        skill_counter_scores = self.SKILL_COUNTER_CODE_SCORES[self.snapshot.skill_counter_codes[versus]].sum(axis=1)
+        synergy_pairs = self.snapshot.synergy_matrix[within].astype(np.float64)
+        skill_synergy_pairs = self.SKILL_SYNERGY_CODE_SCORES[self.snapshot.skill_synergy_codes[within]]
+        np.fill_diagonal(synergy_pairs, 0.0)
+        np.fill_diagonal(skill_synergy_pairs, 0.0)
+
+        role_balance_counts = self._role_balance_counts(team_heroes)
+        team_trait_counts = self._trait_counts(team_heroes)
+        enemy_trait_counts = self._trait_counts(enemy_heroes)
+        team_role_counts = self._role_counts(team_heroes)
+
+        other_scores = np.empty(len(team_heroes))
+        for position, hero in enumerate(team_heroes):
+            # Take the hero back out of the team context it is being scored against
+            rest = team_heroes[:position] + team_heroes[position + 1:]
+            role_counts = dict(role_balance_counts)
+            if hero.role in role_counts:
+                role_counts[hero.role] -= 1
+            trait_counts = dict(team_trait_counts)
+            for trait in self.get_hero_traits(hero):
+                trait_counts[trait] -= 1
+            lower_role_counts = dict(team_role_counts)
+            role_name = (hero.role or "").lower()
+            if role_name:
+                lower_role_counts[role_name] -= 1
+
+            other_scores[position] = self._context_score(
+                hero, self._team_roles(rest), role_counts, trait_counts, enemy_trait_counts, lower_role_counts
+            )
+
+        rating_scores = self.ratings.scores(team_slots, team_slots, enemy_slots) if self.ratings is not None else 0.0
+
+        return (
+            other_scores +
+            counter_scores * 1.5 + skill_counter_scores * 1.1 +
+            synergy_pairs.sum(axis=1) * 1.2 + skill_synergy_pairs.sum(axis=1) * 1.0 +
+            rating_scores
+        )
+
+    def _context_score(
+        self,
+        hero: Hero,
+        team_roles: List[str],
+        role_balance_counts: Dict[str, int],
+        team_trait_counts: Dict[str, int],
+        enemy_trait_counts: Dict[str, int],
+        team_role_counts: Dict[str, int],
+    ) -> float:
+        """The member score terms that depend on team context rather than on pairs of heroes"""
+        preferred_lanes = self._get_lane_preferences(hero, [], team_roles)
+        tier_score = self._select_tier_entry(hero, preferred_lanes)[1]
+        role_score, _ = self._role_balance(hero, role_balance_counts)
+        safety_score, _ = self._safety(hero, team_trait_counts, enemy_trait_counts, team_role_counts)
+        return tier_score + role_score * 0.8 + safety_score + self.global_winrate_value(hero)
+
+    def _ally_pair_values(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Named and skill synergy between two groups of hero slots, as score_composition weighs it"""
+        block = np.ix_(rows, columns)
+        return (
+            self.snapshot.synergy_matrix[block].astype(np.float64) * 1.2 +
+            self.SKILL_SYNERGY_CODE_SCORES[self.snapshot.skill_synergy_codes[block]]
+        )
+
+    def _versus_pair_values(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Named and skill counters of one group of hero slots against another"""
+        block = np.ix_(rows, columns)
+        return (
+            self.snapshot.counter_matrix[block].astype(np.float64) * 1.5 +
+            self.SKILL_COUNTER_CODE_SCORES[self.snapshot.skill_counter_codes[block]] * 1.1
+        )
+
+    def get_replacement_scores(
+        self,
+        team_picks: List[int],
+        enemy_picks: List[int],
+        position: int,
+        candidates: List[Hero],
+    ) -> np.ndarray:
+        """score_composition of the team with the pick at position swapped for each candidate.
+
+        Pair terms come from the hero tables in one pass. The context terms of
+        the remaining members only depend on the candidate's role and the few
+        traits _safety reads from team counts, so they are computed once per
+        distinct (role, traits) by shifting the remaining team's counts.
+        """
+        snapshot = self.snapshot
+        team_heroes = self._get_heroes(team_picks)
+        rest = team_heroes[:position] + team_heroes[position + 1:]
+        enemy_heroes = self._get_heroes(enemy_picks)
+        rest_slots = snapshot.slots_for(hero.id for hero in rest)
+        enemy_slots = snapshot.slots_for(hero.id for hero in enemy_heroes)
+        candidate_slots = snapshot.slots_for(hero.id for hero in candidates)
+
+        role_balance_counts = self._role_balance_counts(rest)
+        trait_counts = self._trait_counts(rest)
+        enemy_trait_counts = self._trait_counts(enemy_heroes)
+        role_counts = self._role_counts(rest)
+
+        # The candidate itself, as the last pick next to the rest of the team
+        rest_roles = self._team_roles(rest)
+        candidate_context = np.array([
+            self._context_score(hero, rest_roles, role_balance_counts, trait_counts, enemy_trait_counts, role_counts)
+            for hero in candidates
+        ])
+
+        # The rest of the team, each member scored next to the others plus the candidate
+        rest_context = np.empty(len(candidates))
+        groups: Dict[Tuple[str, int], List[int]] = {}
+        for index, hero in enumerate(candidates):
+            traits = int(snapshot.trait_masks[candidate_slots[index]]) & self.SAFETY_TEAM_TRAIT_MASK
+            groups.setdefault((hero.role, traits), []).append(index)
+        for indices in groups.values():
+            added = candidates[indices[0]]
+            total = 0.0
+            for member_index, member in enumerate(rest):
+                others = rest[:member_index] + rest[member_index + 1:] + [added]
+                member_role_balance = dict(role_balance_counts)
+                member_traits = dict(trait_counts)
+                member_roles = dict(role_counts)
+                for hero, step in ((member, -1), (added, 1)):
+                    if hero.role in member_role_balance:
+                        member_role_balance[hero.role] += step
+                    for trait in self.get_hero_traits(hero):
+                        member_traits[trait] = member_traits.get(trait, 0) + step
+                    role_name = (hero.role or "").lower()
+                    if role_name:
+                        member_roles[role_name] = member_roles.get(role_name, 0) + step
+                total += self._context_score(
+                    member, self._team_roles(others), member_role_balance, member_traits, enemy_trait_counts, member_roles
+                )
+            rest_context[indices] = total
+
+        # Only the blocks between the picks and candidates involved, not the whole hero tables
+        within = self._ally_pair_values(rest_slots, rest_slots)
+        np.fill_diagonal(within, 0.0)
+        rest_pairs = within.sum() + self._versus_pair_values(rest_slots, enemy_slots).sum()
+        candidate_pairs = (
+            self._ally_pair_values(candidate_slots, rest_slots).sum(axis=1) +
+            self._ally_pair_values(rest_slots, candidate_slots).sum(axis=0) +
+            self._versus_pair_values(candidate_slots, enemy_slots).sum(axis=1)
+        )
+
+        rating_scores = 0.0
+        if self.ratings is not None:
+            rating_scores = (
+                self.ratings.scores(rest_slots, rest_slots, enemy_slots).sum() +
+                self.ratings.scores(candidate_slots, rest_slots, enemy_slots) +
+                self.ratings.ally_scores[np.ix_(rest_slots, candidate_slots)].sum(axis=0)
+            )
+
+        return candidate_context + rest_context + rest_pairs + candidate_pairs + rating_scores
+
+    def get_replacement_summaries(self, team_picks: List[int], position: int, candidates: List[Hero]) -> List[Dict]:
+        """The average tier, synergy count and roles analyze_team would report for each swap"""
+        snapshot = self.snapshot
+        team_heroes = self._get_heroes(team_picks)
+        rest = team_heroes[:position] + team_heroes[position + 1:]
+        rest_slots = snapshot.slots_for(hero.id for hero in rest)
+        candidate_slots = snapshot.slots_for(hero.id for hero in candidates)
+        before, after = rest_slots[:position], rest_slots[position:]
+
+        def links(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+            """Named plus derived synergy links from each first hero to each second, in pick order"""
+            return (
+                (snapshot.synergy_matrix[np.ix_(first, second)] > 0).astype(np.int64) +
+                (self.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[np.ix_(first, second)]] >= 0.8)
+            )
+
+        rest_links = int(np.triu(links(rest_slots, rest_slots), 1).sum())
+        synergy_counts = (
+            rest_links + links(before, candidate_slots).sum(axis=0) + links(candidate_slots, after).sum(axis=1)
+        ).tolist()
+        tier_totals = (snapshot.base_tier_values[rest_slots].sum() + snapshot.base_tier_values[candidate_slots]).tolist()
+
+        rest_roles: Dict[str, int] = {}
+        for hero in rest:
+            role = hero.role.lower() if hero.role else "unknown"
+            rest_roles[role] = rest_roles.get(role, 0) + 1
+
+        summaries = []
+        for index, hero in enumerate(candidates):
+            roles = dict(rest_roles)
+            role = hero.role.lower() if hero.role else "unknown"
+            roles[role] = roles.get(role, 0) + 1
+            summaries.append({
+                "roles": roles,
+                "average_tier": self._average_tier(tier_totals[index], len(rest) + 1),
+                "synergy_count": synergy_counts[index],
+            })
+        return summaries
+
+    def score_composition(self, team_picks: List[int], enemy_picks: List[int]) -> float:
+        """Total of the member scores of a (possibly partial) team against an enemy team"""
+        return float(self.get_member_scores(team_picks, enemy_picks).sum())
+
     def analyze_team(self, team_picks: List[int]) -> Dict:
         """Analyze a team composition"""
+        return self.analyze_teams([team_picks])[0]
+
+    def analyze_teams(self, teams: List[List[int]]) -> List[Dict]:
+        """Analyze a batch of team compositions with one pass over the pair and trait tables"""
+        snapshot = self.snapshot
+        # Pairs are taken in pick order (skill synergy is directional); roles, traits and tiers per distinct hero
+        pick_slots = [[snapshot.hero_slots[hero_id] for hero_id in team if hero_id in snapshot.hero_slots] for team in teams]
+        hero_slots = [sorted({snapshot.hero_slots[hero.id] for hero in self._get_heroes(team)}) for team in teams]
+
+        with stage("team_pairs"):
+            picks, pick_valid = self._pad_slots(pick_slots)
+            first, second = np.triu_indices(picks.shape[1], 1)
+            pair_valid = pick_valid[:, first] & pick_valid[:, second]
+            named_links = (snapshot.synergy_matrix[picks[:, first], picks[:, second]] > 0) & pair_valid
+            derived_links = (
+                self.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[picks[:, first], picks[:, second]]] >= 0.8
+            ) & pair_valid
+            synergy_counts = named_links.sum(axis=1).tolist()
+            derived_counts = derived_links.sum(axis=1).tolist()
+
+        with stage("team_traits"):
+            members, member_valid = self._pad_slots(hero_slots)
+            trait_bits = (snapshot.trait_masks[members][:, :, None] >> np.arange(len(self.TRAIT_NAMES))) & 1
+            trait_counts = (trait_bits * member_valid[:, :, None]).sum(axis=1).tolist()
+            tier_totals = (snapshot.base_tier_values[members] * member_valid).sum(axis=1).tolist()
+
+        with stage("team_summary"):
+            return [
+                self._team_analysis(
+                    team,
+                    [snapshot.heroes[snapshot.hero_ids[slot]] for slot in hero_slots[index]],
+                    synergy_counts[index],
+                    derived_counts[index],
+                    dict(zip(self.TRAIT_NAMES, trait_counts[index])),
+                    tier_totals[index],
+                )
+                for index, team in enumerate(teams)
+            ]
+
+    @staticmethod
+    def _pad_slots(slot_lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack ragged slot lists into a (teams x width) slot array and its validity mask"""
+        width = max([len(slots) for slots in slot_lists] + [1])
+        padded = np.zeros((len(slot_lists), width), dtype=np.intp)
+        valid = np.zeros((len(slot_lists), width), dtype=bool)
+        for row, slots in enumerate(slot_lists):
+            padded[row, :len(slots)] = slots
+            valid[row, :len(slots)] = True
+        return padded, valid
+
+    def _team_analysis(
+        self,
+        team_picks: List[int],
+        heroes: List[Hero],
+        synergy_count: int,
+        derived_combo_count: int,
+        trait_counts: Dict[str, int],
+        tier_total: float,
+    ) -> Dict:
         if not team_picks:
             return {
                 "roles": {},
@@ -761,18 +1572,11 @@ class DraftAI:
                 "average_tier": "N/A"
             }
         
-        heroes = self.db.query(Hero).filter(Hero.id.in_(team_picks)).all()
-        
         # Count roles
         role_counts = {}
-        tiers = []
-        
         for hero in heroes:
             role = hero.role.lower() if hero.role else "unknown"
             role_counts[role] = role_counts.get(role, 0) + 1
-            
-            tier, _ = self.get_hero_tier(hero)
-            tiers.append(tier)
         
         # Calculate strengths and weaknesses
         strengths = []
@@ -798,34 +1602,11 @@ class DraftAI:
             strengths.append("Has burst damage potential")
         
         # Check synergies within team
-        synergy_count = 0
-        derived_combo_count = 0
-        for i, hero_id in enumerate(team_picks):
-            for other_id in team_picks[i+1:]:
-                synergy = self.db.query(Synergy).filter(
-                    ((Synergy.hero_1_id == hero_id) & (Synergy.hero_2_id == other_id)) |
-                    ((Synergy.hero_2_id == hero_id) & (Synergy.hero_1_id == other_id))
-                ).first()
-                if synergy:
-                    synergy_count += 1
-
-                hero = next((item for item in heroes if item.id == hero_id), None)
-                other = next((item for item in heroes if item.id == other_id), None)
-                if hero and other:
-                    derived_score, _ = self._pair_skill_synergy(hero, other)
-                    if derived_score >= 0.8:
-                        derived_combo_count += 1
-        
         if synergy_count >= 2 or derived_combo_count >= 2:
             strengths.append(f"Good team synergy ({synergy_count + derived_combo_count} combos)")
         elif synergy_count == 0 and derived_combo_count == 0 and len(team_picks) >= 3:
             weaknesses.append("No strong follow-up synergy yet")
 
-        trait_counts: Dict[str, int] = {}
-        for hero in heroes:
-            for trait in self.get_hero_traits(hero):
-                trait_counts[trait] = trait_counts.get(trait, 0) + 1
-
         if trait_counts.get("crowd_control", 0) >= 1:
             strengths.append("Has reliable crowd control")
         else:
@@ -842,66 +1623,100 @@ class DraftAI:
         if trait_counts.get("engage", 0) == 0 and len(team_picks) >= 3:
             weaknesses.append("Lacks strong engage tools")
         
-        # Average tier
-        tier_values = [self.TIER_SCORES.get(t, 2) for t in tiers]
-        avg_tier_value = sum(tier_values) / len(tier_values) if tier_values else 2
-        avg_tier = "S" if avg_tier_value >= 4.5 else "A" if avg_tier_value >= 3.5 else "B" if avg_tier_value >= 2.5 else "C"
-        
         return {
             "roles": role_counts,
             "strengths": strengths,
             "weaknesses": weaknesses,
-            "average_tier": avg_tier,
+            "average_tier": self._average_tier(tier_total, len(heroes)),
             "synergy_count": synergy_count + derived_combo_count
         }
 
-    def evaluate_picked_hero(self, hero_id: int, team_picks: List[int], enemy_picks: List[int]) -> Dict | None:
-        hero = self._get_heroes([hero_id])
-        if not hero:
-            return None
-
-        picked_hero = hero[0]
-        ally_ids = [item for item in team_picks if item != hero_id]
-        lane_fit = self.get_lane_fit(picked_hero, ally_ids)
-        tier_context = self.get_hero_tier_context(picked_hero, ally_ids)
-        tier_reasons = self._dedupe_reasons(list(tier_context["reasons"]), 2) or [f"Tier {tier_context['tier']} hero"]
-
-        counter_score, counter_reasons = self.get_counter_score(picked_hero, enemy_picks)
-        synergy_score, synergy_reasons = self.get_synergy_score(picked_hero, ally_ids)
-        role_score, role_reasons = self.get_role_balance_score(picked_hero, ally_ids)
-        skill_counter_score, skill_counter_reasons = self.get_skill_counter_score(picked_hero, enemy_picks)
-        skill_synergy_score, skill_synergy_reasons = self.get_skill_synergy_score(picked_hero, ally_ids)
-        safety_score, safe_reasons, negative_reasons = self.get_safety_score(picked_hero, ally_ids, enemy_picks)
-
-        score = (
-            float(tier_context["score"]) * 1.0 +
-            (counter_score * 1.5 + skill_counter_score * 1.1) +
-            (synergy_score * 1.2 + skill_synergy_score * 1.0) +
-            (role_score * 0.8) +
-            safety_score
-        )
+    @staticmethod
+    def _average_tier(tier_total: float, hero_count: int) -> str:
+        avg_tier_value = tier_total / hero_count if hero_count else 2
+        return "S" if avg_tier_value >= 4.5 else "A" if avg_tier_value >= 3.5 else "B" if avg_tier_value >= 2.5 else "C"
 
-        reasons = self._dedupe_reasons(
-            tier_reasons + counter_reasons + skill_counter_reasons + synergy_reasons + skill_synergy_reasons + role_reasons + safe_reasons,
-            4,
-        )
+    def get_team_standouts(self, team_picks: List[int], enemy_picks: List[int], top_n: int = 2) -> List[Dict]:
+        """Score every pick against the rest of its team at once; reasons are built for the top picks only"""
+        members = self._get_heroes(team_picks)
+        if not members:
+            return []
 
-        return {
-            "hero": picked_hero,
-            "lane_fit": lane_fit,
-            "tier": str(tier_context["tier"]),
-            "score": round(score, 2),
-            "reasons": reasons,
-            "risks": self._dedupe_reasons(negative_reasons, 3),
-        }
+        snapshot = self.snapshot
+        member_ids = [hero.id for hero in members]
+        member_slots = snapshot.slots_for(member_ids)
+        # Allies of a pick are the rest of the team without any copy of that hero
+        is_self = np.array(member_ids)[:, None] == np.array(member_ids)[None, :]
+
+        counter_scores = self.get_counter_scores(members, enemy_picks).astype(np.float64)
+        skill_counter_scores = self.get_skill_counter_scores(members, enemy_picks)
+        team_mask = snapshot.pick_mask(member_ids)
+        synergy_rows = snapshot.synergy_matrix[member_slots] * team_mask
+        synergy_rows[np.arange(len(members)), member_slots] = 0.0
+        synergy_scores = synergy_rows.sum(axis=1, dtype=np.float32).astype(np.float64)
+        skill_synergy_pairs = self.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[np.ix_(member_slots, member_slots)]]
+        skill_synergy_pairs[is_self] = 0.0
+        skill_synergy_scores = skill_synergy_pairs.sum(axis=1)
+
+        enemy_trait_counts = self._trait_counts(self._get_heroes(enemy_picks))
+        tier_scores = np.empty(len(members))
+        role_scores = np.empty(len(members))
+        safety_scores = np.empty(len(members))
+        contexts = []
+        for position, hero in enumerate(members):
+            allies = [ally for ally in members if ally.id != hero.id]
+            preferred_lanes = self._get_lane_preferences(hero, [], self._team_roles(allies))
+            selection = self._select_tier_entry(hero, preferred_lanes)
+            role_counts = self._role_balance_counts(self._get_heroes(sorted({ally.id for ally in allies})))
+            tier_scores[position] = selection[1]
+            role_scores[position], role_code = self._role_balance(hero, role_counts)
+            safety_scores[position], safety_code = self._safety(
+                hero, self._trait_counts(allies), enemy_trait_counts, self._role_counts(allies)
+            )
+            contexts.append((allies, preferred_lanes, selection, role_counts, role_code, safety_code))
+
+        totals = (
+            tier_scores * 1.0 +
+            (counter_scores * 1.5 + skill_counter_scores * 1.1) +
+            (synergy_scores * 1.2 + skill_synergy_scores * 1.0) +
+            (role_scores * 0.8) +
+            safety_scores
+        )
+        scores = [round(value, 2) for value in totals.tolist()]
 
-    def get_team_standouts(self, team_picks: List[int], enemy_picks: List[int], top_n: int = 2) -> List[Dict]:
         standouts = []
+        for position in heapq.nlargest(top_n, range(len(members)), key=scores.__getitem__):
+            hero = members[position]
+            allies, preferred_lanes, selection, role_counts, role_code, safety_code = contexts[position]
+            ally_ids = [ally.id for ally in allies]
+            tier_context = self._tier_context(selection)
+            tier_reasons = self._dedupe_reasons(list(tier_context["reasons"]), 2) or [f"Tier {tier_context['tier']} hero"]
+            slot = snapshot.hero_slots[hero.id]
+            enemies = self._get_heroes(enemy_picks)
+            skill_counter_reasons = self._skill_reasons(
+                snapshot.skill_counter_codes[slot, snapshot.slots_for(enemy.id for enemy in enemies)], enemies, self.SKILL_COUNTER_RULES
+            )
+            skill_synergy_reasons = self._skill_reasons(
+                snapshot.skill_synergy_codes[slot, snapshot.slots_for(ally_ids)], allies, self.SKILL_SYNERGY_RULES
+            )
+            safe_reasons, negative_reasons = self._safety_reasons(hero, safety_code)
 
-        for hero_id in team_picks:
-            hero_analysis = self.evaluate_picked_hero(hero_id, team_picks, enemy_picks)
-            if hero_analysis:
-                standouts.append(hero_analysis)
+            standouts.append({
+                "hero": hero,
+                "lane_fit": preferred_lanes[0] if preferred_lanes else None,
+                "tier": str(tier_context["tier"]),
+                "score": scores[position],
+                "reasons": self._dedupe_reasons(
+                    tier_reasons +
+                    self._counter_reasons(hero, enemy_picks) +
+                    skill_counter_reasons +
+                    self._synergy_reasons(hero, ally_ids) +
+                    skill_synergy_reasons +
+                    self._role_balance_reasons(hero, role_counts, role_code) +
+                    safe_reasons,
+                    4,
+                ),
+                "risks": self._dedupe_reasons(negative_reasons, 3),
+            })
 
-        standouts.sort(key=lambda item: item["score"], reverse=True)
-        return standouts[:top_n]
+        return standouts
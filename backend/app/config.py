@@ -18,7 +18,42 @@ class Settings(BaseSettings):
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
-    
+
+    # Draft suggestion cache (set entries or bytes to 0 to disable)
+    SUGGESTION_CACHE_MAX_ENTRIES: int = 4096
+    SUGGESTION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SUGGESTION_CACHE_TTL_SECONDS: float = 600
+
+    # How often each worker checks the stored ratings version for other workers' writes
+    RATINGS_CHECK_SECONDS: float = 2.0
+
+    # Learned win probability (written by scripts/train_win_model.py)
+    WIN_MODEL_PATH: str = "./win_model.json"
+
+    # /analyze simulation noise bands (uniform, +/-)
+    SIMULATION_TIER_NOISE: float = 1.0  # tier score points
+    SIMULATION_PAIR_NOISE: float = 0.3  # share of each counter/synergy strength
+    SIMULATION_WINRATE_NOISE: float = 2.0  # global win rate percentage points
+
+    # In-memory draft sessions (least recently used are evicted past either cap)
+    DRAFT_SESSION_MAX_SESSIONS: int = 1000
+    DRAFT_SESSION_MAX_BYTES: int = 32 * 1024 * 1024
+    DRAFT_SESSION_IDLE_SECONDS: float = 1800
+
+    # Lookahead budget of the refined /api/draft/stream event (0 to leave it out)
+    DRAFT_STREAM_LOOKAHEAD_MS: int = 150
+
+    # Per-request SQL statement counting (X-SQL-Stats header and route query budgets)
+    SQL_STATS_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 200  # log statements at least this slow (0 to disable)
+    SQL_STRICT_BUDGETS: bool = False  # raise instead of warning when a route exceeds its budget
+
+    # Per-request scoring stage timers (Server-Timing header and a structured log line)
+    STAGE_TIMING_ENABLED: bool = False
+
+    # Prometheus text-format /metrics endpoint and the middleware feeding it
+    METRICS_ENABLED: bool = True
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
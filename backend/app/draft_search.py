@@ -0,0 +1,197 @@
+"""Pick-order-aware lookahead over the remaining picks of a ranked draft.
+
+Candidates for the current pick are searched with minimax and alpha-beta
+pruning over the ranked 1-2-2-2-2-1 pick order. Leaves are scored with
+``DraftAI.score_composition`` (the ``_score_heroes`` components applied to
+every member of a team) as our composition minus the enemy's. Search deepens
+one pick at a time until every remaining pick is simulated or the time
+budget runs out, in which case the deepest fully searched ranking is kept.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.ai_engine import DraftAI
+
+# Side picking at each of the ten pick slots of a ranked draft (1-2-2-2-2-1)
+PICK_ORDER = ("blue", "red", "red", "blue", "blue", "red", "red", "blue", "blue", "red")
+TEAM_SIZE = 5
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+
+DraftState = Tuple[FrozenSet[int], FrozenSet[int]]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@dataclass
+class LookaheadResult:
+    """Root candidates ranked by projected composition edge for the picking side"""
+
+    ranked: List[Tuple[int, float]]
+    greedy_scores: Dict[int, float]
+    depth: int
+    max_depth: int
+    nodes: int = 0
+    transposition_hits: int = 0
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def completed(self) -> bool:
+        return self.depth == self.max_depth
+
+
+def remaining_pick_sides(blue_count: int, red_count: int, current_team: str) -> List[str]:
+    """Sides to pick from now until both teams are full, starting with current_team"""
+    counts = {"blue": blue_count, "red": red_count}
+    if counts[current_team] >= TEAM_SIZE:
+        return []
+
+    sides = [current_team]
+    counts[current_team] += 1
+    for index in range(blue_count + red_count + 1, len(PICK_ORDER)):
+        side = PICK_ORDER[index]
+        if counts[side] >= TEAM_SIZE:
+            side = "red" if side == "blue" else "blue"
+        if counts[side] >= TEAM_SIZE:
+            break
+        sides.append(side)
+        counts[side] += 1
+    return sides
+
+
+@dataclass
+class LookaheadSearch:
+    """Alpha-beta search over the remaining picks, bounded by width and time"""
+
+    ai: DraftAI
+    bans: List[int]
+    blue_picks: List[int]
+    red_picks: List[int]
+    current_team: str = "blue"
+    root_width: int = 8
+    branch_width: int = 4
+    time_budget: float = 0.3
+    max_depth: Optional[int] = None
+    table: Dict[Tuple[DraftState, int], Tuple[int, float]] = field(default_factory=dict)
+    evaluations: Dict[DraftState, float] = field(default_factory=dict)
+
+    def run(self) -> LookaheadResult:
+        started = time.perf_counter()
+        self._deadline = started + self.time_budget
+        self._nodes = 0
+        self._hits = 0
+
+        sides = remaining_pick_sides(len(self.blue_picks), len(self.red_picks), self.current_team)
+        self._sides = sides
+        # Move ordering (and branch selection) comes from one greedy pass per side
+        self._order: Dict[str, List[int]] = {}
+        greedy_scores: Dict[int, float] = {}
+        for side in ("blue", "red"):
+            pool = self.ai._score_heroes(self.bans, self.blue_picks, self.red_picks, side)
+            ordered = pool.top("overall", len(pool))
+            self._order[side] = [pool.heroes[position].id for position in ordered]
+            if side == self.current_team:
+                greedy_scores = {pool.heroes[position].id: pool.overall[position] for position in ordered}
+
+        candidates = self._order[self.current_team][:self.root_width]
+        max_depth = len(sides) if self.max_depth is None else max(1, min(self.max_depth, len(sides)))
+        result = LookaheadResult(
+            ranked=[(hero_id, greedy_scores[hero_id]) for hero_id in candidates],
+            greedy_scores=greedy_scores,
+            depth=0,
+            max_depth=max_depth,
+        )
+
+        root: DraftState = (frozenset(self.blue_picks), frozenset(self.red_picks))
+        sign = 1.0 if self.current_team == "blue" else -1.0
+        for depth in range(1, max_depth + 1):
+            self._depth = depth
+            try:
+                values = {
+                    hero_id: sign * self._search(self._apply(root, self.current_team, hero_id), 1, -math.inf, math.inf)
+                    for hero_id in candidates
+                }
+            except SearchTimeout:
+                result.timed_out = True
+                break
+            # Searching the previous best first makes the next iteration's cutoffs tighter
+            candidates = sorted(candidates, key=lambda hero_id: values[hero_id], reverse=True)
+            result.ranked = [(hero_id, round(values[hero_id], 2)) for hero_id in candidates]
+            result.depth = depth
+
+        result.nodes = self._nodes
+        result.transposition_hits = self._hits
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def _apply(self, state: DraftState, side: str, hero_id: int) -> DraftState:
+        blue, red = state
+        return (blue | {hero_id}, red) if side == "blue" else (blue, red | {hero_id})
+
+    def _search(self, state: DraftState, ply: int, alpha: float, beta: float) -> float:
+        """Blue's composition edge after optimal play to the depth limit"""
+        self._nodes += 1
+        if self._nodes & 7 == 0 and self._depth > 1 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        if ply >= self._depth:
+            return self._evaluate(state)
+
+        key = (state, self._depth - ply)
+        entry = self.table.get(key)
+        if entry is not None:
+            self._hits += 1
+            flag, value = entry
+            if flag == _EXACT:
+                return value
+            if flag == _LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        side = self._sides[ply]
+        taken = state[0] | state[1]
+        moves = [hero_id for hero_id in self._order[side] if hero_id not in taken][:self.branch_width]
+        if not moves:
+            return self._evaluate(state)
+
+        alpha_start, beta_start = alpha, beta
+        maximizing = side == "blue"
+        best = -math.inf if maximizing else math.inf
+        for hero_id in moves:
+            value = self._search(self._apply(state, side, hero_id), ply + 1, alpha, beta)
+            if maximizing:
+                best = max(best, value)
+                alpha = max(alpha, best)
+            else:
+                best = min(best, value)
+                beta = min(beta, best)
+            if alpha >= beta:
+                break
+
+        if best <= alpha_start:
+            flag = _UPPER
+        elif best >= beta_start:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        self.table[key] = (flag, best)
+        return best
+
+    def _evaluate(self, state: DraftState) -> float:
+        value = self.evaluations.get(state)
+        if value is None:
+            blue, red = sorted(state[0]), sorted(state[1])
+            value = self.ai.score_composition(blue, red) - self.ai.score_composition(red, blue)
+            self.evaluations[state] = value
+        return value
@@ -0,0 +1,310 @@
+"""Server-side draft sessions scored by delta.
+
+A session holds one draft in memory. Clients post a single ban or pick and
+the session folds it into running aggregates for each side: role and trait
+counts, plus what every hero slot scores against that side's picks (counters)
+and next to them (synergy). ``DraftSession.context`` hands those aggregates
+to ``DraftAI`` as a ``DraftContext``, so scoring a click costs one column
+per pick instead of a rebuild of the whole team context.
+
+Sessions are kept least recently used first, bounded by count and
+approximate size, and dropped after sitting idle.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.ai_engine import DraftAI, DraftContext
+from app.config import settings
+from app.draft_search import TEAM_SIZE
+from app.knowledge import KnowledgeSnapshot
+
+SIDES = ("blue", "red")
+
+
+class DraftSessionError(ValueError):
+    """A ban or pick that cannot be applied to the session's draft"""
+
+
+@dataclass
+class SideAggregates:
+    """Running totals over one side's picks, in pick order"""
+
+    picks: List[int]
+    heroes: list
+    role_balance_counts: Dict[str, int]
+    trait_counts: Dict[str, int]
+    role_counts: Dict[str, int]
+    counter_scores: np.ndarray  # What every slot scores against these picks
+    skill_counter_scores: np.ndarray
+    synergy_scores: np.ndarray  # What every slot scores next to these picks
+    skill_synergy_scores: np.ndarray
+
+    @classmethod
+    def empty(cls, ai: DraftAI) -> "SideAggregates":
+        count = len(ai.snapshot.hero_ids)
+        return cls(
+            picks=[],
+            heroes=[],
+            role_balance_counts=ai._role_balance_counts([]),
+            trait_counts={},
+            role_counts={},
+            counter_scores=np.zeros(count, dtype=np.float32),
+            skill_counter_scores=np.zeros(count),
+            synergy_scores=np.zeros(count, dtype=np.float32),
+            skill_synergy_scores=np.zeros(count),
+        )
+
+    def add(self, ai: DraftAI, hero) -> None:
+        snapshot = ai.snapshot
+        slot = snapshot.hero_slots[hero.id]
+        self.picks.append(hero.id)
+        self.heroes.append(hero)
+        if hero.role in self.role_balance_counts:
+            self.role_balance_counts[hero.role] += 1
+        for trait in ai.get_hero_traits(hero):
+            self.trait_counts[trait] = self.trait_counts.get(trait, 0) + 1
+        role_name = (hero.role or "").lower()
+        if role_name:
+            self.role_counts[role_name] = self.role_counts.get(role_name, 0) + 1
+
+        self.counter_scores += snapshot.counter_matrix[:, slot]
+        self.skill_counter_scores += ai.SKILL_COUNTER_CODE_SCORES[snapshot.skill_counter_codes[:, slot]]
+        self.synergy_scores += snapshot.synergy_matrix[:, slot]
+        self.skill_synergy_scores += ai.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[:, slot]]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.counter_scores.nbytes + self.skill_counter_scores.nbytes +
+            self.synergy_scores.nbytes + self.skill_synergy_scores.nbytes
+        )
+
+
+@dataclass
+class DraftSession:
+    id: str
+    snapshot: KnowledgeSnapshot
+    bans: List[int] = field(default_factory=list)
+    current_team: str = "blue"
+    available: list = field(default_factory=list)
+    unavailable: Set[int] = field(default_factory=set)
+    sides: Dict[str, SideAggregates] = field(default_factory=dict)
+    last_used: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def start(cls, session_id: str, ai: DraftAI, current_team: str = "blue") -> "DraftSession":
+        session = cls(id=session_id, snapshot=ai.snapshot, current_team=current_team)
+        session.available = [ai.snapshot.heroes[hero_id] for hero_id in ai.snapshot.hero_ids]
+        session.sides = {side: SideAggregates.empty(ai) for side in SIDES}
+        return session
+
+    @property
+    def blue_picks(self) -> List[int]:
+        return self.sides["blue"].picks
+
+    @property
+    def red_picks(self) -> List[int]:
+        return self.sides["red"].picks
+
+    @property
+    def nbytes(self) -> int:
+        return sum(aggregates.nbytes for aggregates in self.sides.values())
+
+    def ban(self, ai: DraftAI, hero_id: int) -> None:
+        self._take(ai, hero_id)
+        self.bans.append(hero_id)
+
+    def pick(self, ai: DraftAI, hero_id: int, team: Optional[str] = None) -> None:
+        team = team or self.current_team
+        if team not in SIDES:
+            raise DraftSessionError(f"Unknown team: {team}")
+        if len(self.sides[team].picks) >= TEAM_SIZE:
+            raise DraftSessionError(f"{team.capitalize()} team already has {TEAM_SIZE} picks")
+        hero = self._take(ai, hero_id)
+        self.sides[team].add(ai, hero)
+
+    def load(self, ai: DraftAI, bans: List[int], blue_picks: List[int], red_picks: List[int]) -> None:
+        """Apply a whole draft state in order: bans, then blue picks, then red picks"""
+        for hero_id in bans:
+            self.ban(ai, hero_id)
+        for team, picks in (("blue", blue_picks), ("red", red_picks)):
+            for hero_id in picks:
+                self.pick(ai, hero_id, team)
+
+    def apply(
+        self,
+        ai: DraftAI,
+        action: Optional[str],
+        hero_id: Optional[int] = None,
+        team: Optional[str] = None,
+        current_team: Optional[str] = None,
+    ) -> None:
+        """Apply one client action, then switch the team to suggest for"""
+        if current_team is not None and current_team not in SIDES:
+            raise DraftSessionError(f"Unknown team: {current_team}")
+        if action == "ban":
+            self.ban(ai, hero_id)
+        elif action == "pick":
+            self.pick(ai, hero_id, team)
+        elif action is not None:
+            raise DraftSessionError(f"Unknown action: {action}")
+        if current_team is not None:
+            self.current_team = current_team
+
+    def context(self, ai: DraftAI) -> DraftContext:
+        team = self.sides[self.current_team]
+        enemy = self.sides["red" if self.current_team == "blue" else "blue"]
+        return DraftContext(
+            team_picks=list(team.picks),
+            enemy_picks=list(enemy.picks),
+            available_heroes=list(self.available),
+            team_heroes=list(team.heroes),
+            enemy_heroes=list(enemy.heroes),
+            role_balance_counts=dict(team.role_balance_counts),
+            team_trait_counts=dict(team.trait_counts),
+            enemy_trait_counts=dict(enemy.trait_counts),
+            team_role_counts=dict(team.role_counts),
+            counter_scores=enemy.counter_scores,
+            skill_counter_scores=enemy.skill_counter_scores,
+            synergy_scores=team.synergy_scores,
+            skill_synergy_scores=team.skill_synergy_scores,
+        )
+
+    def rebase(self, ai: DraftAI) -> None:
+        """Replay the draft against a newer knowledge snapshot, skipping heroes it no longer has"""
+        bans, blue_picks, red_picks = list(self.bans), list(self.blue_picks), list(self.red_picks)
+        fresh = DraftSession.start(self.id, ai, self.current_team)
+        for hero_id in bans:
+            if hero_id in ai.snapshot.heroes and hero_id not in fresh.unavailable:
+                fresh.ban(ai, hero_id)
+        for team, picks in (("blue", blue_picks), ("red", red_picks)):
+            for hero_id in picks:
+                if hero_id in ai.snapshot.heroes and hero_id not in fresh.unavailable:
+                    fresh.pick(ai, hero_id, team)
+        self.snapshot = fresh.snapshot
+        self.bans = fresh.bans
+        self.available = fresh.available
+        self.unavailable = fresh.unavailable
+        self.sides = fresh.sides
+
+    def _take(self, ai: DraftAI, hero_id: int):
+        hero = ai.snapshot.heroes.get(hero_id)
+        if hero is None:
+            raise DraftSessionError(f"Unknown hero: {hero_id}")
+        if hero_id in self.unavailable:
+            raise DraftSessionError(f"{hero.name} is already banned or picked")
+        self.unavailable.add(hero_id)
+        self.available.remove(hero)
+        return hero
+
+
+class DraftSessionStore:
+    """Thread-safe session registry with an LRU memory cap and idle eviction"""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_bytes: int,
+        idle_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, DraftSession]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def create(self, ai: DraftAI, current_team: str = "blue") -> DraftSession:
+        session = DraftSession.start(secrets.token_urlsafe(16), ai, current_team)
+        with self._lock:
+            self._expire()
+            session.last_used = self._clock()
+            self._sessions[session.id] = session
+            self._resize(session)
+            self.created += 1
+            self._evict()
+        return session
+
+    def get(self, session_id: str) -> Optional[DraftSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = self._clock()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def touch(self, session: DraftSession) -> None:
+        """Record a session's size after a change"""
+        with self._lock:
+            if session.id in self._sessions:
+                self._resize(session)
+                self._evict()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id)
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "idle_seconds": self.idle_seconds,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _resize(self, session: DraftSession) -> None:
+        size = session.nbytes
+        self._bytes += size - self._sizes.get(session.id, 0)
+        self._sizes[session.id] = size
+
+    def _expire(self) -> None:
+        if self.idle_seconds <= 0:
+            return
+        cutoff = self._clock() - self.idle_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _evict(self) -> None:
+        while len(self._sessions) > max(self.max_sessions, 1) or (len(self._sessions) > 1 and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._sessions)))
+            self.evictions += 1
+
+    def _remove(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+        self._bytes -= self._sizes.pop(session_id, 0)
+
+
+draft_sessions = DraftSessionStore(
+    max_sessions=settings.DRAFT_SESSION_MAX_SESSIONS,
+    max_bytes=settings.DRAFT_SESSION_MAX_BYTES,
+    idle_seconds=settings.DRAFT_SESSION_IDLE_SECONDS,
+)
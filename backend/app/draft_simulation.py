@@ -0,0 +1,139 @@
+"""Monte Carlo spread of a draft's win probability.
+
+The point estimate from ``/analyze`` rests on knowledge that is only roughly
+right: tier placements, counter and synergy strengths, global win rates.
+Each trial redraws those inputs uniformly within their noise bands and
+measures how much the composition edge (the ``DraftAI.score_composition``
+terms for blue minus red) moves. The point estimate is shifted by that
+amount in log-odds, so a draft resting on many uncertain relationships
+spreads wider than one resting on a few. All trials are evaluated at once
+as arrays over (trial, hero) and (trial, hero, hero).
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from app.ai_engine import DraftAI
+
+# Log-odds per point of composition edge
+LOGIT_PER_SCORE = 0.1
+# Keep the point estimate away from 0 and 1 so its log-odds stay finite
+PROBABILITY_FLOOR = 0.01
+
+
+@dataclass
+class SimulationResult:
+    trials: int
+    seed: int
+    mean: float
+    p5: float
+    p95: float
+    flip_rate: float
+    elapsed_ms: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "trials": self.trials,
+            "seed": self.seed,
+            "mean": self.mean,
+            "p5": self.p5,
+            "p95": self.p95,
+            "flip_rate": self.flip_rate,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+def winrate_values(win_rates: np.ndarray) -> np.ndarray:
+    """``DraftAI.global_winrate_value`` over an array of win rates (NaN for unknown)"""
+    return np.select(
+        [win_rates >= 56, win_rates >= 54, win_rates >= 52, win_rates <= 47, win_rates <= 49],
+        [1.5, 1.1, 0.7, -0.8, -0.3],
+        default=0.0,
+    )
+
+
+@dataclass
+class DraftSimulation:
+    """Seeded trials of the blue win probability around a point estimate"""
+
+    ai: DraftAI
+    blue_picks: List[int]
+    red_picks: List[int]
+    blue_win_probability: float  # Percent, as reported by /analyze
+    trials: int = 2000
+    seed: int = 0
+    tier_noise: float = 1.0  # +/- tier score points
+    pair_noise: float = 0.3  # +/- share of each counter or synergy strength
+    winrate_noise: float = 2.0  # +/- global win rate percentage points
+
+    def run(self) -> SimulationResult:
+        started = time.perf_counter()
+        snapshot = self.ai.snapshot
+        rng = np.random.default_rng(self.seed)
+        blue = snapshot.slots_for(hero.id for hero in self.ai._get_heroes(list(dict.fromkeys(self.blue_picks))))
+        red = snapshot.slots_for(hero.id for hero in self.ai._get_heroes(list(dict.fromkeys(self.red_picks))))
+        shape = (self.trials,)
+
+        # Per-hero terms, signed +1 for blue and -1 for red
+        members = np.concatenate([blue, red])
+        sides = np.concatenate([np.ones(len(blue)), -np.ones(len(red))])
+        win_rates = np.array([
+            np.nan if snapshot.heroes[snapshot.hero_ids[slot]].global_rg_win_rate is None
+            else float(snapshot.heroes[snapshot.hero_ids[slot]].global_rg_win_rate)
+            for slot in members.tolist()
+        ])
+        tier_shift = rng.uniform(-self.tier_noise, self.tier_noise, shape + members.shape)
+        drawn_rates = win_rates + rng.uniform(-self.winrate_noise, self.winrate_noise, shape + members.shape)
+        winrate_shift = winrate_values(drawn_rates) - winrate_values(win_rates)
+        edge_shift = (tier_shift + winrate_shift) @ sides
+
+        # Pair terms: counters across the teams, synergy within each
+        for rows, columns, sign, within in (
+            (blue, red, 1.0, False),
+            (red, blue, -1.0, False),
+            (blue, blue, 1.0, True),
+            (red, red, -1.0, True),
+        ):
+            strengths = self._pair_strengths(rows, columns, within)
+            if strengths.size:
+                noise = rng.uniform(-self.pair_noise, self.pair_noise, shape + strengths.shape)
+                edge_shift += sign * (noise * strengths).sum(axis=(1, 2))
+
+        point = min(max(self.blue_win_probability / 100, PROBABILITY_FLOOR), 1 - PROBABILITY_FLOOR)
+        logits = math.log(point / (1 - point)) + LOGIT_PER_SCORE * edge_shift
+        probabilities = 0.5 * (1.0 + np.tanh(0.5 * logits)) * 100
+
+        blue_leads = self.blue_win_probability >= 50
+        flips = (probabilities >= 50) != blue_leads
+        p5, p95 = np.percentile(probabilities, [5, 95]).tolist()
+        return SimulationResult(
+            trials=self.trials,
+            seed=self.seed,
+            mean=round(float(probabilities.mean()), 1),
+            p5=round(p5, 1),
+            p95=round(p95, 1),
+            flip_rate=round(float(flips.mean()), 4),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    def _pair_strengths(self, rows: np.ndarray, columns: np.ndarray, within: bool) -> np.ndarray:
+        """Score weight of every (row hero, column hero) relationship, as in get_member_scores"""
+        snapshot = self.ai.snapshot
+        pairs = np.ix_(rows, columns)
+        if within:
+            strengths = (
+                snapshot.synergy_matrix[pairs].astype(np.float64) * 1.2 +
+                self.ai.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes[pairs]]
+            )
+            np.fill_diagonal(strengths, 0.0)
+            return strengths
+        return (
+            snapshot.counter_matrix[pairs].astype(np.float64) * 1.5 +
+            self.ai.SKILL_COUNTER_CODE_SCORES[snapshot.skill_counter_codes[pairs]] * 1.1
+        )
@@ -0,0 +1,52 @@
+"""Derived hero features stored alongside each Hero row.
+
+Traits and lane preferences only change when a hero's role, specialty,
+description or skills change, so they are computed when the hero is written
+and read back by the knowledge snapshot instead of re-parsing skills JSON.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Optional
+
+from app.ai_engine import DraftAI
+from app.models import Hero
+
+# Bump whenever trait derivation, TRAIT_NAMES or LANE_PREFERENCES change so
+# stored features are treated as stale until recomputed.
+FEATURE_VERSION = 1
+
+
+def parse_skills(raw_skills: Optional[str]) -> dict:
+    if not raw_skills:
+        return {}
+    try:
+        payload = json.loads(raw_skills)
+    except json.JSONDecodeError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def compute_hero_features(hero: Hero) -> Dict[str, object]:
+    """Derive the stored feature columns for a hero (or any object with the same fields)"""
+    traits = DraftAI.derive_hero_traits(hero, parse_skills(hero.skills))
+    return {
+        "trait_mask": DraftAI.trait_mask(traits),
+        "lane_preferences": json.dumps(DraftAI.base_lane_preferences(hero)),
+        "feature_version": FEATURE_VERSION,
+    }
+
+
+def apply_hero_features(hero: Hero) -> None:
+    """Recompute and set the feature columns on a hero before it is committed"""
+    for field, value in compute_hero_features(hero).items():
+        setattr(hero, field, value)
+
+
+def features_are_current(hero: Hero) -> bool:
+    return hero.feature_version == FEATURE_VERSION and hero.trait_mask is not None and hero.lane_preferences is not None
+
+
+def stored_lane_preferences(hero: Hero) -> List[str]:
+    return json.loads(hero.lane_preferences)
@@ -0,0 +1,312 @@
+"""Online Elo-style ratings learned from saved drafts.
+
+Every draft saved with a winner nudges three tables, all in Elo points: a
+rating per hero, a bonus per pair of allies and an edge per pair of
+opponents. The expected blue score combines the team means of all three,
+and every hero and pair in the draft moves by its K factor times the
+surprise, so one update touches O(team size²) rows and history is never
+rescanned.
+
+Rows live in ``hero_ratings`` and ``hero_pair_ratings``. ``RatingTable`` keeps
+a copy indexed by knowledge snapshot slot, converted to score units, for
+``DraftAI`` to read.
+
+Every write first bumps the single ``ratings_version`` row. The update
+holds that row's lock until commit, so writes from any worker are
+serialised and each one reads the ratings the previous one committed. Each
+worker compares its table against the stored version at most every
+RATINGS_CHECK_SECONDS and reloads when another worker has written.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.knowledge import KnowledgeSnapshot
+from app.models import HeroPairRating, HeroRating, RatingsVersion
+
+BASE_RATING = 1500.0
+HERO_K_FACTOR = 24.0
+PAIR_K_FACTOR = 12.0
+ALLY = "ally"
+OPPONENT = "opponent"
+
+# 40 points is roughly a 56% win rate, the top global win rate bonus
+POINTS_PER_SCORE = 40.0
+# Ratings are shrunk toward zero until a hero or pair has a few games
+PRIOR_GAMES = 10
+HERO_SCORE_LIMIT = 1.5
+PAIR_SCORE_LIMIT = 1.0
+
+PairKey = Tuple[int, int]
+
+
+def expected_score(difference: float) -> float:
+    """Elo expected score for a rating difference in points"""
+    return 1.0 / (1.0 + 10.0 ** (-difference / 400.0))
+
+
+def pair_key(first: int, second: int) -> PairKey:
+    return (first, second) if first < second else (second, first)
+
+
+@dataclass(frozen=True)
+class RatingUpdate:
+    """New (rating, games) of everything one saved draft touched"""
+
+    heroes: Dict[int, Tuple[float, int]]
+    allies: Dict[PairKey, Tuple[float, int]]
+    opponents: Dict[PairKey, Tuple[float, int]]
+    expected_blue: float
+    stored_version: int  # ratings_version after this write
+
+
+def _team(hero_ids: Iterable[int], snapshot: KnowledgeSnapshot) -> List[int]:
+    return [hero_id for hero_id in dict.fromkeys(hero_ids) if hero_id in snapshot.hero_slots]
+
+
+def _ally_keys(team: Sequence[int]) -> List[PairKey]:
+    return [pair_key(team[i], team[j]) for i in range(len(team)) for j in range(i + 1, len(team))]
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def stored_ratings_version(db: Session) -> int:
+    return db.execute(select(RatingsVersion.version).where(RatingsVersion.id == 1)).scalar() or 0
+
+
+def bump_ratings_version(db: Session) -> int:
+    """Lock rating writes until the session commits and return the new stored version.
+
+    Call before reading rating rows that are about to change, or before
+    deleting them, so other workers wait and then reload.
+    """
+    bumped = db.execute(
+        update(RatingsVersion).where(RatingsVersion.id == 1).values(version=RatingsVersion.version + 1)
+    )
+    if bumped.rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.add(RatingsVersion(id=1, version=1))
+            return 1
+        except IntegrityError:
+            # Another worker created the row first; its lock is now ours to wait for
+            return bump_ratings_version(db)
+    return stored_ratings_version(db)
+
+
+def record_draft_result(
+    db: Session,
+    snapshot: KnowledgeSnapshot,
+    blue_picks: Iterable[int],
+    red_picks: Iterable[int],
+    winner: Optional[str],
+) -> Optional[RatingUpdate]:
+    """Apply one result to the rating rows in the session; the caller commits.
+
+    Returns None when the draft carries no usable signal (no winner, an empty
+    side, or a hero on both sides). Otherwise rating writes stay locked for
+    every worker until the caller commits or rolls back.
+    """
+    blue = _team(blue_picks, snapshot)
+    red = _team(red_picks, snapshot)
+    if winner not in ("blue", "red") or not blue or not red or set(blue) & set(red):
+        return None
+
+    stored_version = bump_ratings_version(db)
+
+    hero_ids = blue + red
+    hero_rows = {row.hero_id: row for row in db.query(HeroRating).filter(HeroRating.hero_id.in_(hero_ids))}
+    for hero_id in hero_ids:
+        if hero_id not in hero_rows:
+            hero_rows[hero_id] = HeroRating(hero_id=hero_id, rating=BASE_RATING, games=0, wins=0)
+            db.add(hero_rows[hero_id])
+
+    wanted = {(key, ALLY) for key in _ally_keys(blue) + _ally_keys(red)}
+    wanted |= {(pair_key(blue_id, red_id), OPPONENT) for blue_id in blue for red_id in red}
+    pair_rows = {
+        ((row.hero_1_id, row.hero_2_id), row.relation): row
+        for row in db.query(HeroPairRating).filter(
+            HeroPairRating.hero_1_id.in_(hero_ids),
+            HeroPairRating.hero_2_id.in_(hero_ids),
+        )
+        if ((row.hero_1_id, row.hero_2_id), row.relation) in wanted
+    }
+    for key, relation in wanted:
+        if (key, relation) not in pair_rows:
+            row = HeroPairRating(hero_1_id=key[0], hero_2_id=key[1], relation=relation, rating=0.0, games=0, wins=0)
+            pair_rows[(key, relation)] = row
+            db.add(row)
+
+    def opponent_edge(blue_id: int, red_id: int) -> Tuple[HeroPairRating, float]:
+        """Row of a blue/red matchup and the sign that turns it to blue's view"""
+        key = pair_key(blue_id, red_id)
+        return pair_rows[(key, OPPONENT)], 1.0 if key[0] == blue_id else -1.0
+
+    matchups = [opponent_edge(blue_id, red_id) for blue_id in blue for red_id in red]
+    difference = (
+        _mean([hero_rows[hero_id].rating for hero_id in blue]) -
+        _mean([hero_rows[hero_id].rating for hero_id in red]) +
+        _mean([pair_rows[(key, ALLY)].rating for key in _ally_keys(blue)]) -
+        _mean([pair_rows[(key, ALLY)].rating for key in _ally_keys(red)]) +
+        _mean([row.rating * sign for row, sign in matchups])
+    )
+    expected_blue = expected_score(difference)
+    blue_won = winner == "blue"
+    surprise = (1.0 if blue_won else 0.0) - expected_blue
+
+    for team, sign, won in ((blue, 1.0, blue_won), (red, -1.0, not blue_won)):
+        for hero_id in team:
+            row = hero_rows[hero_id]
+            row.rating += sign * HERO_K_FACTOR * surprise
+            row.games += 1
+            row.wins += int(won)
+        for key in _ally_keys(team):
+            row = pair_rows[(key, ALLY)]
+            row.rating += sign * PAIR_K_FACTOR * surprise
+            row.games += 1
+            row.wins += int(won)
+    for row, sign in matchups:
+        row.rating += sign * PAIR_K_FACTOR * surprise
+        row.games += 1
+        row.wins += int(blue_won == (sign > 0))
+
+    return RatingUpdate(
+        heroes={hero_id: (row.rating, row.games) for hero_id, row in hero_rows.items()},
+        allies={key: (row.rating, row.games) for (key, relation), row in pair_rows.items() if relation == ALLY},
+        opponents={key: (row.rating, row.games) for (key, relation), row in pair_rows.items() if relation == OPPONENT},
+        expected_blue=expected_blue,
+        stored_version=stored_version,
+    )
+
+
+def rating_score(points: float, games: int, limit: float) -> float:
+    """Rating points in DraftAI score units, shrunk while games are few"""
+    score = points * games / (games + PRIOR_GAMES) / POINTS_PER_SCORE
+    return max(-limit, min(limit, score))
+
+
+class RatingTable:
+    """Ratings of one knowledge snapshot's heroes, by slot, in score units.
+
+    ``ally_scores[i, j]`` is what hero slot ``i`` gains next to ``j`` and
+    ``versus_scores[i, j]`` what it gains against ``j`` (the negation of
+    ``[j, i]``). Updates write only the cells of the heroes in the draft and
+    bump ``version``; readers are not locked, so a read racing an update may
+    see part of it. ``stored_version`` is the ratings_version the cells
+    reflect.
+    """
+
+    def __init__(self, snapshot: KnowledgeSnapshot, version: int = 0, stored_version: int = 0):
+        count = len(snapshot.hero_ids)
+        self.snapshot = snapshot
+        self.version = version
+        self.stored_version = stored_version
+        self.hero_points = np.zeros(count)
+        self.hero_games = np.zeros(count, dtype=np.int64)
+        self.hero_scores = np.zeros(count)
+        self.ally_scores = np.zeros((count, count))
+        self.versus_scores = np.zeros((count, count))
+
+    def set_hero(self, hero_id: int, rating: float, games: int) -> None:
+        slot = self.snapshot.hero_slots.get(hero_id)
+        if slot is None:
+            return
+        self.hero_points[slot] = rating - BASE_RATING
+        self.hero_games[slot] = games
+        self.hero_scores[slot] = rating_score(rating - BASE_RATING, games, HERO_SCORE_LIMIT)
+
+    def set_pair(self, key: PairKey, relation: str, rating: float, games: int) -> None:
+        first = self.snapshot.hero_slots.get(key[0])
+        second = self.snapshot.hero_slots.get(key[1])
+        if first is None or second is None:
+            return
+        score = rating_score(rating, games, PAIR_SCORE_LIMIT)
+        if relation == ALLY:
+            self.ally_scores[first, second] = self.ally_scores[second, first] = score
+        else:
+            self.versus_scores[first, second] = score
+            self.versus_scores[second, first] = -score
+
+    def apply(self, update: RatingUpdate) -> None:
+        for hero_id, (rating, games) in update.heroes.items():
+            self.set_hero(hero_id, rating, games)
+        for key, (rating, games) in update.allies.items():
+            self.set_pair(key, ALLY, rating, games)
+        for key, (rating, games) in update.opponents.items():
+            self.set_pair(key, OPPONENT, rating, games)
+        self.version += 1
+        # A gap means another worker wrote in between; leave the table stale so the next check reloads it
+        if update.stored_version == self.stored_version + 1:
+            self.stored_version = update.stored_version
+
+    def scores(self, slots: np.ndarray, team_slots: np.ndarray, enemy_slots: np.ndarray) -> np.ndarray:
+        """Hero rating plus ally bonuses with the team and edges over the enemy, per slot"""
+        return (
+            self.hero_scores[slots] +
+            self.ally_scores[np.ix_(slots, team_slots)].sum(axis=1) +
+            self.versus_scores[np.ix_(slots, enemy_slots)].sum(axis=1)
+        )
+
+
+def load_rating_table(db: Session, snapshot: KnowledgeSnapshot, version: int = 0) -> RatingTable:
+    """Read every stored rating into a table for the given snapshot"""
+    # Read the version first: a write committing meanwhile only makes the rows newer than it
+    table = RatingTable(snapshot, version, stored_ratings_version(db))
+    for row in db.query(HeroRating).all():
+        table.set_hero(row.hero_id, row.rating, row.games)
+    for row in db.query(HeroPairRating).all():
+        table.set_pair((row.hero_1_id, row.hero_2_id), row.relation, row.rating, row.games)
+    return table
+
+
+_table_lock = threading.Lock()
+_current_table: Optional[RatingTable] = None
+_checked_at = 0.0  # time.monotonic() of the last stored version check
+
+
+def get_rating_table(snapshot: KnowledgeSnapshot) -> RatingTable:
+    """The in-memory table for the given snapshot.
+
+    Reloaded when the snapshot changes, or when a check of the stored
+    version (at most every RATINGS_CHECK_SECONDS) finds another worker's
+    write. A reload bumps ``version``, which invalidates cached suggestions.
+    """
+    global _current_table, _checked_at
+
+    table = _current_table
+    if table is not None and table.snapshot is snapshot and time.monotonic() - _checked_at < settings.RATINGS_CHECK_SECONDS:
+        return table
+
+    with _table_lock:
+        table = _current_table
+        if table is not None and table.snapshot is snapshot and time.monotonic() - _checked_at < settings.RATINGS_CHECK_SECONDS:
+            return table
+        db = SessionLocal()
+        try:
+            if table is None or table.snapshot is not snapshot or table.stored_version != stored_ratings_version(db):
+                version = table.version + 1 if table is not None else 0
+                _current_table = load_rating_table(db, snapshot, version)
+        finally:
+            db.close()
+        _checked_at = time.monotonic()
+        return _current_table
+
+
+def apply_rating_update(update: RatingUpdate) -> None:
+    """Mirror committed rating rows into the in-memory table"""
+    with _table_lock:
+        if _current_table is not None:
+            _current_table.apply(update)
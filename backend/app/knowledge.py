@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.ai_engine import DraftAI
+from app.database import SessionLocal
+from app.hero_features import compute_hero_features, features_are_current, stored_lane_preferences
+from app.models import Counter, Hero, Synergy, TierList, TierListEntry
+
+
+@dataclass(frozen=True)
+class HeroRecord:
+    """Detached, read-only copy of a Hero row"""
+
+    id: int
+    name: str
+    role: str
+    secondary_role: Optional[str]
+    image_url: Optional[str]
+    specialty: Optional[str]
+    description: Optional[str]
+    skills: Optional[str]
+    global_rg_win_rate: Optional[float]
+    global_rg_source: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, hero: Hero) -> "HeroRecord":
+        return cls(
+            id=hero.id,
+            name=hero.name,
+            role=hero.role,
+            secondary_role=hero.secondary_role,
+            image_url=hero.image_url,
+            specialty=hero.specialty,
+            description=hero.description,
+            skills=hero.skills,
+            global_rg_win_rate=hero.global_rg_win_rate,
+            global_rg_source=hero.global_rg_source,
+            created_at=hero.created_at,
+            updated_at=hero.updated_at,
+        )
+
+
+@dataclass(frozen=True)
+class TierEntryRecord:
+    """An entry of an active tier list, flattened with its lane and version"""
+
+    hero_id: int
+    lane: str
+    tier: str
+    notes: Optional[str]
+    version: str
+
+
+# (other hero id, strength) pairs, kept in row id order
+Adjacency = Dict[int, Tuple[Tuple[int, str], ...]]
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """Everything DraftAI needs to score a draft, loaded in one pass.
+
+    Snapshots are never mutated. Admin writes build a new one and swap it in
+    through ``refresh_knowledge_snapshot``.
+
+    Heroes are also numbered by slot (their position in ``hero_ids``) so the
+    weighted counter and synergy relationships can be held as dense matrices:
+    ``counter_matrix[i, j]`` is what hero slot ``i`` scores against an enemy in
+    slot ``j`` and ``synergy_matrix[i, j]`` what it scores next to an ally.
+    The skill code tables hold, per slot pair, the bitmask of
+    ``DraftAI.SKILL_SYNERGY_RULES`` / ``SKILL_COUNTER_RULES`` that fire.
+    ``base_tier_scores`` and ``winrate_scores`` are the per-slot tier score
+    (at the hero's first lane, before team context) and global win rate score;
+    ``base_tier_values`` is the plain ``TIER_SCORES`` value of that tier.
+    """
+
+    version: int
+    built_at: datetime
+    hero_ids: Tuple[int, ...]
+    hero_slots: Dict[int, int]
+    heroes: Dict[int, HeroRecord]
+    traits: Dict[int, FrozenSet[str]]
+    lane_preferences: Dict[int, Tuple[str, ...]]
+    tier_entries: Dict[int, Tuple[TierEntryRecord, ...]]
+    counters: Adjacency  # hero id -> heroes it counters
+    countered_by: Adjacency  # hero id -> heroes that counter it
+    synergies: Adjacency  # hero id -> synergy partners, both directions
+    counter_matrix: np.ndarray
+    synergy_matrix: np.ndarray
+    trait_masks: np.ndarray
+    skill_synergy_codes: np.ndarray
+    skill_counter_codes: np.ndarray
+    base_tier_scores: np.ndarray
+    base_tier_values: np.ndarray
+    winrate_scores: np.ndarray
+
+    def pick_mask(self, hero_ids: Iterable[int]) -> np.ndarray:
+        """0/1 vector over hero slots marking the given heroes"""
+        mask = np.zeros(len(self.hero_ids), dtype=np.float32)
+        slots = [self.hero_slots[hero_id] for hero_id in hero_ids if hero_id in self.hero_slots]
+        mask[slots] = 1.0
+        return mask
+
+    def slots_for(self, hero_ids: Iterable[int]) -> np.ndarray:
+        return np.fromiter((self.hero_slots[hero_id] for hero_id in hero_ids), dtype=np.intp)
+
+
+def build_knowledge_snapshot(db: Session, version: int = 1) -> KnowledgeSnapshot:
+    """Load heroes, tier lists, counters and synergies into a new snapshot"""
+    heroes: Dict[int, HeroRecord] = {}
+    masks: Dict[int, int] = {}
+    lane_preferences: Dict[int, Tuple[str, ...]] = {}
+
+    for hero in db.query(Hero).order_by(Hero.id).all():
+        heroes[hero.id] = HeroRecord.from_model(hero)
+        if features_are_current(hero):
+            masks[hero.id] = hero.trait_mask
+            lane_preferences[hero.id] = tuple(stored_lane_preferences(hero))
+        else:
+            # Rows written before features existed, or by an older FEATURE_VERSION
+            masks[hero.id] = compute_hero_features(hero)["trait_mask"]
+            lane_preferences[hero.id] = tuple(DraftAI.base_lane_preferences(hero))
+
+    tier_entries: Dict[int, list] = {}
+    active_entries = db.query(TierListEntry, TierList).join(TierList).filter(
+        TierList.is_active == True
+    ).order_by(TierListEntry.id).all()
+    for entry, tier_list in active_entries:
+        tier_entries.setdefault(entry.hero_id, []).append(TierEntryRecord(
+            hero_id=entry.hero_id,
+            lane=tier_list.lane,
+            tier=entry.tier,
+            notes=entry.notes,
+            version=tier_list.version,
+        ))
+
+    hero_ids = tuple(heroes)
+    hero_slots = {hero_id: slot for slot, hero_id in enumerate(hero_ids)}
+    counter_matrix = np.zeros((len(hero_ids), len(hero_ids)), dtype=np.float32)
+    synergy_matrix = np.zeros((len(hero_ids), len(hero_ids)), dtype=np.float32)
+
+    counters: Dict[int, list] = {}
+    countered_by: Dict[int, list] = {}
+    for counter in db.query(Counter).order_by(Counter.id).all():
+        counters.setdefault(counter.countered_by_id, []).append((counter.hero_id, counter.strength))
+        countered_by.setdefault(counter.hero_id, []).append((counter.countered_by_id, counter.strength))
+
+        target = hero_slots.get(counter.hero_id)
+        counterer = hero_slots.get(counter.countered_by_id)
+        if target is not None and counterer is not None:
+            bonus = DraftAI.COUNTER_BONUS.get(counter.strength, 1.0)
+            counter_matrix[counterer, target] += bonus
+            counter_matrix[target, counterer] -= bonus * 0.5
+
+    synergies: Dict[int, list] = {}
+    for synergy in db.query(Synergy).order_by(Synergy.id).all():
+        synergies.setdefault(synergy.hero_1_id, []).append((synergy.hero_2_id, synergy.strength))
+        if synergy.hero_2_id != synergy.hero_1_id:
+            synergies.setdefault(synergy.hero_2_id, []).append((synergy.hero_1_id, synergy.strength))
+
+        first = hero_slots.get(synergy.hero_1_id)
+        second = hero_slots.get(synergy.hero_2_id)
+        if first is not None and second is not None:
+            bonus = DraftAI.SYNERGY_BONUS.get(synergy.strength, 0.5)
+            synergy_matrix[first, second] += bonus
+            if first != second:
+                synergy_matrix[second, first] += bonus
+
+    trait_masks = np.array([masks[hero_id] for hero_id in hero_ids], dtype=np.int64)
+    skill_synergy_codes = DraftAI.build_pair_codes(trait_masks, DraftAI.SKILL_SYNERGY_MASKS)
+    skill_counter_codes = DraftAI.build_pair_codes(trait_masks, DraftAI.SKILL_COUNTER_MASKS)
+
+    base_tiers = [
+        DraftAI.select_tier_entry(tuple(tier_entries.get(hero_id, ())), list(lane_preferences[hero_id]))
+        for hero_id in hero_ids
+    ]
+    base_tier_scores = np.array([score for _, score, _ in base_tiers], dtype=np.float64)
+    base_tier_values = np.array([
+        DraftAI.TIER_SCORES.get(entry.tier if entry else "C", 2) for entry, _, _ in base_tiers
+    ], dtype=np.float64)
+    winrate_scores = np.array([DraftAI.global_winrate_value(heroes[hero_id]) for hero_id in hero_ids], dtype=np.float64)
+
+    for array in (
+        counter_matrix, synergy_matrix, trait_masks, skill_synergy_codes, skill_counter_codes,
+        base_tier_scores, base_tier_values, winrate_scores,
+    ):
+        array.setflags(write=False)
+
+    return KnowledgeSnapshot(
+        version=version,
+        built_at=datetime.utcnow(),
+        hero_ids=hero_ids,
+        hero_slots=hero_slots,
+        heroes=heroes,
+        traits={hero_id: DraftAI.traits_from_mask(mask) for hero_id, mask in masks.items()},
+        lane_preferences=lane_preferences,
+        tier_entries={hero_id: tuple(entries) for hero_id, entries in tier_entries.items()},
+        counters={hero_id: tuple(items) for hero_id, items in counters.items()},
+        countered_by={hero_id: tuple(items) for hero_id, items in countered_by.items()},
+        synergies={hero_id: tuple(items) for hero_id, items in synergies.items()},
+        counter_matrix=counter_matrix,
+        synergy_matrix=synergy_matrix,
+        trait_masks=trait_masks,
+        skill_synergy_codes=skill_synergy_codes,
+        skill_counter_codes=skill_counter_codes,
+        base_tier_scores=base_tier_scores,
+        base_tier_values=base_tier_values,
+        winrate_scores=winrate_scores,
+    )
+
+
+_snapshot_lock = threading.RLock()
+_current_snapshot: Optional[KnowledgeSnapshot] = None
+
+
+def get_knowledge_snapshot() -> KnowledgeSnapshot:
+    """Return the current snapshot, building it on first use"""
+    snapshot = _current_snapshot
+    if snapshot is not None:
+        return snapshot
+
+    with _snapshot_lock:
+        if _current_snapshot is not None:
+            return _current_snapshot
+        db = SessionLocal()
+        try:
+            return refresh_knowledge_snapshot(db)
+        finally:
+            db.close()
+
+
+def refresh_knowledge_snapshot(db: Session) -> KnowledgeSnapshot:
+    """Rebuild the snapshot from the database and swap it in atomically"""
+    global _current_snapshot
+
+    with _snapshot_lock:
+        version = _current_snapshot.version + 1 if _current_snapshot is not None else 1
+        snapshot = build_knowledge_snapshot(db, version)
+        _current_snapshot = snapshot
+    return snapshot
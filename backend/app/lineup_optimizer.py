@@ -0,0 +1,133 @@
+"""Best full five-hero lineups reachable from a partial team.
+
+Lineups are grown one hero at a time with beam search. Each step scores
+every open hero for every lineup in the beam with vector operations: the
+hero's own value (tier, global win rate, counters against the enemy picks),
+its pairwise synergy with the heroes already in the lineup, and the role
+balance it adds. Saved-draft ratings, when present, add to both.
+Surviving full lineups are then rescored exactly with
+``DraftAI.score_composition`` plus the strengths and weaknesses found by
+``DraftAI.analyze_team``.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.ai_engine import DraftAI
+from app.draft_search import TEAM_SIZE
+
+
+@dataclass
+class LineupResult:
+    hero_ids: List[int]
+    score: float
+    analysis: Dict
+
+
+@dataclass
+class LineupOptimizer:
+    """Beam search over completions of the current team"""
+
+    ai: DraftAI
+    bans: List[int]
+    blue_picks: List[int]
+    red_picks: List[int]
+    current_team: str = "blue"
+    beam_width: int = 48
+
+    def run(self, top_k: int = 5) -> Tuple[List[LineupResult], int]:
+        """Return the top_k lineups and the number of partial lineups scored"""
+        if self.current_team not in ("blue", "red"):
+            raise ValueError(f"Unknown team: {self.current_team}")
+        snapshot = self.ai.snapshot
+        team_picks = self.blue_picks if self.current_team == "blue" else self.red_picks
+        enemy_picks = self.red_picks if self.current_team == "blue" else self.blue_picks
+        team_picks = [hero_id for hero_id in dict.fromkeys(team_picks) if hero_id in snapshot.hero_slots]
+
+        available = self.ai.get_available_heroes(self.bans, self.blue_picks, self.red_picks)
+        open_mask = np.zeros(len(snapshot.hero_ids), dtype=bool)
+        open_mask[snapshot.slots_for(hero.id for hero in available)] = True
+
+        hero_values, pair_values = self._value_tables(available, enemy_picks)
+        role_groups = self._role_groups()
+        heroes_by_slot = [snapshot.heroes[hero_id] for hero_id in snapshot.hero_ids]
+
+        start = tuple(snapshot.hero_slots[hero_id] for hero_id in team_picks)
+        beam: List[Tuple[float, Tuple[int, ...]]] = [(0.0, start)]
+        scored = 0
+
+        for _ in range(max(0, TEAM_SIZE - len(start))):
+            expansions: Dict[frozenset, Tuple[float, Tuple[int, ...]]] = {}
+            for value, lineup in beam:
+                gains = hero_values + pair_values[list(lineup)].sum(axis=0) if lineup else hero_values.copy()
+                role_counts = self.ai._role_balance_counts([heroes_by_slot[slot] for slot in lineup])
+                for representative, slots in role_groups:
+                    gains[slots] += self.ai._role_balance(representative, role_counts)[0] * 0.8
+
+                mask = open_mask.copy()
+                mask[list(lineup)] = False
+                candidates = np.flatnonzero(mask)
+                scored += len(candidates)
+                if len(candidates) > self.beam_width:
+                    candidates = candidates[np.argpartition(-gains[candidates], self.beam_width - 1)[:self.beam_width]]
+
+                for slot in candidates.tolist():
+                    key = frozenset(lineup + (slot,))
+                    total = value + float(gains[slot])
+                    if key not in expansions or total > expansions[key][0]:
+                        expansions[key] = (total, lineup + (slot,))
+
+            if not expansions:
+                break
+            beam = heapq.nlargest(self.beam_width, expansions.values(), key=lambda item: item[0])
+
+        results = []
+        for _, lineup in beam:
+            hero_ids = [snapshot.hero_ids[slot] for slot in lineup]
+            analysis = self.ai.analyze_team(hero_ids)
+            score = self.ai.score_composition(hero_ids, enemy_picks) + len(analysis["strengths"]) - len(analysis["weaknesses"])
+            results.append(LineupResult(hero_ids=hero_ids, score=round(score, 2), analysis=analysis))
+
+        return heapq.nlargest(top_k, results, key=lambda result: result.score), scored
+
+    def _value_tables(self, available, enemy_picks: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-slot hero values and the symmetric pairwise synergy value of every slot pair"""
+        snapshot = self.ai.snapshot
+        count = len(snapshot.hero_ids)
+        enemy_slots = snapshot.slots_for(hero.id for hero in self.ai._get_heroes(enemy_picks))
+
+        hero_values = (
+            (snapshot.counter_matrix[:, enemy_slots].astype(np.float64) * 1.5).sum(axis=1) +
+            self.ai.SKILL_COUNTER_CODE_SCORES[snapshot.skill_counter_codes[:, enemy_slots]].sum(axis=1) * 1.1
+        )
+        for hero in available:
+            slot = snapshot.hero_slots[hero.id]
+            preferred_lanes = self.ai._get_lane_preferences(hero, [], [])
+            hero_values[slot] += self.ai._select_tier_entry(hero, preferred_lanes)[1] + self.ai.global_winrate_value(hero)
+
+        synergy = snapshot.synergy_matrix.astype(np.float64) * 1.2
+        skill_synergy = self.ai.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes]
+        pair_values = synergy + synergy.T + skill_synergy + skill_synergy.T
+
+        ratings = self.ai.ratings
+        if ratings is not None:
+            hero_values = hero_values + ratings.hero_scores + ratings.versus_scores[:, enemy_slots].sum(axis=1)
+            pair_values += ratings.ally_scores * 2
+        pair_values[np.diag_indices(count)] = 0.0
+        return hero_values, pair_values
+
+    def _role_groups(self) -> List[Tuple[object, np.ndarray]]:
+        """One representative hero and the slots of every hero sharing its role"""
+        snapshot = self.ai.snapshot
+        groups: Dict[str, List[int]] = {}
+        for slot, hero_id in enumerate(snapshot.hero_ids):
+            groups.setdefault(snapshot.heroes[hero_id].role, []).append(slot)
+        return [
+            (snapshot.heroes[snapshot.hero_ids[slots[0]]], np.array(slots, dtype=np.intp))
+            for slots in groups.values()
+        ]
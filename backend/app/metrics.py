@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import weakref
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ((label, value), ...) in a fixed order per metric
+Labels = Tuple[Tuple[str, str], ...]
+# (metric name with any suffix, labels, value)
+Sample = Tuple[str, Labels, float]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HEROES_SCORED_BUCKETS = (0, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+
+class _Shard:
+    """One thread's counters and histograms; only that thread writes to it"""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # Per-bucket counts (not cumulative), the overflow count, then the sum
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def add(self, other: "_Shard") -> None:
+        # list() over a dict runs without releasing the GIL, so it cannot see a resize
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0.0) + value
+        for key, counts in list(other.histograms.items()):
+            total = self.histograms.setdefault(key, [0.0] * len(counts))
+            for index, count in enumerate(list(counts)):
+                total[index] += count
+
+
+class _ThreadToken:
+    """Lives in a thread's locals only, so it is freed when the thread exits"""
+
+    __slots__ = ("__weakref__",)
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms rendered in the Prometheus text format.
+
+    Each thread records into its own shard, so the hot paths never take a
+    lock; a scrape sums the shards. When a thread exits, its shard is queued
+    and later folded into a base shard, so a threadpool that replaces its
+    threads does not grow the list. Gauges are counters that also go down.
+    Collectors add counter and gauge samples read at scrape time, such as
+    pool and cache stats. Every worker process has its own registry and
+    reports its own numbers.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._base = _Shard()  # Totals of threads that have exited
+        self._retired: List[_Shard] = []  # Shards of exited threads, not yet folded into the base
+        self._shards_lock = threading.Lock()  # Taken by a thread's first record and by scrapes
+        self._metadata: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: Optional[Sequence[float]] = None) -> None:
+        self._metadata[name] = (kind, help_text)
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = self._buckets[name]
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0.0] * (len(buckets) + 2)
+        counts[bisect.bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self) -> str:
+        totals = _Shard()
+        with self._shards_lock:
+            self._fold_retired()
+            totals.add(self._base)
+            for shard in self._shards:
+                totals.add(shard)
+
+        samples: Dict[str, List[Sample]] = {}
+        for (name, labels), value in totals.counters.items():
+            samples.setdefault(name, []).append((name, labels, value))
+        for (name, labels), counts in totals.histograms.items():
+            samples.setdefault(name, []).extend(self._histogram_samples(name, labels, counts))
+        for collector in self._collectors:
+            for sample in collector():
+                samples.setdefault(sample[0], []).append(sample)
+
+        lines = []
+        for family in sorted(samples):
+            kind, help_text = self._metadata.get(family, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for name, labels, value in samples[family]:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _histogram_samples(self, name: str, labels: Labels, counts: List[float]) -> Iterable[Sample]:
+        cumulative = 0.0
+        for bound, count in zip(self._buckets[name] + (math.inf,), counts[:-1]):
+            cumulative += count
+            yield f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+        yield f"{name}_sum", labels, counts[-1]
+        yield f"{name}_count", labels, cumulative
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            token = self._local.token = _ThreadToken()
+            # The callback may run in any thread, so it only queues the shard; list.append is atomic
+            weakref.finalize(token, self._retired.append, shard).atexit = False
+            with self._shards_lock:
+                self._fold_retired()
+                self._shards.append(shard)
+        return shard
+
+    def _fold_retired(self) -> None:
+        """Move exited threads' totals into the base shard; the caller holds _shards_lock"""
+        while self._retired:
+            shard = self._retired.pop()
+            self._base.add(shard)
+            self._shards.remove(shard)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
+metrics.describe("mldraft_http_requests_total", "counter", "HTTP requests by method, route and status code.")
+metrics.describe(
+    "mldraft_http_request_duration_seconds", "histogram", "HTTP request latency by method and route.",
+    buckets=LATENCY_BUCKETS,
+)
+metrics.describe("mldraft_http_requests_in_flight", "gauge", "HTTP requests being served.")
+metrics.describe("mldraft_heroes_scored_total", "counter", "Candidate heroes scored by the draft engine.")
+metrics.describe(
+    "mldraft_heroes_scored_per_request", "histogram", "Candidate heroes scored while serving one request.",
+    buckets=HEROES_SCORED_BUCKETS,
+)
+
+_request_heroes_scored: ContextVar[Optional[List[int]]] = ContextVar("request_heroes_scored", default=None)
+
+
+def track_heroes_scored() -> List[int]:
+    """Start a per-request tally of heroes scored; the middleware reads it back"""
+    tally = [0]
+    _request_heroes_scored.set(tally)
+    return tally
+
+
+def record_heroes_scored(count: int) -> None:
+    metrics.inc("mldraft_heroes_scored_total", value=count)
+    tally = _request_heroes_scored.get()
+    if tally is not None:
+        tally[0] += count
+
+
+def instrument_pool(engine: Engine) -> None:
+    """Count pool checkouts and report pool size, checked-out and overflow connections at scrape time"""
+    metrics.describe("mldraft_db_pool_checkouts_total", "counter", "Connections checked out of the SQLAlchemy pool.")
+    metrics.describe("mldraft_db_pool_size", "gauge", "Configured size of the SQLAlchemy pool.")
+    metrics.describe("mldraft_db_pool_checked_out", "gauge", "Connections currently checked out of the pool.")
+    metrics.describe("mldraft_db_pool_overflow", "gauge", "Connections open beyond the pool size (negative while below it).")
+
+    @event.listens_for(engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.inc("mldraft_db_pool_checkouts_total")
+
+    def pool_samples() -> Iterable[Sample]:
+        pool = engine.pool
+        # Only QueuePool tracks these; SQLite memory databases use pools that do not
+        for name, method in (
+            ("mldraft_db_pool_size", "size"),
+            ("mldraft_db_pool_checked_out", "checkedout"),
+            ("mldraft_db_pool_overflow", "overflow"),
+        ):
+            if hasattr(pool, method):
+                yield name, (), float(getattr(pool, method)())
+
+    metrics.add_collector(pool_samples)
+
+
+def stats_collector(
+    prefix: str,
+    stats: Callable[[], Dict[str, float]],
+    source: str,
+    counters: Sequence[str] = (),
+    gauges: Sequence[str] = (),
+) -> None:
+    """Report fields of a stats() dict as {prefix}_{field}_total counters and {prefix}_{field} gauges"""
+    for field in counters:
+        metrics.describe(f"{prefix}_{field}_total", "counter", f"{field.replace('_', ' ').capitalize()} reported by {source}.")
+    for field in gauges:
+        metrics.describe(f"{prefix}_{field}", "gauge", f"{field.replace('_', ' ').capitalize()} reported by {source}.")
+
+    def samples() -> Iterable[Sample]:
+        values = stats()
+        for field in counters:
+            yield f"{prefix}_{field}_total", (), float(values[field])
+        for field in gauges:
+            yield f"{prefix}_{field}", (), float(values[field])
+
+    metrics.add_collector(samples)
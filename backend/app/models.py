@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -47,6 +47,9 @@ class Hero(Base):
     skills = Column(Text, nullable=True)  # JSON string of skills
     global_rg_win_rate = Column(Float, nullable=True)
     global_rg_source = Column(String(120), nullable=True)
+    trait_mask = Column(Integer, nullable=True)  # Derived traits, see app.hero_features
+    lane_preferences = Column(Text, nullable=True)  # JSON array of lanes in preference order
+    feature_version = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -139,3 +142,35 @@ class Draft(Base):
     red_win_probability = Column(Float, nullable=True)
     standout_picks = Column(Text, nullable=True)  # JSON payload for saved analysis
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class HeroRating(Base):
+    __tablename__ = "hero_ratings"
+
+    hero_id = Column(Integer, ForeignKey("heroes.id"), primary_key=True)
+    rating = Column(Float, nullable=False, default=1500.0)  # Elo points
+    games = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class HeroPairRating(Base):
+    __tablename__ = "hero_pair_ratings"
+    __table_args__ = (UniqueConstraint("hero_1_id", "hero_2_id", "relation"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    hero_1_id = Column(Integer, ForeignKey("heroes.id"), nullable=False)  # Always the lower hero id
+    hero_2_id = Column(Integer, ForeignKey("heroes.id"), nullable=False)
+    relation = Column(String(10), nullable=False)  # ally or opponent
+    rating = Column(Float, nullable=False, default=0.0)  # ally: duo bonus; opponent: hero_1's edge over hero_2
+    games = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)  # ally: wins together; opponent: hero_1's wins
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RatingsVersion(Base):
+    __tablename__ = "ratings_version"
+
+    id = Column(Integer, primary_key=True)  # A single row, id 1
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every rating write; workers reload on change
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,88 @@
+"""What-if swaps of the picks one side has locked in.
+
+For each pick, every open hero is tried in its slot in one batched call:
+``DraftAI.get_replacement_scores`` rescores the whole team for all of them
+from the aggregates of the other picks, and only the best ``top_n`` get a
+win probability, built from ``DraftAI.get_replacement_summaries`` instead
+of a fresh ``analyze_team`` per alternative.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from app.ai_engine import DraftAI
+from app.win_model import draft_win_probability
+
+
+@dataclass
+class SwapAlternative:
+    hero_id: int
+    team_score: float
+    score_delta: float
+    win_probability: float
+    win_probability_delta: float
+
+
+@dataclass
+class SlotSwaps:
+    position: int
+    hero_id: int
+    alternatives: List[SwapAlternative]
+
+
+@dataclass
+class PickSwapAnalysis:
+    """Best replacements for every locked pick of one side"""
+
+    ai: DraftAI
+    bans: List[int]
+    blue_picks: List[int]
+    red_picks: List[int]
+    side: str = "blue"
+    top_n: int = 3
+
+    def run(self) -> Tuple[float, float, List[SlotSwaps]]:
+        """Return the side's team score, its win probability and the swaps for each of its picks"""
+        if self.side not in ("blue", "red"):
+            raise ValueError(f"Unknown side: {self.side}")
+        snapshot = self.ai.snapshot
+        blue = [hero_id for hero_id in dict.fromkeys(self.blue_picks) if hero_id in snapshot.heroes]
+        red = [hero_id for hero_id in dict.fromkeys(self.red_picks) if hero_id in snapshot.heroes]
+        team, enemy = (blue, red) if self.side == "blue" else (red, blue)
+
+        available = self.ai.get_available_heroes(self.bans, self.blue_picks, self.red_picks)
+        blue_analysis, red_analysis = self.ai.analyze_teams([blue, red])
+        team_score = self.ai.score_composition(team, enemy)
+        win_probability = self._side_probability(blue, red, blue_analysis, red_analysis)
+
+        slots = []
+        for position, hero_id in enumerate(team):
+            scores = self.ai.get_replacement_scores(team, enemy, position, available).tolist()
+            best = heapq.nlargest(self.top_n, range(len(available)), key=scores.__getitem__)
+            heroes = [available[index] for index in best]
+            summaries = self.ai.get_replacement_summaries(team, position, heroes)
+
+            alternatives = []
+            for index, hero, summary in zip(best, heroes, summaries):
+                swapped = team[:position] + [hero.id] + team[position + 1:]
+                if self.side == "blue":
+                    probability = self._side_probability(swapped, red, summary, red_analysis)
+                else:
+                    probability = self._side_probability(blue, swapped, blue_analysis, summary)
+                alternatives.append(SwapAlternative(
+                    hero_id=hero.id,
+                    team_score=round(scores[index], 2),
+                    score_delta=round(scores[index] - team_score, 2),
+                    win_probability=probability,
+                    win_probability_delta=round(probability - win_probability, 1),
+                ))
+            slots.append(SlotSwaps(position=position, hero_id=hero_id, alternatives=alternatives))
+
+        return round(team_score, 2), win_probability, slots
+
+    def _side_probability(self, blue: List[int], red: List[int], blue_analysis: dict, red_analysis: dict) -> float:
+        blue_win_probability = draft_win_probability(self.ai.snapshot, blue, red, blue_analysis, red_analysis)
+        return blue_win_probability if self.side == "blue" else round(100 - blue_win_probability, 1)
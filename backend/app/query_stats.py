@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+STATS_HEADER = "X-SQL-Stats"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request issued more SQL statements than its route declared"""
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL issued while serving one request"""
+
+    route: str
+    statements: int = 0
+    duration: float = 0.0  # seconds
+    budget: Optional[int] = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.statements > self.budget
+
+    def header_value(self) -> str:
+        return f"statements={self.statements}; time_ms={self.duration * 1000:.3f}"
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def start_request(route: str) -> RequestQueryStats:
+    """Start counting for the request being served in this context.
+
+    FastAPI copies the context into the threadpool that runs sync routes and
+    dependencies, so statements issued there land on the same object.
+    """
+    stats = RequestQueryStats(route)
+    _current_stats.set(stats)
+    return stats
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    """Route dependency declaring the most SQL statements the route may issue.
+
+    Going over is logged as a warning, or raises QueryBudgetExceeded when
+    SQL_STRICT_BUDGETS is set (as in tests). Lazy reloads of the knowledge
+    snapshot and rating table count towards the budget of the request that
+    triggers them.
+    """
+    async def declare_budget() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return declare_budget
+
+
+def check_budget(stats: RequestQueryStats, strict: bool) -> None:
+    if not stats.over_budget:
+        return
+    message = f"{stats.route} issued {stats.statements} SQL statements, over its budget of {stats.budget}"
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float) -> None:
+    """Count statements and DB time per request and log slow statements.
+
+    A slow_query_ms of 0 or less turns slow statement logging off.
+    """
+    threshold = slow_query_ms / 1000 if slow_query_ms > 0 else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.duration += elapsed
+        if threshold is not None and elapsed >= threshold:
+            logger.warning(
+                "Slow SQL (%.1f ms) in %s: %s parameters=%r",
+                elapsed * 1000,
+                stats.route if stats is not None else "background",
+                statement,
+                parameters,
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(exception_context) -> None:
+        connection = exception_context.connection
+        started: List[float] = connection.info.get("query_started_at", []) if connection is not None else []
+        if started:
+            started.pop()
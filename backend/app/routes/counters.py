@@ -5,11 +5,13 @@ from app.database import get_db
 from app.models import Counter, Hero
 from app.schemas import CounterCreate, CounterResponse
 from app.auth import get_current_admin
+from app.query_stats import query_budget
+from app.knowledge import refresh_knowledge_snapshot
 
 router = APIRouter(prefix="/api/counters", tags=["Counters"])
 
 
-@router.get("", response_model=List[CounterResponse])
+@router.get("", response_model=List[CounterResponse], dependencies=[Depends(query_budget(1))])
 def get_all_counters(db: Session = Depends(get_db)):
     """Get all counter relationships"""
     counters = db.query(Counter).options(
@@ -19,7 +21,7 @@ def get_all_counters(db: Session = Depends(get_db)):
     return counters
 
 
-@router.get("/{hero_id}", response_model=List[CounterResponse])
+@router.get("/{hero_id}", response_model=List[CounterResponse], dependencies=[Depends(query_budget(2))])
 def get_hero_counters(hero_id: int, db: Session = Depends(get_db)):
     """Get all heroes that counter a specific hero"""
     # Verify hero exists
@@ -35,7 +37,7 @@ def get_hero_counters(hero_id: int, db: Session = Depends(get_db)):
     return counters
 
 
-@router.get("/by/{hero_id}", response_model=List[CounterResponse])
+@router.get("/by/{hero_id}", response_model=List[CounterResponse], dependencies=[Depends(query_budget(2))])
 def get_heroes_countered_by(hero_id: int, db: Session = Depends(get_db)):
     """Get all heroes that a specific hero counters"""
     hero = db.query(Hero).filter(Hero.id == hero_id).first()
@@ -83,6 +85,7 @@ def create_counter(
     )
     db.add(db_counter)
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     # Reload with relationships
     return db.query(Counter).options(
@@ -109,6 +112,7 @@ def update_counter(
     db_counter.explanation = counter.explanation
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     return db.query(Counter).options(
         joinedload(Counter.hero),
@@ -129,6 +133,7 @@ def delete_counter(
     
     db.delete(db_counter)
     db.commit()
+    refresh_knowledge_snapshot(db)
     return None
 
 
@@ -139,17 +144,21 @@ def create_counters_bulk(
     admin: str = Depends(get_current_admin)
 ):
     """Create multiple counter relationships at once (Admin only)"""
+    requested_pairs = {(counter.hero_id, counter.countered_by_id) for counter in counters}
+    existing_pairs = set()
+    if requested_pairs:
+        existing_pairs = set(db.query(Counter.hero_id, Counter.countered_by_id).filter(
+            Counter.hero_id.in_({hero_id for hero_id, _ in requested_pairs}),
+            Counter.countered_by_id.in_({counter_id for _, counter_id in requested_pairs})
+        ).all())
+
     created = []
-    
     for counter in counters:
         # Skip if relationship exists
-        existing = db.query(Counter).filter(
-            Counter.hero_id == counter.hero_id,
-            Counter.countered_by_id == counter.countered_by_id
-        ).first()
-        
-        if existing:
+        pair = (counter.hero_id, counter.countered_by_id)
+        if pair in existing_pairs:
             continue
+        existing_pairs.add(pair)
         
         db_counter = Counter(
             hero_id=counter.hero_id,
@@ -160,16 +169,15 @@ def create_counters_bulk(
         db.add(db_counter)
         created.append(db_counter)
     
+    db.flush()
+    created_ids = [c.id for c in created]
     db.commit()
+    refresh_knowledge_snapshot(db)
+    if not created_ids:
+        return []
     
     # Reload with relationships
-    result = []
-    for c in created:
-        db.refresh(c)
-        loaded = db.query(Counter).options(
-            joinedload(Counter.hero),
-            joinedload(Counter.countered_by)
-        ).filter(Counter.id == c.id).first()
-        result.append(loaded)
-    
-    return result
+    return db.query(Counter).options(
+        joinedload(Counter.hero),
+        joinedload(Counter.countered_by)
+    ).filter(Counter.id.in_(created_ids)).order_by(Counter.id).all()
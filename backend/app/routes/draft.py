@@ -1,37 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
 import json
+import time
 from app.database import get_db
 from app.models import Draft, Hero
 from app.schemas import (
     DraftSuggestionRequest, 
+    DraftAnalyzeRequest,
+    DraftAnalyzeBatchItem,
+    DraftAnalyzeBatchRequest,
+    DraftAnalyzeBatchResponse,
+    DraftBanResponse,
     DraftSuggestionResponse, 
     DraftSuggestionGroups,
+    DraftSuggestionBatchItem,
+    DraftSuggestionBatchRequest,
+    DraftSuggestionBatchResponse,
+    DraftLineupRequest,
+    DraftLineupResponse,
+    DraftLookaheadRequest,
+    DraftLookaheadResponse,
+    DraftSessionAction,
+    DraftSessionCreate,
+    DraftSessionResponse,
+    DraftWhatIfRequest,
+    DraftWhatIfResponse,
     HeroSuggestion,
+    LineupSuggestion,
+    LookaheadSuggestion,
+    WhatIfAlternative,
+    WhatIfSlot,
     HeroResponse,
     DraftCreate,
     DraftResponse
 )
-from app.ai_engine import DraftAI
+from app.ai_engine import DraftAI, DraftContext, ScoredPool
+from app.auth import get_current_admin
+from app.query_stats import query_budget
+from app.stage_timing import stage
+from app.config import settings
+from app.draft_search import TEAM_SIZE, LookaheadResult, LookaheadSearch
+from app.draft_sessions import DraftSession, DraftSessionError, draft_sessions
+from app.draft_simulation import DraftSimulation
+from app.lineup_optimizer import LineupOptimizer
+from app.pick_swaps import PickSwapAnalysis
+from app.hero_ratings import apply_rating_update, get_rating_table, record_draft_result
+from app.knowledge import KnowledgeSnapshot, get_knowledge_snapshot
+from app.suggestion_cache import draft_state_key, suggestion_cache
+from app.win_model import draft_win_probability, parse_hero_ids
 
 router = APIRouter(prefix="/api/draft", tags=["Draft"])
 
+# Engine routes read the in-memory snapshot; the allowance covers a stored ratings
+# version check and the rating table reload it may trigger
+ENGINE_QUERY_BUDGET = 4
+
+
+def build_hero_payload(hero) -> HeroResponse:
+    return HeroResponse(
+        id=hero.id,
+        name=hero.name,
+        role=hero.role,
+        image_url=hero.image_url,
+        specialty=hero.specialty,
+        description=hero.description,
+        skills=hero.skills,
+        created_at=hero.created_at,
+        updated_at=hero.updated_at
+    )
+
 
 def build_hero_suggestion_payload(suggestion: dict) -> HeroSuggestion:
-    hero = suggestion["hero"]
     return HeroSuggestion(
-        hero=HeroResponse(
-            id=hero.id,
-            name=hero.name,
-            role=hero.role,
-            image_url=hero.image_url,
-            specialty=hero.specialty,
-            description=hero.description,
-            skills=hero.skills,
-            created_at=hero.created_at,
-            updated_at=hero.updated_at
-        ),
+        hero=build_hero_payload(suggestion["hero"]),
         score=suggestion["score"],
         tier=suggestion.get("tier"),
         lane_fit=suggestion.get("lane_fit"),
@@ -57,120 +102,75 @@ def build_standout_payload(suggestion: dict) -> dict:
     }
 
 
-@router.post("/suggest", response_model=DraftSuggestionResponse)
-def get_draft_suggestions(
-    request: DraftSuggestionRequest,
-    db: Session = Depends(get_db)
-):
-    """Get AI-powered hero suggestions for the draft"""
-    ai = DraftAI(db)
-    
-    # Get suggestions
-    suggestions = ai.get_suggestions(
-        bans=request.bans,
-        blue_picks=request.blue_picks,
-        red_picks=request.red_picks,
-        current_team=request.current_team,
-        top_n=5
-    )
-    counter_suggestions = ai.get_counter_suggestions(
-        bans=request.bans,
-        blue_picks=request.blue_picks,
-        red_picks=request.red_picks,
-        current_team=request.current_team,
-        top_n=3
-    )
-    synergy_suggestions = ai.get_synergy_suggestions(
-        bans=request.bans,
-        blue_picks=request.blue_picks,
-        red_picks=request.red_picks,
-        current_team=request.current_team,
-        top_n=3
-    )
-    safe_suggestions = ai.get_safe_suggestions(
-        bans=request.bans,
-        blue_picks=request.blue_picks,
-        red_picks=request.red_picks,
-        current_team=request.current_team,
-        top_n=3
-    )
-    avoid_suggestions = ai.get_avoid_suggestions(
-        bans=request.bans,
-        blue_picks=request.blue_picks,
-        red_picks=request.red_picks,
-        current_team=request.current_team,
-        bottom_n=3
+def build_suggestion_response(
+    ai: DraftAI,
+    bans: List[int],
+    blue_picks: List[int],
+    red_picks: List[int],
+    current_team: str,
+    context: Optional[DraftContext] = None,
+    team_analyses: Optional[Tuple[Dict, Dict]] = None,
+    pool: Optional[ScoredPool] = None,
+) -> DraftSuggestionResponse:
+    # Score the pool once for every suggestion group
+    groups = ai.get_suggestion_groups(
+        bans=bans,
+        blue_picks=blue_picks,
+        red_picks=red_picks,
+        current_team=current_team,
+        top_n=5,
+        category_n=3,
+        avoid_n=3,
+        context=context,
+        pool=pool,
     )
     
     # Get team analysis
-    team_picks = request.blue_picks if request.current_team == "blue" else request.red_picks
-    enemy_picks = request.red_picks if request.current_team == "blue" else request.blue_picks
+    team_picks = blue_picks if current_team == "blue" else red_picks
+    enemy_picks = red_picks if current_team == "blue" else blue_picks
     
-    team_analysis = ai.analyze_team(team_picks)
-    enemy_analysis = ai.analyze_team(enemy_picks)
+    if team_analyses is None:
+        team_analyses = ai.analyze_teams([team_picks, enemy_picks])
+    team_analysis, enemy_analysis = team_analyses
     
     # Format response
-    hero_suggestions = [build_hero_suggestion_payload(suggestion) for suggestion in suggestions]
-    counter_payload = [build_hero_suggestion_payload(suggestion) for suggestion in counter_suggestions]
-    synergy_payload = [build_hero_suggestion_payload(suggestion) for suggestion in synergy_suggestions]
-    safe_payload = [build_hero_suggestion_payload(suggestion) for suggestion in safe_suggestions]
-    avoid_payload = [build_hero_suggestion_payload(suggestion) for suggestion in avoid_suggestions]
-    
-    return DraftSuggestionResponse(
-        suggestions=hero_suggestions,
-        suggestion_groups=DraftSuggestionGroups(
-            counter=counter_payload,
-            synergy=synergy_payload,
-            safe=safe_payload,
-        ),
-        avoid_suggestions=avoid_payload,
-        team_analysis={
-            "your_team": team_analysis,
-            "enemy_team": enemy_analysis
-        }
-    )
+    with stage("response"):
+        hero_suggestions = [build_hero_suggestion_payload(suggestion) for suggestion in groups["overall"]]
+        counter_payload = [build_hero_suggestion_payload(suggestion) for suggestion in groups["counter"]]
+        synergy_payload = [build_hero_suggestion_payload(suggestion) for suggestion in groups["synergy"]]
+        safe_payload = [build_hero_suggestion_payload(suggestion) for suggestion in groups["safe"]]
+        avoid_payload = [build_hero_suggestion_payload(suggestion) for suggestion in groups["avoid"]]
+        
+        return DraftSuggestionResponse(
+            suggestions=hero_suggestions,
+            suggestion_groups=DraftSuggestionGroups(
+                counter=counter_payload,
+                synergy=synergy_payload,
+                safe=safe_payload,
+            ),
+            avoid_suggestions=avoid_payload,
+            team_analysis={
+                "your_team": team_analysis,
+                "enemy_team": enemy_analysis
+            }
+        )
 
 
-@router.post("/analyze")
-def analyze_draft(
-    request: DraftSuggestionRequest,
-    db: Session = Depends(get_db)
-):
-    """Analyze both team compositions"""
-    ai = DraftAI(db)
-    
-    blue_analysis = ai.analyze_team(request.blue_picks)
-    red_analysis = ai.analyze_team(request.red_picks)
-    blue_standouts = [build_standout_payload(item) for item in ai.get_team_standouts(request.blue_picks, request.red_picks)]
-    red_standouts = [build_standout_payload(item) for item in ai.get_team_standouts(request.red_picks, request.blue_picks)]
-    
-    # Calculate win probability estimate (simplified)
-    blue_score = 0
-    red_score = 0
-    
-    # Factor in tier averages
-    tier_scores = {"S": 5, "A": 4, "B": 3, "C": 2, "D": 1}
-    blue_tier = tier_scores.get(blue_analysis.get("average_tier", "C"), 2)
-    red_tier = tier_scores.get(red_analysis.get("average_tier", "C"), 2)
-    blue_score += blue_tier * 10
-    red_score += red_tier * 10
-    
-    # Factor in synergies
-    blue_score += blue_analysis.get("synergy_count", 0) * 5
-    red_score += red_analysis.get("synergy_count", 0) * 5
-    
-    # Factor in role balance
-    blue_roles = blue_analysis.get("roles", {})
-    red_roles = red_analysis.get("roles", {})
-    
-    for role in ["tank", "marksman", "mage"]:
-        if blue_roles.get(role, 0) >= 1:
-            blue_score += 3
-        if red_roles.get(role, 0) >= 1:
-            red_score += 3
+def build_analysis_response(
+    ai: DraftAI,
+    blue_picks: List[int],
+    red_picks: List[int],
+    team_analyses: Optional[Tuple[Dict, Dict]] = None,
+) -> dict:
+    if team_analyses is None:
+        team_analyses = ai.analyze_teams([blue_picks, red_picks])
+    blue_analysis, red_analysis = team_analyses
+    with stage("standouts"):
+        blue_standouts = [build_standout_payload(item) for item in ai.get_team_standouts(blue_picks, red_picks, 2)]
+        red_standouts = [build_standout_payload(item) for item in ai.get_team_standouts(red_picks, blue_picks, 2)]
     
-    total = blue_score + red_score
-    blue_win_prob = round((blue_score / total) * 100, 1) if total > 0 else 50
+    with stage("win_probability"):
+        blue_win_prob = draft_win_probability(ai.snapshot, blue_picks, red_picks, blue_analysis, red_analysis)
     red_win_prob = round(100 - blue_win_prob, 1)
 
     winner = "blue" if blue_win_prob >= red_win_prob else "red"
@@ -211,6 +211,533 @@ def analyze_draft(
     }
 
 
+@router.post("/suggest", response_model=DraftSuggestionResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_draft_suggestions(request: DraftSuggestionRequest):
+    """Get AI-powered hero suggestions for the draft"""
+    snapshot = get_knowledge_snapshot()
+    ratings = get_rating_table(snapshot)
+    # Read the rating version before scoring, so a save racing this request only makes the entry stale
+    version = (snapshot.version, ratings.version)
+    key = draft_state_key(request.bans, request.blue_picks, request.red_picks, request.current_team)
+    with stage("cache"):
+        cached = suggestion_cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    bans, blue_picks, red_picks, current_team = (list(key[0]), list(key[1]), list(key[2]), key[3])
+    response = build_suggestion_response(DraftAI(snapshot, ratings), bans, blue_picks, red_picks, current_team)
+    with stage("cache"):
+        suggestion_cache.put(key, version, response, len(response.model_dump_json()))
+    return response
+
+
+def draft_state_error(
+    snapshot: KnowledgeSnapshot,
+    bans: List[int],
+    blue_picks: List[int],
+    red_picks: List[int],
+    current_team: str = "blue",
+) -> Optional[str]:
+    """Why a batch item's draft state cannot be evaluated, or None if it can"""
+    if current_team not in ("blue", "red"):
+        return f"Unknown team: {current_team}"
+    for hero_id in list(bans) + list(blue_picks) + list(red_picks):
+        if hero_id not in snapshot.heroes:
+            return f"Unknown hero: {hero_id}"
+    for team, picks in (("Blue", blue_picks), ("Red", red_picks)):
+        if len(picks) > TEAM_SIZE:
+            return f"{team} team has more than {TEAM_SIZE} picks"
+    picks = list(blue_picks) + list(red_picks)
+    if len(set(picks)) < len(picks) or set(picks) & set(bans):
+        return "A hero is picked twice or both banned and picked"
+    return None
+
+
+@router.post("/suggest/batch", response_model=DraftSuggestionBatchResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_draft_suggestions_batch(request: DraftSuggestionBatchRequest):
+    """Get suggestions for many draft states, scored against one knowledge snapshot"""
+    started = time.perf_counter()
+    snapshot = get_knowledge_snapshot()
+    ratings = get_rating_table(snapshot)
+    version = (snapshot.version, ratings.version)
+    ai = DraftAI(snapshot, ratings)
+
+    keys = [draft_state_key(state.bans, state.blue_picks, state.red_picks, state.current_team) for state in request.states]
+    items: Dict[tuple, DraftSuggestionBatchItem] = {}
+    pending = []
+    cache_hits = 0
+    for key in dict.fromkeys(keys):
+        error = draft_state_error(snapshot, *key)
+        cached = suggestion_cache.get(key, version) if error is None else None
+        if error is not None:
+            items[key] = DraftSuggestionBatchItem(error=error)
+        elif cached is not None:
+            items[key] = DraftSuggestionBatchItem(result=cached)
+            cache_hits += 1
+        else:
+            pending.append(key)
+
+    # Scoring is shared between states that differ only in bans; team analysis runs for every team at once
+    states = [(list(key[0]), list(key[1]), list(key[2]), key[3]) for key in pending]
+    pools = ai.score_states(states)
+    analyses = ai.analyze_teams([picks for pool in pools for picks in (pool.team_picks, pool.enemy_picks)])
+    for index, (key, state, pool) in enumerate(zip(pending, states, pools)):
+        try:
+            response = build_suggestion_response(
+                ai, *state, team_analyses=(analyses[2 * index], analyses[2 * index + 1]), pool=pool
+            )
+        except Exception as error:
+            items[key] = DraftSuggestionBatchItem(error=str(error) or type(error).__name__)
+            continue
+        suggestion_cache.put(key, version, response, len(response.model_dump_json()))
+        items[key] = DraftSuggestionBatchItem(result=response)
+
+    return DraftSuggestionBatchResponse(
+        results=[items[key] for key in keys],
+        unique_states=len(items),
+        cache_hits=cache_hits,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@router.post("/bans", response_model=DraftBanResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_ban_suggestions(request: DraftSuggestionRequest):
+    """Get the heroes that would threaten the current team most if the enemy picked them"""
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    bans = ai.get_ban_suggestions(
+        bans=request.bans,
+        blue_picks=request.blue_picks,
+        red_picks=request.red_picks,
+        current_team=request.current_team,
+        top_n=5
+    )
+    return DraftBanResponse(ban_suggestions=[build_hero_suggestion_payload(suggestion) for suggestion in bans])
+
+
+@router.post("/lookahead", response_model=DraftLookaheadResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_lookahead_suggestions(request: DraftLookaheadRequest):
+    """Rank the next pick by simulating the remaining picks in ranked pick order"""
+    if request.current_team not in ("blue", "red"):
+        raise HTTPException(status_code=400, detail=f"Unknown team: {request.current_team}")
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    result = LookaheadSearch(
+        ai=ai,
+        bans=request.bans,
+        blue_picks=request.blue_picks,
+        red_picks=request.red_picks,
+        current_team=request.current_team,
+        time_budget=request.time_budget_ms / 1000,
+        max_depth=request.max_depth,
+    ).run()
+    return build_lookahead_response(ai, result, request.top_n)
+
+
+def build_lookahead_response(ai: DraftAI, result: LookaheadResult, top_n: int) -> DraftLookaheadResponse:
+    heroes = ai._get_heroes([hero_id for hero_id, _ in result.ranked[:top_n]])
+    suggestions = [
+        LookaheadSuggestion(
+            hero=build_hero_payload(hero),
+            score=score,
+            greedy_score=result.greedy_scores[hero.id],
+        )
+        for hero, (_, score) in zip(heroes, result.ranked)
+    ]
+
+    return DraftLookaheadResponse(
+        suggestions=suggestions,
+        depth=result.depth,
+        max_depth=result.max_depth,
+        completed=result.completed,
+        nodes=result.nodes,
+        transposition_hits=result.transposition_hits,
+        elapsed_ms=result.elapsed_ms,
+    )
+
+
+@router.post("/lineups", response_model=DraftLineupResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_lineup_completions(request: DraftLineupRequest):
+    """Get the best full lineups reachable from the current team"""
+    started = time.perf_counter()
+    snapshot = get_knowledge_snapshot()
+    error = draft_state_error(snapshot, request.bans, request.blue_picks, request.red_picks, request.current_team)
+    team_picks = request.blue_picks if request.current_team == "blue" else request.red_picks
+    if error is None and len(team_picks) >= TEAM_SIZE:
+        error = f"{request.current_team.capitalize()} team already has {TEAM_SIZE} picks"
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    lineups, scored = LineupOptimizer(
+        ai=ai,
+        bans=request.bans,
+        blue_picks=request.blue_picks,
+        red_picks=request.red_picks,
+        current_team=request.current_team,
+        beam_width=request.beam_width,
+    ).run(request.top_k)
+
+    return DraftLineupResponse(
+        lineups=[
+            LineupSuggestion(
+                heroes=[build_hero_payload(hero) for hero in ai._get_heroes(lineup.hero_ids)],
+                score=lineup.score,
+                analysis=lineup.analysis,
+            )
+            for lineup in lineups
+        ],
+        scored=scored,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@router.post("/what-if", response_model=DraftWhatIfResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_pick_swaps(request: DraftWhatIfRequest):
+    """Get the best replacements for each locked pick of a side and what they change"""
+    started = time.perf_counter()
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    side = request.side or request.current_team
+    if side not in ("blue", "red"):
+        raise HTTPException(status_code=400, detail=f"Unknown side: {side}")
+    team_score, win_probability, slots = PickSwapAnalysis(
+        ai=ai,
+        bans=request.bans,
+        blue_picks=request.blue_picks,
+        red_picks=request.red_picks,
+        side=side,
+        top_n=request.top_n,
+    ).run()
+
+    heroes = snapshot.heroes
+    return DraftWhatIfResponse(
+        side=side,
+        team_score=team_score,
+        win_probability=win_probability,
+        slots=[
+            WhatIfSlot(
+                position=slot.position,
+                hero=build_hero_payload(heroes[slot.hero_id]),
+                alternatives=[
+                    WhatIfAlternative(
+                        hero=build_hero_payload(heroes[alternative.hero_id]),
+                        team_score=alternative.team_score,
+                        score_delta=alternative.score_delta,
+                        win_probability=alternative.win_probability,
+                        win_probability_delta=alternative.win_probability_delta,
+                    )
+                    for alternative in slot.alternatives
+                ],
+            )
+            for slot in slots
+        ],
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def build_session_response(ai: DraftAI, session: DraftSession) -> DraftSessionResponse:
+    """Suggestions for the session's current state, scored from its running aggregates"""
+    bans, blue_picks, red_picks = list(session.bans), list(session.blue_picks), list(session.red_picks)
+    version = (ai.snapshot.version, ai.ratings.version)
+    key = draft_state_key(bans, blue_picks, red_picks, session.current_team)
+    suggestions = suggestion_cache.get(key, version)
+    if suggestions is None:
+        suggestions = build_suggestion_response(
+            ai, bans, blue_picks, red_picks, session.current_team, context=session.context(ai)
+        )
+        suggestion_cache.put(key, version, suggestions, len(suggestions.model_dump_json()))
+
+    return DraftSessionResponse(
+        session_id=session.id,
+        bans=bans,
+        blue_picks=blue_picks,
+        red_picks=red_picks,
+        current_team=session.current_team,
+        suggestions=suggestions,
+    )
+
+
+def get_session_ai(session_id: str) -> tuple:
+    """The session and a DraftAI on the current snapshot, rebasing the session if the snapshot moved on"""
+    session = draft_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Draft session not found")
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    if session.snapshot is not snapshot:
+        with session.lock:
+            session.rebase(ai)
+    return session, ai
+
+
+@router.post("/sessions", response_model=DraftSessionResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def create_draft_session(request: DraftSessionCreate):
+    """Start a server-side draft session, optionally from an existing state"""
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    session = draft_sessions.create(ai)
+    with session.lock:
+        try:
+            session.load(ai, request.bans, request.blue_picks, request.red_picks)
+            session.apply(ai, None, current_team=request.current_team)
+        except DraftSessionError as error:
+            draft_sessions.delete(session.id)
+            raise HTTPException(status_code=400, detail=str(error))
+        response = build_session_response(ai, session)
+    draft_sessions.touch(session)
+    return response
+
+
+@router.get("/sessions/{session_id}", response_model=DraftSessionResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def get_draft_session(session_id: str):
+    """Get a session's draft and suggestions"""
+    session, ai = get_session_ai(session_id)
+    with session.lock:
+        return build_session_response(ai, session)
+
+
+@router.post("/sessions/{session_id}/actions", response_model=DraftSessionResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def apply_draft_session_action(session_id: str, request: DraftSessionAction):
+    """Apply one ban or pick to a session and get the updated suggestions"""
+    session, ai = get_session_ai(session_id)
+    with session.lock:
+        try:
+            session.apply(ai, request.action, request.hero_id, request.team, request.current_team)
+        except DraftSessionError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        response = build_session_response(ai, session)
+    draft_sessions.touch(session)
+    return response
+
+
+@router.get("/sessions/{session_id}/analysis", dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def analyze_draft_session(session_id: str):
+    """Analyze both team compositions of a session"""
+    session, ai = get_session_ai(session_id)
+    with session.lock:
+        blue_picks, red_picks = list(session.blue_picks), list(session.red_picks)
+    return build_analysis_response(DraftAI(ai.snapshot), blue_picks, red_picks)
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_draft_session(session_id: str):
+    """End a draft session"""
+    if not draft_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Draft session not found")
+    return None
+
+
+def apply_stream_message(session: Optional[DraftSession], text: str) -> Tuple[DraftSession, DraftAI]:
+    """Fold one stream message into the connection's draft.
+
+    A message carrying ``bans``, ``blue_picks`` or ``red_picks`` replaces the
+    whole state; anything else is a single action as posted to a session.
+    """
+    payload = json.loads(text)
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object")
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+
+    if {"bans", "blue_picks", "red_picks"} & payload.keys():
+        state = DraftSuggestionRequest.model_validate(payload)
+        fresh = DraftSession.start("stream", ai)
+        fresh.load(ai, state.bans, state.blue_picks, state.red_picks)
+        fresh.apply(ai, None, current_team=state.current_team)
+        return fresh, ai
+
+    action = DraftSessionAction.model_validate(payload)
+    if session is None:
+        session = DraftSession.start("stream", ai)
+    elif session.snapshot is not snapshot:
+        session.rebase(ai)
+    session.apply(ai, action.action, action.hero_id, action.team, action.current_team)
+    return session, ai
+
+
+def build_stream_stages(ai: DraftAI, session: DraftSession) -> List[Tuple[str, Callable[[], object]]]:
+    """Events for the session's current state, cheapest first"""
+    bans, blue_picks, red_picks = list(session.bans), list(session.blue_picks), list(session.red_picks)
+    current_team = session.current_team
+
+    def state():
+        return {"bans": bans, "blue_picks": blue_picks, "red_picks": red_picks, "current_team": current_team}
+
+    def quick():
+        # Tier, lane and matchup scores without the skill-derived reason text
+        groups = ai.get_suggestion_groups(
+            bans=bans,
+            blue_picks=blue_picks,
+            red_picks=red_picks,
+            current_team=current_team,
+            top_n=5,
+            category_n=3,
+            avoid_n=3,
+            with_reasons=False,
+            context=session.context(ai),
+        )
+        return {"suggestions": [build_hero_suggestion_payload(suggestion) for suggestion in groups["overall"]]}
+
+    def lookahead():
+        result = LookaheadSearch(
+            ai=ai,
+            bans=bans,
+            blue_picks=blue_picks,
+            red_picks=red_picks,
+            current_team=current_team,
+            time_budget=settings.DRAFT_STREAM_LOOKAHEAD_MS / 1000,
+        ).run()
+        return build_lookahead_response(ai, result, 5)
+
+    stages = [
+        ("state", state),
+        ("quick", quick),
+        ("suggestions", lambda: build_session_response(ai, session).suggestions),
+        ("analysis", lambda: build_analysis_response(DraftAI(ai.snapshot), blue_picks, red_picks)),
+    ]
+    if len(session.sides[current_team].picks) < TEAM_SIZE and settings.DRAFT_STREAM_LOOKAHEAD_MS > 0:
+        stages.append(("lookahead", lookahead))
+    return stages
+
+
+@router.websocket("/stream")
+async def stream_draft(websocket: WebSocket):
+    """Push suggestions and analysis for every change to one draft, cheap results first.
+
+    Each message sent by the client is a full draft state or one session
+    action. Every event is ``{"event", "revision", "data"}``; when newer
+    messages arrive, the remaining events of an older revision are skipped.
+    """
+    await websocket.accept()
+    messages: asyncio.Queue = asyncio.Queue()
+
+    async def receive():
+        try:
+            while True:
+                await messages.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            await messages.put(None)
+
+    receiver = asyncio.create_task(receive())
+    session: Optional[DraftSession] = None
+    ai: Optional[DraftAI] = None
+    revision = 0
+    try:
+        while True:
+            # Apply every message already waiting before computing anything
+            changed = False
+            text = await messages.get()
+            while True:
+                if text is None:
+                    return
+                try:
+                    session, ai = await run_in_threadpool(apply_stream_message, session, text)
+                    revision += 1
+                    changed = True
+                except ValueError as error:
+                    await websocket.send_json({"event": "error", "revision": revision, "data": {"detail": str(error)}})
+                if messages.empty():
+                    break
+                text = messages.get_nowait()
+
+            if not changed:
+                continue
+            for event, build in build_stream_stages(ai, session):
+                if not messages.empty():
+                    break
+                data = jsonable_encoder(await run_in_threadpool(build))
+                await websocket.send_json({"event": event, "revision": revision, "data": data})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+
+@router.get("/session-stats")
+def get_draft_session_stats(admin: str = Depends(get_current_admin)):
+    """Get size, eviction and expiry counters of the draft session store"""
+    return draft_sessions.stats()
+
+
+@router.get("/cache-stats")
+def get_suggestion_cache_stats(admin: str = Depends(get_current_admin)):
+    """Get hit, miss and eviction counters of the suggestion cache"""
+    return suggestion_cache.stats()
+
+
+@router.post("/analyze", dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def analyze_draft(request: DraftAnalyzeRequest):
+    """Analyze both team compositions"""
+    ai = DraftAI(get_knowledge_snapshot())
+    response = build_analysis_response(ai, request.blue_picks, request.red_picks)
+
+    if request.simulate:
+        response["simulation"] = build_simulation(ai, request, response["blue_team"]["win_probability"])
+
+    return response
+
+
+def build_simulation(ai: DraftAI, request: DraftAnalyzeRequest, blue_win_probability: float) -> dict:
+    return DraftSimulation(
+        ai=ai,
+        blue_picks=request.blue_picks,
+        red_picks=request.red_picks,
+        blue_win_probability=blue_win_probability,
+        trials=request.trials,
+        seed=request.seed,
+        tier_noise=settings.SIMULATION_TIER_NOISE,
+        pair_noise=settings.SIMULATION_PAIR_NOISE,
+        winrate_noise=settings.SIMULATION_WINRATE_NOISE,
+    ).run().to_dict()
+
+
+@router.post("/analyze/batch", response_model=DraftAnalyzeBatchResponse, dependencies=[Depends(query_budget(ENGINE_QUERY_BUDGET))])
+def analyze_drafts_batch(request: DraftAnalyzeBatchRequest):
+    """Analyze many drafts against one knowledge snapshot"""
+    started = time.perf_counter()
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot)
+
+    # Drafts that differ only in simulation settings share their analysis
+    draft_keys = [(tuple(draft.blue_picks), tuple(draft.red_picks)) for draft in request.drafts]
+    errors = {key: draft_state_error(snapshot, [], list(key[0]), list(key[1])) for key in dict.fromkeys(draft_keys)}
+    valid = [key for key, error in errors.items() if error is None]
+    analyses = ai.analyze_teams([list(picks) for key in valid for picks in key])
+    responses: Dict[tuple, dict] = {}
+    for index, key in enumerate(valid):
+        try:
+            responses[key] = build_analysis_response(
+                ai, list(key[0]), list(key[1]), team_analyses=(analyses[2 * index], analyses[2 * index + 1])
+            )
+        except Exception as error:
+            errors[key] = str(error) or type(error).__name__
+
+    items: Dict[tuple, DraftAnalyzeBatchItem] = {}
+    results = []
+    for draft, draft_key in zip(request.drafts, draft_keys):
+        key = draft_key + ((draft.trials, draft.seed) if draft.simulate else ())
+        if key not in items:
+            if errors[draft_key] is not None:
+                items[key] = DraftAnalyzeBatchItem(error=errors[draft_key])
+            elif draft.simulate:
+                response = responses[draft_key]
+                try:
+                    simulation = build_simulation(ai, draft, response["blue_team"]["win_probability"])
+                except Exception as error:
+                    items[key] = DraftAnalyzeBatchItem(error=str(error) or type(error).__name__)
+                else:
+                    items[key] = DraftAnalyzeBatchItem(result={**response, "simulation": simulation})
+            else:
+                items[key] = DraftAnalyzeBatchItem(result=responses[draft_key])
+        results.append(items[key])
+
+    return DraftAnalyzeBatchResponse(
+        results=results,
+        unique_drafts=len(items),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
 @router.post("/save", response_model=DraftResponse, status_code=status.HTTP_201_CREATED)
 def save_draft(
     draft: DraftCreate,
@@ -230,12 +757,21 @@ def save_draft(
         standout_picks=draft.standout_picks,
     )
     db.add(db_draft)
+    rating_update = record_draft_result(
+        db,
+        get_knowledge_snapshot(),
+        parse_hero_ids(draft.blue_picks),
+        parse_hero_ids(draft.red_picks),
+        draft.winner,
+    )
     db.commit()
+    if rating_update is not None:
+        apply_rating_update(rating_update)
     db.refresh(db_draft)
     return db_draft
 
 
-@router.get("/history", response_model=List[DraftResponse])
+@router.get("/history", response_model=List[DraftResponse], dependencies=[Depends(query_budget(1))])
 def get_draft_history(
     limit: int = 10,
     db: Session = Depends(get_db)
@@ -245,7 +781,7 @@ def get_draft_history(
     return drafts
 
 
-@router.get("/available-heroes")
+@router.get("/available-heroes", dependencies=[Depends(query_budget(1))])
 def get_available_heroes(
     bans: str = "",  # Comma-separated hero IDs
     blue_picks: str = "",
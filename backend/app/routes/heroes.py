@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
-from app.models import Hero
+from app.models import Hero, HeroPairRating, HeroRating
 from app.schemas import HeroCreate, HeroUpdate, HeroResponse
 from app.auth import get_current_admin
+from app.query_stats import query_budget
+from app.hero_features import apply_hero_features
+from app.hero_ratings import bump_ratings_version
+from app.knowledge import refresh_knowledge_snapshot
 
 router = APIRouter(prefix="/api/heroes", tags=["Heroes"])
 
 
-@router.get("", response_model=List[HeroResponse])
+@router.get("", response_model=List[HeroResponse], dependencies=[Depends(query_budget(1))])
 def get_heroes(
     role: Optional[str] = Query(None, description="Filter by role"),
     search: Optional[str] = Query(None, description="Search by name"),
@@ -28,7 +33,7 @@ def get_heroes(
     return heroes
 
 
-@router.get("/{hero_id}", response_model=HeroResponse)
+@router.get("/{hero_id}", response_model=HeroResponse, dependencies=[Depends(query_budget(1))])
 def get_hero(hero_id: int, db: Session = Depends(get_db)):
     """Get a specific hero by ID"""
     hero = db.query(Hero).filter(Hero.id == hero_id).first()
@@ -59,8 +64,10 @@ def create_hero(
         global_rg_win_rate=hero.global_rg_win_rate,
         global_rg_source=hero.global_rg_source,
     )
+    apply_hero_features(db_hero)
     db.add(db_hero)
     db.commit()
+    refresh_knowledge_snapshot(db)
     db.refresh(db_hero)
     return db_hero
 
@@ -83,8 +90,10 @@ def update_hero(
     
     for field, value in update_data.items():
         setattr(db_hero, field, value)
+    apply_hero_features(db_hero)
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     db.refresh(db_hero)
     return db_hero
 
@@ -100,8 +109,14 @@ def delete_hero(
     if not db_hero:
         raise HTTPException(status_code=404, detail="Hero not found")
     
+    bump_ratings_version(db)
+    db.query(HeroRating).filter(HeroRating.hero_id == hero_id).delete(synchronize_session=False)
+    db.query(HeroPairRating).filter(
+        or_(HeroPairRating.hero_1_id == hero_id, HeroPairRating.hero_2_id == hero_id)
+    ).delete(synchronize_session=False)
     db.delete(db_hero)
     db.commit()
+    refresh_knowledge_snapshot(db)
     return None
 
 
@@ -128,10 +143,12 @@ def create_heroes_bulk(
             global_rg_win_rate=hero_data.global_rg_win_rate,
             global_rg_source=hero_data.global_rg_source,
         )
+        apply_hero_features(db_hero)
         db.add(db_hero)
         created_heroes.append(db_hero)
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     for hero in created_heroes:
         db.refresh(hero)
     
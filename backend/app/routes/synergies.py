@@ -5,11 +5,13 @@ from app.database import get_db
 from app.models import Synergy, Hero
 from app.schemas import SynergyCreate, SynergyResponse
 from app.auth import get_current_admin
+from app.query_stats import query_budget
+from app.knowledge import refresh_knowledge_snapshot
 
 router = APIRouter(prefix="/api/synergies", tags=["Synergies"])
 
 
-@router.get("", response_model=List[SynergyResponse])
+@router.get("", response_model=List[SynergyResponse], dependencies=[Depends(query_budget(1))])
 def get_all_synergies(db: Session = Depends(get_db)):
     """Get all synergy relationships"""
     synergies = db.query(Synergy).options(
@@ -19,7 +21,7 @@ def get_all_synergies(db: Session = Depends(get_db)):
     return synergies
 
 
-@router.get("/{hero_id}", response_model=List[SynergyResponse])
+@router.get("/{hero_id}", response_model=List[SynergyResponse], dependencies=[Depends(query_budget(2))])
 def get_hero_synergies(hero_id: int, db: Session = Depends(get_db)):
     """Get all synergies for a specific hero"""
     # Verify hero exists
@@ -71,6 +73,7 @@ def create_synergy(
     )
     db.add(db_synergy)
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     # Reload with relationships
     return db.query(Synergy).options(
@@ -97,6 +100,7 @@ def update_synergy(
     db_synergy.explanation = synergy.explanation
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     return db.query(Synergy).options(
         joinedload(Synergy.hero_1),
@@ -117,6 +121,7 @@ def delete_synergy(
     
     db.delete(db_synergy)
     db.commit()
+    refresh_knowledge_snapshot(db)
     return None
 
 
@@ -127,20 +132,25 @@ def create_synergies_bulk(
     admin: str = Depends(get_current_admin)
 ):
     """Create multiple synergy relationships at once (Admin only)"""
+    hero_ids = {synergy.hero_1_id for synergy in synergies} | {synergy.hero_2_id for synergy in synergies}
+    existing_pairs = set()
+    if hero_ids:
+        for hero_1_id, hero_2_id in db.query(Synergy.hero_1_id, Synergy.hero_2_id).filter(
+            Synergy.hero_1_id.in_(hero_ids),
+            Synergy.hero_2_id.in_(hero_ids)
+        ).all():
+            existing_pairs.add(frozenset((hero_1_id, hero_2_id)))
+
     created = []
-    
     for synergy in synergies:
         # Skip if same hero or relationship exists
         if synergy.hero_1_id == synergy.hero_2_id:
             continue
             
-        existing = db.query(Synergy).filter(
-            ((Synergy.hero_1_id == synergy.hero_1_id) & (Synergy.hero_2_id == synergy.hero_2_id)) |
-            ((Synergy.hero_1_id == synergy.hero_2_id) & (Synergy.hero_2_id == synergy.hero_1_id))
-        ).first()
-        
-        if existing:
+        pair = frozenset((synergy.hero_1_id, synergy.hero_2_id))
+        if pair in existing_pairs:
             continue
+        existing_pairs.add(pair)
         
         db_synergy = Synergy(
             hero_1_id=synergy.hero_1_id,
@@ -151,16 +161,15 @@ def create_synergies_bulk(
         db.add(db_synergy)
         created.append(db_synergy)
     
+    db.flush()
+    created_ids = [s.id for s in created]
     db.commit()
+    refresh_knowledge_snapshot(db)
+    if not created_ids:
+        return []
     
     # Reload with relationships
-    result = []
-    for s in created:
-        db.refresh(s)
-        loaded = db.query(Synergy).options(
-            joinedload(Synergy.hero_1),
-            joinedload(Synergy.hero_2)
-        ).filter(Synergy.id == s.id).first()
-        result.append(loaded)
-    
-    return result
+    return db.query(Synergy).options(
+        joinedload(Synergy.hero_1),
+        joinedload(Synergy.hero_2)
+    ).filter(Synergy.id.in_(created_ids)).order_by(Synergy.id).all()
@@ -5,11 +5,13 @@ from app.database import get_db
 from app.models import TierList, TierListEntry, Hero
 from app.schemas import TierListCreate, TierListUpdate, TierListResponse, TierListEntryCreate
 from app.auth import get_current_admin
+from app.query_stats import query_budget
+from app.knowledge import refresh_knowledge_snapshot
 
 router = APIRouter(prefix="/api/tier-lists", tags=["Tier Lists"])
 
 
-@router.get("", response_model=List[TierListResponse])
+@router.get("", response_model=List[TierListResponse], dependencies=[Depends(query_budget(1))])
 def get_tier_lists(
     active_only: bool = Query(True, description="Only return active tier lists"),
     db: Session = Depends(get_db)
@@ -26,7 +28,7 @@ def get_tier_lists(
     return tier_lists
 
 
-@router.get("/{lane}", response_model=TierListResponse)
+@router.get("/{lane}", response_model=TierListResponse, dependencies=[Depends(query_budget(1))])
 def get_tier_list_by_lane(lane: str, db: Session = Depends(get_db)):
     """Get active tier list for a specific lane (gold_lane, exp_lane, mid_lane, jungle, roamer)"""
     tier_list = db.query(TierList).options(
@@ -42,7 +44,7 @@ def get_tier_list_by_lane(lane: str, db: Session = Depends(get_db)):
     return tier_list
 
 
-@router.get("/id/{tier_list_id}", response_model=TierListResponse)
+@router.get("/id/{tier_list_id}", response_model=TierListResponse, dependencies=[Depends(query_budget(1))])
 def get_tier_list_by_id(tier_list_id: int, db: Session = Depends(get_db)):
     """Get tier list by ID"""
     tier_list = db.query(TierList).options(
@@ -93,6 +95,7 @@ def create_tier_list(
         db.add(db_entry)
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     # Reload with relationships
     return db.query(TierList).options(
@@ -147,6 +150,7 @@ def update_tier_list(
             db.add(db_entry)
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     # Reload with relationships
     return db.query(TierList).options(
@@ -167,6 +171,7 @@ def delete_tier_list(
     
     db.delete(db_tier_list)
     db.commit()
+    refresh_knowledge_snapshot(db)
     return None
 
 
@@ -203,6 +208,7 @@ def add_tier_list_entry(
         db.add(db_entry)
     
     db.commit()
+    refresh_knowledge_snapshot(db)
     
     # Reload with relationships
     return db.query(TierList).options(
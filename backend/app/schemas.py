@@ -204,6 +204,133 @@ class DraftSuggestionResponse(BaseModel):
     team_analysis: dict
 
 
+class DraftBanResponse(BaseModel):
+    ban_suggestions: List[HeroSuggestion]
+
+
+class DraftAnalyzeRequest(DraftSuggestionRequest):
+    simulate: bool = False  # Add a Monte Carlo spread of the win probability
+    trials: int = Field(2000, ge=100, le=20000)
+    seed: int = 0
+
+
+class DraftSuggestionBatchRequest(BaseModel):
+    states: List[DraftSuggestionRequest] = Field(..., max_length=1000)
+
+
+class DraftSuggestionBatchItem(BaseModel):
+    result: Optional[DraftSuggestionResponse] = None
+    error: Optional[str] = None
+
+
+class DraftSuggestionBatchResponse(BaseModel):
+    results: List[DraftSuggestionBatchItem]  # In request order
+    unique_states: int
+    cache_hits: int
+    elapsed_ms: float
+
+
+class DraftAnalyzeBatchRequest(BaseModel):
+    drafts: List[DraftAnalyzeRequest] = Field(..., max_length=1000)
+
+
+class DraftAnalyzeBatchItem(BaseModel):
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class DraftAnalyzeBatchResponse(BaseModel):
+    results: List[DraftAnalyzeBatchItem]  # In request order
+    unique_drafts: int
+    elapsed_ms: float
+
+
+class DraftLookaheadRequest(DraftSuggestionRequest):
+    top_n: int = Field(5, ge=1, le=20)
+    time_budget_ms: int = Field(300, ge=10, le=5000)
+    max_depth: Optional[int] = Field(None, ge=1, le=10)  # Picks to simulate, including this one
+
+
+class LookaheadSuggestion(BaseModel):
+    hero: HeroResponse
+    score: float  # Projected composition edge once the simulated picks are made
+    greedy_score: float
+
+
+class DraftLookaheadResponse(BaseModel):
+    suggestions: List[LookaheadSuggestion]
+    depth: int
+    max_depth: int
+    completed: bool
+    nodes: int
+    transposition_hits: int
+    elapsed_ms: float
+
+
+class DraftLineupRequest(DraftSuggestionRequest):
+    top_k: int = Field(5, ge=1, le=20)
+    beam_width: int = Field(48, ge=1, le=128)
+
+
+class LineupSuggestion(BaseModel):
+    heroes: List[HeroResponse]
+    score: float
+    analysis: dict
+
+
+class DraftLineupResponse(BaseModel):
+    lineups: List[LineupSuggestion]
+    scored: int  # Partial lineups scored during the search
+    elapsed_ms: float
+
+
+class DraftSessionCreate(DraftSuggestionRequest):
+    pass
+
+
+class DraftSessionAction(BaseModel):
+    action: Optional[str] = None  # ban or pick; leave out to only change current_team
+    hero_id: Optional[int] = None
+    team: Optional[str] = None  # Picking team, defaults to the session's current team
+    current_team: Optional[str] = None  # Team to suggest for once the action is applied
+
+
+class DraftSessionResponse(BaseModel):
+    session_id: str
+    bans: List[int]
+    blue_picks: List[int]
+    red_picks: List[int]
+    current_team: str
+    suggestions: DraftSuggestionResponse
+
+
+class DraftWhatIfRequest(DraftSuggestionRequest):
+    side: Optional[str] = None  # Defaults to current_team
+    top_n: int = Field(3, ge=1, le=10)
+
+
+class WhatIfAlternative(BaseModel):
+    hero: HeroResponse
+    team_score: float
+    score_delta: float
+    win_probability: float  # For the side, in percent
+    win_probability_delta: float
+
+
+class WhatIfSlot(BaseModel):
+    position: int
+    hero: HeroResponse
+    alternatives: List[WhatIfAlternative]
+
+
+class DraftWhatIfResponse(BaseModel):
+    side: str
+    team_score: float
+    win_probability: float
+    slots: List[WhatIfSlot]
+    elapsed_ms: float
+
+
 class DraftBase(BaseModel):
     blue_bans: Optional[str] = None
     red_bans: Optional[str] = None
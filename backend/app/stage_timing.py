@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class StageTimings:
+    """Wall time per named stage, summed over one request"""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}  # seconds
+        self.calls: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Server-Timing header value, stages in the order they first ran"""
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.durations.items()]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"ms": round(seconds * 1000, 3), "calls": self.calls[name]}
+            for name, seconds in self.durations.items()
+        }
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: StageTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> bool:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NO_STAGE = _NoStage()
+_current_timings: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+def start_timings() -> StageTimings:
+    """Collect stage timings for the request being served in this context"""
+    timings = StageTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def stage(name: str):
+    """Context manager timing one stage of the current request.
+
+    Outside a timed request this returns a shared no-op, so an untimed call
+    costs one context variable lookup. Stages are meant to be leaves: a
+    stage that contains another would count the inner time twice.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _NO_STAGE
+    return _Stage(timings, name)
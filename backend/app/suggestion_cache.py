@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+# (sorted distinct bans, blue picks, red picks, current team)
+DraftStateKey = Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...], str]
+# (knowledge snapshot version, rating table version)
+KnowledgeVersion = Tuple[int, int]
+
+
+def draft_state_key(
+    bans: Iterable[int],
+    blue_picks: Iterable[int],
+    red_picks: Iterable[int],
+    current_team: str,
+) -> DraftStateKey:
+    """Canonical key of a draft state.
+
+    Bans only remove heroes from the pool, so their order and duplicates are
+    dropped. Pick order is kept: skill pair rules are not symmetric, so team
+    analysis and reason order depend on which hero was picked first.
+    """
+    return tuple(sorted(set(bans))), tuple(blue_picks), tuple(red_picks), current_team
+
+
+class DraftStateCache(Generic[T]):
+    """Thread-safe LRU cache with a TTL, bounded by entry count and approximate size.
+
+    Every entry belongs to a knowledge version. A lookup or store with a
+    newer version drops everything cached for older versions, so admin writes
+    (which refresh the snapshot) and saved results (which move the ratings)
+    invalidate the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[T, int, float]]" = OrderedDict()
+        self._version: Optional[KnowledgeVersion] = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable, version: KnowledgeVersion) -> Optional[T]:
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, stored_at = entry
+            if self.ttl_seconds > 0 and self._clock() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, version: KnowledgeVersion, value: T, size: int) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._sync_version(version)
+            if version != self._version:
+                # Computed from a snapshot that has since been replaced
+                return
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock())
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _sync_version(self, version: KnowledgeVersion) -> None:
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+suggestion_cache: DraftStateCache = DraftStateCache(
+    max_entries=settings.SUGGESTION_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SUGGESTION_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SUGGESTION_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,353 @@
+"""Learned draft win probability.
+
+A logistic model over blue-minus-red draft features, fitted offline by
+``scripts/train_win_model.py`` from saved drafts with a winner and stored as
+a JSON artifact. Every feature is a difference of team sums, so at load time
+the weights fold into one weight per hero plus two pair tables, and a
+prediction is a masked dot product over hero slots.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ai_engine import DraftAI
+from app.config import settings
+from app.knowledge import KnowledgeSnapshot
+
+FORMAT_VERSION = 1
+ROLE_NAMES = tuple(DraftAI.IDEAL_ROLES)
+PAIR_FEATURES = ("synergy", "skill_synergy", "counter", "skill_counter")
+
+
+def parse_hero_ids(raw: Optional[str]) -> List[int]:
+    """Hero ids stored on a Draft column (a JSON array, or comma separated)"""
+    if not raw:
+        return []
+    try:
+        values = json.loads(raw)
+    except json.JSONDecodeError:
+        values = raw.split(",")
+    if not isinstance(values, list):
+        values = [values]
+
+    hero_ids = []
+    for value in values:
+        if isinstance(value, dict):
+            value = value.get("id")
+        try:
+            hero_ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return hero_ids
+
+
+def _slots(snapshot: KnowledgeSnapshot, hero_ids: Iterable[int]) -> np.ndarray:
+    return snapshot.slots_for(dict.fromkeys(hero_id for hero_id in hero_ids if hero_id in snapshot.hero_slots))
+
+
+def _role_vectors(snapshot: KnowledgeSnapshot) -> np.ndarray:
+    roles = np.zeros((len(snapshot.hero_ids), len(ROLE_NAMES)))
+    for slot, hero_id in enumerate(snapshot.hero_ids):
+        role = (snapshot.heroes[hero_id].role or "").lower()
+        if role in ROLE_NAMES:
+            roles[slot, ROLE_NAMES.index(role)] = 1.0
+    return roles
+
+
+def _trait_vectors(snapshot: KnowledgeSnapshot) -> np.ndarray:
+    return ((snapshot.trait_masks[:, None] >> np.arange(len(DraftAI.TRAIT_NAMES))) & 1).astype(np.float64)
+
+
+def _pair_tables(snapshot: KnowledgeSnapshot) -> Dict[str, np.ndarray]:
+    return {
+        "synergy": snapshot.synergy_matrix.astype(np.float64),
+        "skill_synergy": DraftAI.SKILL_SYNERGY_CODE_SCORES[snapshot.skill_synergy_codes],
+        "counter": snapshot.counter_matrix.astype(np.float64),
+        "skill_counter": DraftAI.SKILL_COUNTER_CODE_SCORES[snapshot.skill_counter_codes],
+    }
+
+
+class DraftFeaturizer:
+    """Builds training features for drafts against one snapshot.
+
+    Columns are the hero one-hot (+1 blue, -1 red), trait counts, role counts
+    and the four pair sums, each as blue minus red.
+    """
+
+    def __init__(self, snapshot: KnowledgeSnapshot):
+        self.snapshot = snapshot
+        self.traits = _trait_vectors(snapshot)
+        self.roles = _role_vectors(snapshot)
+        self.pairs = _pair_tables(snapshot)
+        self.width = len(snapshot.hero_ids) + len(DraftAI.TRAIT_NAMES) + len(ROLE_NAMES) + len(PAIR_FEATURES)
+
+    def features(self, blue_picks: Sequence[int], red_picks: Sequence[int]) -> np.ndarray:
+        blue = _slots(self.snapshot, blue_picks)
+        red = _slots(self.snapshot, red_picks)
+        hero_count = len(self.snapshot.hero_ids)
+
+        one_hot = np.zeros(hero_count)
+        one_hot[blue] += 1.0
+        one_hot[red] -= 1.0
+        pair_sums = [
+            self._within(self.pairs["synergy"], blue) - self._within(self.pairs["synergy"], red),
+            self._within(self.pairs["skill_synergy"], blue) - self._within(self.pairs["skill_synergy"], red),
+            self.pairs["counter"][np.ix_(blue, red)].sum() - self.pairs["counter"][np.ix_(red, blue)].sum(),
+            self.pairs["skill_counter"][np.ix_(blue, red)].sum() - self.pairs["skill_counter"][np.ix_(red, blue)].sum(),
+        ]
+        return np.concatenate([one_hot, one_hot @ self.traits, one_hot @ self.roles, pair_sums])
+
+    @staticmethod
+    def _within(table: np.ndarray, slots: np.ndarray) -> float:
+        """Sum over ordered pairs of distinct team members"""
+        block = table[np.ix_(slots, slots)]
+        return float(block.sum() - np.trace(block))
+
+
+def fit_logistic(
+    features: np.ndarray,
+    outcomes: np.ndarray,
+    l2: float = 1.0,
+    max_iter: int = 50,
+    tolerance: float = 1e-6,
+    chunk_size: int = 65536,
+) -> Tuple[float, np.ndarray]:
+    """L2-regularised logistic regression by Newton's method; returns (intercept, weights)"""
+    rows, width = features.shape
+    penalty = np.full(width + 1, l2)
+    penalty[0] = 0.0
+    params = np.zeros(width + 1)
+
+    for _ in range(max_iter):
+        gradient = penalty * params
+        hessian = np.diag(penalty + 1e-9)
+        for start in range(0, rows, chunk_size):
+            block = features[start:start + chunk_size].astype(np.float64)
+            block = np.hstack([np.ones((len(block), 1)), block])
+            probability = sigmoid(block @ params)
+            gradient += block.T @ (probability - outcomes[start:start + chunk_size])
+            hessian += (block.T * (probability * (1.0 - probability))) @ block
+        step = np.linalg.solve(hessian, gradient)
+        params -= step
+        if np.max(np.abs(step)) < tolerance:
+            break
+
+    return float(params[0]), params[1:]
+
+
+def sigmoid(values: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * values))
+
+
+@dataclass(frozen=True)
+class WinModel:
+    """Fitted coefficients, keyed by hero id and feature name so they outlive snapshots"""
+
+    version: str
+    trained_at: str
+    intercept: float
+    hero_weights: Dict[int, float]
+    trait_weights: Dict[str, float]
+    role_weights: Dict[str, float]
+    pair_weights: Dict[str, float]
+    metrics: Dict[str, Dict[str, float]]  # "holdout" and "train" evaluations
+
+    @classmethod
+    def from_fit(
+        cls,
+        snapshot: KnowledgeSnapshot,
+        intercept: float,
+        weights: np.ndarray,
+        metrics: Dict[str, Dict[str, float]],
+    ) -> "WinModel":
+        hero_count = len(snapshot.hero_ids)
+        trait_end = hero_count + len(DraftAI.TRAIT_NAMES)
+        role_end = trait_end + len(ROLE_NAMES)
+        trained_at = datetime.utcnow()
+        return cls(
+            version=trained_at.strftime("%Y%m%d%H%M%S"),
+            trained_at=trained_at.isoformat(),
+            intercept=intercept,
+            hero_weights=dict(zip(snapshot.hero_ids, weights[:hero_count].tolist())),
+            trait_weights=dict(zip(DraftAI.TRAIT_NAMES, weights[hero_count:trait_end].tolist())),
+            role_weights=dict(zip(ROLE_NAMES, weights[trait_end:role_end].tolist())),
+            pair_weights=dict(zip(PAIR_FEATURES, weights[role_end:].tolist())),
+            metrics=metrics,
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "format_version": FORMAT_VERSION,
+            "version": self.version,
+            "trained_at": self.trained_at,
+            "intercept": self.intercept,
+            "hero_weights": {str(hero_id): weight for hero_id, weight in self.hero_weights.items()},
+            "trait_weights": self.trait_weights,
+            "role_weights": self.role_weights,
+            "pair_weights": self.pair_weights,
+            "metrics": self.metrics,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> "WinModel":
+        if payload.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported win model format: {payload.get('format_version')}")
+        return cls(
+            version=str(payload["version"]),
+            trained_at=str(payload["trained_at"]),
+            intercept=float(payload["intercept"]),
+            hero_weights={int(hero_id): float(weight) for hero_id, weight in payload["hero_weights"].items()},
+            trait_weights={str(name): float(weight) for name, weight in payload["trait_weights"].items()},
+            role_weights={str(name): float(weight) for name, weight in payload["role_weights"].items()},
+            pair_weights={str(name): float(weight) for name, weight in payload["pair_weights"].items()},
+            metrics={
+                str(split): {str(name): float(value) for name, value in values.items()}
+                for split, values in payload.get("metrics", {}).items()
+            },
+        )
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+        os.replace(temp_path, path)
+
+    def compile(self, snapshot: KnowledgeSnapshot) -> "CompiledWinModel":
+        """Fold every feature weight into per-slot and per-pair tables for a snapshot"""
+        trait_weights = np.array([self.trait_weights.get(name, 0.0) for name in DraftAI.TRAIT_NAMES])
+        role_weights = np.array([self.role_weights.get(name, 0.0) for name in ROLE_NAMES])
+        slot_weights = (
+            np.array([self.hero_weights.get(hero_id, 0.0) for hero_id in snapshot.hero_ids]) +
+            _trait_vectors(snapshot) @ trait_weights +
+            _role_vectors(snapshot) @ role_weights
+        )
+        pairs = _pair_tables(snapshot)
+        within = self.pair_weights.get("synergy", 0.0) * pairs["synergy"] + self.pair_weights.get("skill_synergy", 0.0) * pairs["skill_synergy"]
+        np.fill_diagonal(within, 0.0)
+        versus = self.pair_weights.get("counter", 0.0) * pairs["counter"] + self.pair_weights.get("skill_counter", 0.0) * pairs["skill_counter"]
+        return CompiledWinModel(self, snapshot, slot_weights, within, versus)
+
+
+@dataclass(frozen=True)
+class CompiledWinModel:
+    model: WinModel
+    snapshot: KnowledgeSnapshot
+    slot_weights: np.ndarray
+    within: np.ndarray
+    versus: np.ndarray
+
+    def blue_win_probability(self, blue_picks: Sequence[int], red_picks: Sequence[int]) -> float:
+        blue = _slots(self.snapshot, blue_picks)
+        red = _slots(self.snapshot, red_picks)
+        logit = (
+            self.model.intercept +
+            self.slot_weights[blue].sum() - self.slot_weights[red].sum() +
+            self.within[np.ix_(blue, blue)].sum() - self.within[np.ix_(red, red)].sum() +
+            self.versus[np.ix_(blue, red)].sum() - self.versus[np.ix_(red, blue)].sum()
+        )
+        return float(sigmoid(np.float64(logit)))
+
+
+_model_lock = threading.Lock()
+_loaded_model: Optional[WinModel] = None
+_loaded_mtime: Optional[int] = None
+_model_loaded = False
+_compiled_model: Optional[CompiledWinModel] = None
+
+
+def load_win_model(path: Optional[str] = None) -> Optional[WinModel]:
+    """Read the model artifact, or None when no model has been trained"""
+    path = path or settings.WIN_MODEL_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return WinModel.from_dict(json.load(handle))
+
+
+def _artifact_mtime() -> Optional[int]:
+    try:
+        return os.stat(settings.WIN_MODEL_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_win_model(snapshot: KnowledgeSnapshot) -> Optional[CompiledWinModel]:
+    """The artifact compiled against the given snapshot.
+
+    Each call stats the artifact, and a changed modification time reloads
+    it, so every worker picks up a newly trained model (which the trainer
+    writes with an atomic rename) or a removed one without a restart.
+    """
+    global _loaded_model, _loaded_mtime, _model_loaded, _compiled_model
+
+    mtime = _artifact_mtime()
+    compiled = _compiled_model
+    if compiled is not None and compiled.snapshot is snapshot and mtime == _loaded_mtime:
+        return compiled
+
+    with _model_lock:
+        if not _model_loaded or mtime != _loaded_mtime:
+            _loaded_model = load_win_model() if mtime is not None else None
+            _loaded_mtime = mtime
+            _model_loaded = True
+            _compiled_model = None
+        if _loaded_model is None:
+            return None
+        if _compiled_model is None or _compiled_model.snapshot is not snapshot:
+            _compiled_model = _loaded_model.compile(snapshot)
+        return _compiled_model
+
+
+def draft_win_probability(
+    snapshot: KnowledgeSnapshot,
+    blue_picks: Sequence[int],
+    red_picks: Sequence[int],
+    blue_analysis: Dict,
+    red_analysis: Dict,
+) -> float:
+    """Blue win probability in percent: the trained model when one has been published, else the simplified estimate"""
+    model = get_win_model(snapshot)
+    if model is not None:
+        return round(model.blue_win_probability(blue_picks, red_picks) * 100, 1)
+    return estimate_blue_win_probability(blue_analysis, red_analysis)
+
+
+def estimate_blue_win_probability(blue_analysis: dict, red_analysis: dict) -> float:
+    """Simplified win probability from tier averages, synergies and role balance"""
+    blue_score = 0
+    red_score = 0
+    
+    # Factor in tier averages
+    tier_scores = {"S": 5, "A": 4, "B": 3, "C": 2, "D": 1}
+    blue_tier = tier_scores.get(blue_analysis.get("average_tier", "C"), 2)
+    red_tier = tier_scores.get(red_analysis.get("average_tier", "C"), 2)
+    blue_score += blue_tier * 10
+    red_score += red_tier * 10
+    
+    # Factor in synergies
+    blue_score += blue_analysis.get("synergy_count", 0) * 5
+    red_score += red_analysis.get("synergy_count", 0) * 5
+    
+    # Factor in role balance
+    blue_roles = blue_analysis.get("roles", {})
+    red_roles = red_analysis.get("roles", {})
+    
+    for role in ["tank", "marksman", "mage"]:
+        if blue_roles.get(role, 0) >= 1:
+            blue_score += 3
+        if red_roles.get(role, 0) >= 1:
+            red_score += 3
+    
+    total = blue_score + red_score
+    return round((blue_score / total) * 100, 1) if total > 0 else 50
+
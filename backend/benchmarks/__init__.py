@@ -0,0 +1 @@
+"""Benchmarks for the draft engine and API; run with ``python -m benchmarks.run``."""
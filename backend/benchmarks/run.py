@@ -0,0 +1,319 @@
+"""Benchmarks for the draft engine and the draft API hot paths.
+
+    python -m benchmarks.run                   # default sizes, diffed against benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline   # record a new baseline
+    python -m benchmarks.run --sizes 130:0.05 --only score_heroes,api_suggest
+
+Each size (hero count and counter/synergy density) runs in its own process
+against a fresh SQLite database, so the knowledge snapshot and caches start
+cold. Every case reports ops/sec, p50/p95/p99 latency and the SQL
+statements it issued per op. The report is compared with the stored
+baseline: a p50 slower by more than --threshold, or more SQL per op, is
+flagged as a regression. The comparison is refused when the baseline was
+recorded with a different seed or state count, or when a size's generated
+row counts differ (as after a change to scripts/generate_dataset.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+DEFAULT_SIZES = "60:0.02,130:0.05,300:0.1"
+STATE_COUNT = 64
+
+
+@dataclass
+class Case:
+    name: str
+    op: Callable[[int], object]
+    before: Optional[Callable[[], None]] = None  # Untimed, before every op
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the draft engine and API.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated HEROES:DENSITY pairs.")
+    parser.add_argument("--only", help="Comma separated case names to run.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds of timed work per case.")
+    parser.add_argument("--min-ops", type=int, default=20, help="Fewest timed ops per case.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dataset and draft states.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with or save to.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative p50 slowdown counted as a regression.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression.")
+    parser.add_argument("--output", help="Also write the full results JSON here.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def random_states(hero_ids: List[int], count: int, seed: int) -> List[Dict[str, object]]:
+    """Seeded draft states from empty to nearly full"""
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        picked = rng.sample(hero_ids, 16)
+        bans = picked[:rng.randint(0, 6)]
+        rest = picked[len(bans):]
+        blue_count = rng.randint(0, 4)
+        red_count = rng.randint(max(0, blue_count - 1), min(4, blue_count + 1))
+        states.append({
+            "bans": bans,
+            "blue_picks": rest[:blue_count],
+            "red_picks": rest[blue_count:blue_count + red_count],
+            "current_team": "blue" if blue_count <= red_count else "red",
+        })
+    return states
+
+
+def build_cases(seed: int) -> List[Case]:
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.ai_engine import DraftAI
+    from app.database import SessionLocal
+    from app.hero_features import parse_skills
+    from app.hero_ratings import get_rating_table
+    from app.knowledge import build_knowledge_snapshot, get_knowledge_snapshot
+    from app.suggestion_cache import suggestion_cache
+
+    client = TestClient(main.app)
+    snapshot = get_knowledge_snapshot()
+    ai = DraftAI(snapshot, get_rating_table(snapshot))
+    heroes = [snapshot.heroes[hero_id] for hero_id in snapshot.hero_ids]
+    states = random_states(list(snapshot.hero_ids), STATE_COUNT, seed)
+    teams = [state["blue_picks"] + state["red_picks"][:5 - len(state["blue_picks"])] for state in states]
+    enemies = [state["red_picks"] for state in states]
+
+    def build_snapshot(index: int) -> object:
+        db = SessionLocal()
+        try:
+            return build_knowledge_snapshot(db)
+        finally:
+            db.close()
+
+    def post(path: str, payload: Dict[str, object]) -> object:
+        response = client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+        return response
+
+    def state(index: int) -> Dict[str, object]:
+        return states[index % len(states)]
+
+    return [
+        Case("snapshot_build", build_snapshot),
+        # Cold derives traits from the skills JSON, as on a snapshot rebuild; warm reads the snapshot
+        Case("hero_traits_cold", lambda index: DraftAI.derive_hero_traits(
+            heroes[index % len(heroes)], parse_skills(heroes[index % len(heroes)].skills)
+        )),
+        Case("hero_traits_warm", lambda index: ai.get_hero_traits(heroes[index % len(heroes)])),
+        Case("score_heroes", lambda index: ai._score_heroes(
+            state(index)["bans"], state(index)["blue_picks"], state(index)["red_picks"], state(index)["current_team"]
+        )),
+        Case("analyze_team", lambda index: ai.analyze_team(teams[index % len(teams)])),
+        Case("get_team_standouts", lambda index: ai.get_team_standouts(
+            teams[index % len(teams)], enemies[index % len(enemies)]
+        )),
+        Case("api_suggest", lambda index: post("/api/draft/suggest", state(index)), before=suggestion_cache.clear),
+        Case("api_suggest_cached", lambda index: post("/api/draft/suggest", states[index % 8])),
+        Case("api_analyze", lambda index: post("/api/draft/analyze", {
+            "blue_picks": state(index)["blue_picks"], "red_picks": state(index)["red_picks"],
+        })),
+    ]
+
+
+def measure(case: Case, statements: List[int], min_time: float, min_ops: int, warmup: int = 3) -> Dict[str, float]:
+    import numpy as np
+
+    for index in range(warmup):
+        if case.before:
+            case.before()
+        case.op(index)
+
+    timings: List[int] = []
+    sql = 0
+    elapsed = 0
+    while len(timings) < min_ops or elapsed < min_time * 1e9:
+        if case.before:
+            case.before()
+        before = statements[0]
+        started = time.perf_counter_ns()
+        case.op(len(timings))
+        duration = time.perf_counter_ns() - started
+        sql += statements[0] - before
+        timings.append(duration)
+        elapsed += duration
+
+    p50, p95, p99 = (np.percentile(np.array(timings), [50, 95, 99]) / 1e6).tolist()
+    return {
+        "ops": len(timings),
+        "ops_per_sec": round(len(timings) / (elapsed / 1e9), 1),
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(p95, 4),
+        "p99_ms": round(p99, 4),
+        "sql_per_op": round(sql / len(timings), 2),
+    }
+
+
+def run_child(size: str, args: argparse.Namespace) -> Dict[str, object]:
+    """Build the dataset for one size in this process's database and run every case"""
+    from sqlalchemy import event
+
+    from app.database import Base, engine
+    from scripts.generate_dataset import generate_knowledge
+
+    heroes, density = parse_size(size)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        dataset = generate_knowledge(connection, heroes, density, args.seed)
+
+    statements = [0]
+
+    def count_statement(*_) -> None:
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    only = set(args.only.split(",")) if args.only else None
+    cases = {}
+    for case in build_cases(args.seed):
+        if only is None or case.name in only:
+            cases[case.name] = measure(case, statements, args.min_time, args.min_ops)
+    return {"dataset": dataset, "cases": cases}
+
+
+def parse_size(size: str) -> tuple:
+    heroes, density = size.split(":")
+    return int(heroes), float(density)
+
+
+def run_size(size: str, args: argparse.Namespace, workdir: str) -> Dict[str, object]:
+    heroes, density = parse_size(size)
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, f'bench_{heroes}_{density}.db')}",
+        WIN_MODEL_PATH=os.path.join(workdir, "missing_win_model.json"),
+        # The periodic ratings version check would make SQL per op depend on timing
+        RATINGS_CHECK_SECONDS="3600",
+    )
+    command = [
+        sys.executable, "-m", "benchmarks.run", "--child", size,
+        "--min-time", str(args.min_time), "--min-ops", str(args.min_ops), "--seed", str(args.seed),
+    ]
+    if args.only:
+        command += ["--only", args.only]
+    completed = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark size {size} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_results(results: Dict[str, object]) -> None:
+    for size, result in results["sizes"].items():
+        dataset = result["dataset"]
+        print(f"\n{size}: {dataset['heroes']} heroes, {dataset['counters']} counters, "
+              f"{dataset['synergies']} synergies, {dataset['tier_entries']} tier entries")
+        print(f"  {'case':<20} {'ops/sec':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'sql/op':>7}")
+        for name, case in result["cases"].items():
+            print(f"  {name:<20} {case['ops_per_sec']:>10.1f} {case['p50_ms']:>9.3f} "
+                  f"{case['p95_ms']:>9.3f} {case['p99_ms']:>9.3f} {case['sql_per_op']:>7.2f}")
+
+
+def dataset_mismatches(results: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """Why the baseline's numbers were measured on different data, if they were"""
+    mismatches = []
+    if baseline.get("dataset") != results["dataset"]:
+        mismatches.append(f"parameters {baseline.get('dataset')} -> {results['dataset']}")
+    for size, result in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is not None and base["dataset"] != result["dataset"]:
+            mismatches.append(f"{size} rows {base['dataset']} -> {result['dataset']}")
+    return mismatches
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    """Print a diff against the baseline and return the regressions found"""
+    regressions = []
+    print("\nCompared with baseline:")
+    for size, result in results["sizes"].items():
+        base_cases = baseline.get("sizes", {}).get(size, {}).get("cases", {})
+        for name, case in result["cases"].items():
+            base = base_cases.get(name)
+            if base is None:
+                print(f"  {size} {name:<20} new")
+                continue
+            change = case["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+            flags = []
+            if change > threshold:
+                flags.append("SLOWER")
+            if case["sql_per_op"] > base["sql_per_op"]:
+                flags.append("MORE SQL")
+            line = (f"  {size} {name:<20} p50 {base['p50_ms']:.3f} -> {case['p50_ms']:.3f} ms ({change:+.1%}), "
+                    f"sql/op {base['sql_per_op']:.2f} -> {case['sql_per_op']:.2f}")
+            if flags:
+                line += "  " + ", ".join(flags)
+                regressions.append(f"{size} {name}")
+            print(line)
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        return 0
+
+    results: Dict[str, object] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "dataset": {"generator": "scripts.generate_dataset", "seed": args.seed, "states": STATE_COUNT},
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="mldraft-bench-") as workdir:
+        for size in args.sizes.split(","):
+            print(f"Running {size}...", flush=True)
+            results["sizes"][size] = run_size(size, args, workdir)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print(f"\nWrote baseline to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    mismatches = dataset_mismatches(results, baseline)
+    if mismatches:
+        print(f"\nBaseline {args.baseline} was recorded on a different dataset; not comparing:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        print("Run with the baseline's --seed, or record a new baseline with --save-baseline.")
+        return 1
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1 if args.fail_on_regression else 0
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(parse_args()))
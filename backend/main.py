@@ -1,8 +1,19 @@
-from fastapi import FastAPI
+import json
+import logging
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from sqlalchemy import inspect, text
 from app.config import settings
 from app.database import engine, Base
+from app.hero_ratings import get_rating_table
+from app.draft_sessions import draft_sessions
+from app.knowledge import get_knowledge_snapshot
+from app.metrics import CONTENT_TYPE, instrument_pool, metrics, stats_collector, track_heroes_scored
+from app.query_stats import STATS_HEADER, check_budget, instrument_engine, start_request
+from app.stage_timing import start_timings
+from app.suggestion_cache import suggestion_cache
 from app.routes import (
     heroes_router,
     tier_lists_router,
@@ -45,6 +56,9 @@ def ensure_hero_columns() -> None:
     required_columns = {
         "global_rg_win_rate": "FLOAT",
         "global_rg_source": "TEXT",
+        "trait_mask": "INTEGER",
+        "lane_preferences": "TEXT",
+        "feature_version": "INTEGER",
     }
 
     with engine.begin() as connection:
@@ -72,8 +86,79 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[STATS_HEADER, "Server-Timing"],
 )
 
+if settings.SQL_STATS_ENABLED:
+    instrument_engine(engine, settings.SQL_SLOW_QUERY_MS)
+
+    @app.middleware("http")
+    async def count_sql_statements(request: Request, call_next):
+        stats = start_request(f"{request.method} {request.url.path}")
+        response = await call_next(request)
+        response.headers[STATS_HEADER] = stats.header_value()
+        check_budget(stats, settings.SQL_STRICT_BUDGETS)
+        return response
+
+if settings.STAGE_TIMING_ENABLED:
+    timing_logger = logging.getLogger("app.stage_timing")
+
+    @app.middleware("http")
+    async def time_scoring_stages(request: Request, call_next):
+        timings = start_timings()
+        started = time.perf_counter()
+        response = await call_next(request)
+        total = time.perf_counter() - started
+        response.headers["Server-Timing"] = timings.server_timing(total)
+        timing_logger.info(json.dumps({
+            "event": "stage_timings",
+            "route": f"{request.method} {request.url.path}",
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 3),
+            "stages": timings.to_dict(),
+        }))
+        return response
+
+if settings.METRICS_ENABLED:
+    instrument_pool(engine)
+    stats_collector(
+        "mldraft_suggestion_cache", suggestion_cache.stats, "the suggestion cache",
+        counters=("hits", "misses", "evictions", "expirations", "invalidations"),
+        gauges=("entries", "bytes", "hit_ratio"),
+    )
+    stats_collector(
+        "mldraft_draft_sessions", draft_sessions.stats, "the draft session store",
+        counters=("created", "evictions", "expirations"),
+        gauges=("sessions", "bytes"),
+    )
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        method = (("method", request.method),)
+        heroes_scored = track_heroes_scored()
+        metrics.inc("mldraft_http_requests_in_flight", method)
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.inc("mldraft_http_requests_in_flight", method, -1)
+            # Label by route template so path parameters do not blow up the series count
+            route = request.scope.get("route")
+            labels = method + (("route", route.path if route is not None else "unmatched"),)
+            metrics.inc("mldraft_http_requests_total", labels + (("status", str(status_code)),))
+            metrics.observe("mldraft_http_request_duration_seconds", elapsed, labels)
+            if heroes_scored[0]:
+                metrics.observe("mldraft_heroes_scored_per_request", heroes_scored[0], labels)
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        """Prometheus text-format metrics of this worker process"""
+        return Response(metrics.render(), headers={"Content-Type": CONTENT_TYPE})
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(heroes_router)
@@ -83,6 +168,12 @@ app.include_router(synergies_router)
 app.include_router(draft_router)
 
 
+@app.on_event("startup")
+def load_knowledge_snapshot():
+    """Build the draft knowledge snapshot and rating table before serving requests"""
+    get_rating_table(get_knowledge_snapshot())
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -0,0 +1,364 @@
+"""Replay saved drafts through the suggestion engine and report how it did.
+
+Every pick of every saved draft is replayed in ranked pick order
+(1-2-2-2-2-1) with all bans applied up front. For each pick the picking
+side's pool is scored as ``/api/draft/suggest`` would, and the rank of the
+hero actually picked gives hit-rate@K. Drafts with a winner are also scored
+with the ``/api/draft/analyze`` win probability for Brier score, log loss
+and calibration. Drafts are streamed from the database in chunks and
+replayed in a process pool.
+
+The hero ratings and the trained win model were both fitted on saved
+drafts, so scoring those same drafts with them leaks the outcomes into the
+report. They are left out unless ``--with-ratings`` or ``--with-win-model``
+asks for them, and the report states which were used.
+
+Pass ``--blue``/``--red``/``--bans`` instead to print the suggestions and
+win probability of a single draft state.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import inspect
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai_engine import DraftAI
+from app.database import SessionLocal, engine
+from app.draft_search import PICK_ORDER, TEAM_SIZE
+from app.hero_ratings import load_rating_table
+from app.knowledge import build_knowledge_snapshot
+from app.models import Draft, HeroRating, RatingsVersion
+from app.win_model import draft_win_probability, estimate_blue_win_probability, load_win_model, parse_hero_ids
+
+CALIBRATION_BINS = 10
+
+# (blue_bans, red_bans, blue_picks, red_picks, winner) as stored
+DraftRow = Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+_worker_ai: Optional[DraftAI] = None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay saved drafts through the suggestion engine.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes to use.")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Drafts sent to a worker at a time.")
+    parser.add_argument("--limit", type=int, help="Only replay the N most recent drafts.")
+    parser.add_argument("--k", default="1,3,5,10", help="Comma separated K values for hit-rate@K.")
+    parser.add_argument(
+        "--with-ratings",
+        action="store_true",
+        help="Score with the hero ratings; they were learned from saved drafts, so replayed results are in-sample.",
+    )
+    parser.add_argument(
+        "--with-win-model",
+        action="store_true",
+        help="Use the trained win model instead of the built-in estimate; it was fitted on saved drafts too.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--bans", help="Single state mode: comma separated banned hero ids.")
+    parser.add_argument("--blue", help="Single state mode: comma separated blue picks, in pick order.")
+    parser.add_argument("--red", help="Single state mode: comma separated red picks, in pick order.")
+    parser.add_argument("--team", choices=("blue", "red"), help="Single state mode: side to suggest for.")
+    parser.add_argument("--top", type=int, default=5, help="Single state mode: suggestions to print.")
+    return parser.parse_args()
+
+
+def resolve_mode(args: argparse.Namespace) -> Dict[str, bool]:
+    """Whether scoring uses the ratings and the win model: only when asked for and available"""
+    # Databases the API has not started against yet have no rating tables
+    tables = (HeroRating.__tablename__, RatingsVersion.__tablename__)
+    return {
+        "ratings": args.with_ratings and all(inspect(engine).has_table(table) for table in tables),
+        "win_model": args.with_win_model and load_win_model() is not None,
+    }
+
+
+def describe_mode(mode: Dict[str, bool]) -> str:
+    text = (f"Mode: ratings {'on' if mode['ratings'] else 'off'}, "
+            f"win model {'on' if mode['win_model'] else 'off (built-in estimate)'}")
+    if mode["ratings"] or mode["win_model"]:
+        text += "; fitted on saved drafts, so results on those drafts are optimistic"
+    return text + "."
+
+
+def load_ai(with_ratings: bool) -> DraftAI:
+    db = SessionLocal()
+    try:
+        snapshot = build_knowledge_snapshot(db)
+        ratings = load_rating_table(db, snapshot) if with_ratings else None
+    finally:
+        db.close()
+    return DraftAI(snapshot, ratings)
+
+
+def win_probability(ai: DraftAI, blue_picks: List[int], red_picks: List[int], with_win_model: bool) -> float:
+    """Blue win probability in percent, from the trained model or the built-in estimate"""
+    blue_analysis, red_analysis = ai.analyze_teams([blue_picks, red_picks])
+    if with_win_model:
+        return draft_win_probability(ai.snapshot, blue_picks, red_picks, blue_analysis, red_analysis)
+    return estimate_blue_win_probability(blue_analysis, red_analysis)
+
+
+def init_worker(with_ratings: bool) -> None:
+    global _worker_ai
+    _worker_ai = load_ai(with_ratings)
+
+
+def pick_steps(blue_picks: List[int], red_picks: List[int]) -> Iterator[Tuple[List[int], List[int], str, int]]:
+    """(blue so far, red so far, picking side, hero picked) in ranked pick order"""
+    picks = {"blue": blue_picks[:TEAM_SIZE], "red": red_picks[:TEAM_SIZE]}
+    taken = {"blue": 0, "red": 0}
+    for side in PICK_ORDER:
+        if taken[side] >= len(picks[side]):
+            side = "red" if side == "blue" else "blue"
+            if taken[side] >= len(picks[side]):
+                break
+        yield picks["blue"][:taken["blue"]], picks["red"][:taken["red"]], side, picks[side][taken[side]]
+        taken[side] += 1
+
+
+def pick_rank(ai: DraftAI, bans: List[int], blue_picks: List[int], red_picks: List[int], side: str, hero_id: int) -> Optional[int]:
+    """Zero-based place of the hero among the side's overall suggestions, ties in pool order"""
+    pool = ai._score_heroes(bans, blue_picks, red_picks, side)
+    position = next((index for index, hero in enumerate(pool.heroes) if hero.id == hero_id), None)
+    if position is None:
+        return None
+    score = pool.overall[position]
+    return sum(1 for index, value in enumerate(pool.overall) if value > score or (value == score and index < position))
+
+
+def evaluate_chunk(rows: List[DraftRow], max_k: int, with_win_model: bool) -> Dict[str, object]:
+    """Rank histogram and win predictions for one chunk of drafts"""
+    ai = _worker_ai
+    ranks = [0] * max_k
+    states = 0
+    skipped = 0
+    reciprocal_ranks = 0.0
+    predictions: List[Tuple[float, int]] = []
+
+    for blue_bans, red_bans, blue_raw, red_raw, winner in rows:
+        bans = parse_hero_ids(blue_bans) + parse_hero_ids(red_bans)
+        blue_picks = parse_hero_ids(blue_raw)
+        red_picks = parse_hero_ids(red_raw)
+        for blue_so_far, red_so_far, side, hero_id in pick_steps(blue_picks, red_picks):
+            rank = pick_rank(ai, bans, blue_so_far, red_so_far, side, hero_id)
+            if rank is None:
+                skipped += 1
+                continue
+            states += 1
+            reciprocal_ranks += 1.0 / (rank + 1)
+            if rank < max_k:
+                ranks[rank] += 1
+
+        if winner in ("blue", "red") and blue_picks and red_picks:
+            probability = win_probability(ai, blue_picks, red_picks, with_win_model) / 100
+            predictions.append((probability, 1 if winner == "blue" else 0))
+
+    return {
+        "drafts": len(rows),
+        "states": states,
+        "skipped": skipped,
+        "ranks": ranks,
+        "reciprocal_ranks": reciprocal_ranks,
+        "predictions": predictions,
+    }
+
+
+def stream_chunks(limit: Optional[int], chunk_size: int) -> Iterator[List[DraftRow]]:
+    db = SessionLocal()
+    try:
+        query = db.query(Draft.blue_bans, Draft.red_bans, Draft.blue_picks, Draft.red_picks, Draft.winner).order_by(
+            Draft.id.desc()
+        )
+        if limit:
+            query = query.limit(limit)
+        chunk: List[DraftRow] = []
+        for row in query.yield_per(chunk_size):
+            chunk.append(tuple(row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
+
+
+def replay(args: argparse.Namespace, k_values: List[int], mode: Dict[str, bool]) -> Dict[str, object]:
+    max_k = max(k_values)
+    totals = {"drafts": 0, "states": 0, "skipped": 0, "ranks": [0] * max_k, "reciprocal_ranks": 0.0, "predictions": []}
+
+    def merge(result: Dict[str, object]) -> None:
+        for key in ("drafts", "states", "skipped", "reciprocal_ranks"):
+            totals[key] += result[key]
+        totals["ranks"] = [total + count for total, count in zip(totals["ranks"], result["ranks"])]
+        totals["predictions"].extend(result["predictions"])
+
+    started = time.perf_counter()
+    chunks = stream_chunks(args.limit, args.chunk_size)
+    if args.workers > 1:
+        # Keep a couple of chunks per worker in flight so drafts are never all in memory at once
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(mode["ratings"],)) as pool:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(evaluate_chunk, chunk, max_k, mode["win_model"]))
+                if len(pending) >= args.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(future.result())
+            for future in pending:
+                merge(future.result())
+    else:
+        init_worker(mode["ratings"])
+        for chunk in chunks:
+            merge(evaluate_chunk(chunk, max_k, mode["win_model"]))
+    elapsed = time.perf_counter() - started
+
+    return build_report(totals, k_values, elapsed, mode)
+
+
+def build_report(totals: Dict[str, object], k_values: List[int], elapsed: float, mode: Dict[str, bool]) -> Dict[str, object]:
+    states = totals["states"]
+    hits = 0
+    hit_rates = {}
+    cumulative = []
+    for count in totals["ranks"]:
+        hits += count
+        cumulative.append(hits)
+    for k in k_values:
+        hit_rates[f"@{k}"] = round(cumulative[k - 1] / states, 4) if states else None
+
+    report: Dict[str, object] = {
+        "mode": mode,
+        "drafts": totals["drafts"],
+        "states": states,
+        "skipped_picks": totals["skipped"],
+        "hit_rate": hit_rates,
+        "mean_reciprocal_rank": round(totals["reciprocal_ranks"] / states, 4) if states else None,
+        "elapsed_s": round(elapsed, 2),
+        "states_per_sec": round(states / elapsed, 1) if elapsed > 0 else None,
+    }
+
+    predictions = totals["predictions"]
+    report["win_probability"] = {"drafts": len(predictions)}
+    if predictions:
+        brier = sum((probability - outcome) ** 2 for probability, outcome in predictions) / len(predictions)
+        log_loss = -sum(
+            math.log(min(max(probability if outcome else 1 - probability, 1e-9), 1.0))
+            for probability, outcome in predictions
+        ) / len(predictions)
+        accuracy = sum((probability >= 0.5) == (outcome == 1) for probability, outcome in predictions) / len(predictions)
+
+        bins: List[List[Tuple[float, int]]] = [[] for _ in range(CALIBRATION_BINS)]
+        for probability, outcome in predictions:
+            bins[min(int(probability * CALIBRATION_BINS), CALIBRATION_BINS - 1)].append((probability, outcome))
+        calibration = [
+            {
+                "range": [index / CALIBRATION_BINS, (index + 1) / CALIBRATION_BINS],
+                "drafts": len(items),
+                "predicted": round(sum(probability for probability, _ in items) / len(items), 4),
+                "observed": round(sum(outcome for _, outcome in items) / len(items), 4),
+            }
+            for index, items in enumerate(bins)
+            if items
+        ]
+        report["win_probability"].update({
+            "brier": round(brier, 4),
+            "log_loss": round(log_loss, 4),
+            "accuracy": round(accuracy, 4),
+            "calibration": calibration,
+        })
+    return report
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(describe_mode(report["mode"]))
+    print(f"Replayed {report['states']} pick(s) from {report['drafts']} draft(s) in {report['elapsed_s']}s "
+          f"({report['states_per_sec']} states/sec); {report['skipped_picks']} pick(s) skipped.")
+    if report["states"]:
+        rates = ", ".join(f"hit{k}={rate:.1%}" for k, rate in report["hit_rate"].items())
+        print(f"Suggestions: {rates}, MRR={report['mean_reciprocal_rank']:.3f}")
+
+    outcome = report["win_probability"]
+    if not outcome["drafts"]:
+        print("No drafts with a winner to score the win probability against.")
+        return
+    print(f"Win probability over {outcome['drafts']} draft(s): Brier={outcome['brier']:.4f}, "
+          f"log loss={outcome['log_loss']:.4f}, accuracy={outcome['accuracy']:.1%}")
+    print("  predicted      drafts  mean    observed")
+    for row in outcome["calibration"]:
+        low, high = row["range"]
+        print(f"  {low:.1f}-{high:.1f}  {row['drafts']:>10}  {row['predicted']:.3f}   {row['observed']:.3f}")
+
+
+def evaluate_state(args: argparse.Namespace, mode: Dict[str, bool]) -> Dict[str, object]:
+    ai = load_ai(mode["ratings"])
+    bans = parse_hero_ids(args.bans)
+    blue_picks = parse_hero_ids(args.blue)
+    red_picks = parse_hero_ids(args.red)
+    team = args.team or ("blue" if len(blue_picks) <= len(red_picks) else "red")
+
+    suggestions = ai.get_suggestions(bans, blue_picks, red_picks, team, top_n=args.top)
+    return {
+        "mode": mode,
+        "current_team": team,
+        "suggestions": [
+            {
+                "hero_id": suggestion["hero"].id,
+                "name": suggestion["hero"].name,
+                "score": suggestion["score"],
+                "tier": suggestion.get("tier"),
+                "lane_fit": suggestion.get("lane_fit"),
+                "reasons": suggestion.get("reasons", []),
+            }
+            for suggestion in suggestions
+        ],
+        "blue_win_probability": win_probability(ai, blue_picks, red_picks, mode["win_model"]),
+    }
+
+
+def print_state(result: Dict[str, object]) -> None:
+    print(describe_mode(result["mode"]))
+    print(f"Suggestions for {result['current_team']}:")
+    for index, suggestion in enumerate(result["suggestions"], 1):
+        print(f"  {index}. {suggestion['name']} (#{suggestion['hero_id']}) {suggestion['score']:.2f} "
+              f"tier {suggestion['tier']}, {suggestion['lane_fit'] or 'any lane'}")
+        for reason in suggestion["reasons"]:
+            print(f"       - {reason}")
+    print(f"Blue win probability: {result['blue_win_probability']}%")
+
+
+def main(args: argparse.Namespace) -> int:
+    mode = resolve_mode(args)
+    if args.bans or args.blue or args.red or args.team:
+        result = evaluate_state(args, mode)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_state(result)
+        return 0
+
+    k_values = sorted({int(value) for value in args.k.split(",") if value.strip()})
+    if not k_values or k_values[0] < 1:
+        print("--k needs positive integers.")
+        return 1
+    report = replay(args, k_values, mode)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(parse_args()))
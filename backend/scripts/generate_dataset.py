@@ -0,0 +1,326 @@
+"""Generate a seeded synthetic dataset for scale testing.
+
+Writes heroes (with skills JSON in the scripts/import_hero_skills.py payload
+format and precomputed features), an active tier list for each of the five
+lanes, counters and synergies at a chosen density, and any number of saved
+drafts spread over a span of years. The same arguments and seed always
+produce the same rows.
+
+Relationships and drafts are drawn with NumPy in batches and written with
+Core bulk inserts, so millions of rows go in without building ORM objects.
+Each hero has a hidden strength that decides draft winners, which gives the
+win model, ratings and replay evaluator a signal to find.
+
+    python scripts/generate_dataset.py --reset --heroes 2000 --density 0.05 --drafts 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.engine import Connection
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai_engine import DraftAI
+from app.database import Base, engine
+from app.hero_features import compute_hero_features
+from app.models import Counter, Draft, Hero, Synergy, TierList, TierListEntry
+
+ROLES = ("tank", "fighter", "assassin", "mage", "marksman", "support")
+SPECIALTIES = tuple(phrase.title() for phrase in DraftAI.SPECIALTY_TRAITS)
+SKILL_PHRASES = tuple(sorted({
+    keyword for keywords in DraftAI.TRAIT_KEYWORDS.values() for keyword in keywords
+} | set(DraftAI.TEXT_HINTS)))
+FILLER = ("deals damage", "for 2 seconds", "to the target", "after a short delay", "gains a stack", "in a line")
+ABILITY_LABELS = ("Buff", "CC", "Burst", "Heal", "Mobility", "AoE", "Damage", "Debuff")
+ABILITY_SLOTS = (("passive", "Passive"), ("skill_1", "Skill 1"), ("skill_2", "Skill 2"), ("ultimate", "Ultimate"))
+NAME_SYLLABLES = ("ka", "ra", "lo", "mi", "zu", "an", "el", "tor", "vyn", "sha", "gar", "en", "dra", "lu", "ix", "bel")
+TIER_WEIGHTS = {"S": 1, "A": 2, "B": 3, "C": 2, "D": 1}
+COUNTER_STRENGTHS = tuple(DraftAI.COUNTER_BONUS)
+SYNERGY_STRENGTHS = tuple(DraftAI.SYNERGY_BONUS)
+PICKS_PER_TEAM = 5
+# Log-odds of a blue win per point of hidden strength difference, plus a small blue side edge
+STRENGTH_LOGIT = 0.35
+BLUE_SIDE_LOGIT = 0.05
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic dataset.")
+    parser.add_argument("--heroes", type=int, default=130, help="Heroes to create.")
+    parser.add_argument("--density", type=float, default=0.05, help="Share of hero pairs with a counter.")
+    parser.add_argument("--synergy-density", type=float, help="Share of hero pairs with a synergy (default: --density).")
+    parser.add_argument("--drafts", type=int, default=10000, help="Saved drafts to create.")
+    parser.add_argument("--bans-per-team", type=int, default=5, help="Bans recorded for each side of a draft.")
+    parser.add_argument("--unfinished", type=float, default=0.05, help="Share of drafts saved without a winner.")
+    parser.add_argument("--years", type=float, default=3.0, help="Years of history the drafts are spread over.")
+    parser.add_argument("--end-date", default="2025-01-01", help="Date of the newest draft (YYYY-MM-DD).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for every random draw.")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per bulk insert.")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first.")
+    return parser.parse_args()
+
+
+def hero_name(rng: random.Random, hero_id: int) -> str:
+    syllables = "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{syllables.capitalize()} {hero_id}"
+
+
+def skills_payload(rng: random.Random, name: str) -> Dict[str, object]:
+    """Skills JSON in the shape scripts/import_hero_skills.py stores"""
+    abilities = []
+    for slot, section in ABILITY_SLOTS:
+        words = rng.sample(SKILL_PHRASES, rng.randint(1, 3)) + rng.sample(FILLER, 2)
+        rng.shuffle(words)
+        abilities.append({
+            "slot": slot,
+            "section": section,
+            "name": f"{name.split()[0]} {section}",
+            "labels": rng.sample(ABILITY_LABELS, rng.randint(1, 2)),
+            "description": " ".join(words).capitalize() + ".",
+        })
+    return {
+        "hero": name,
+        "source": "synthetic",
+        "page_title": name,
+        "source_url": None,
+        "imported_at": "2024-01-01T00:00:00+00:00",
+        "abilities": abilities,
+    }
+
+
+def hero_rows(rng: random.Random, count: int) -> List[Dict[str, object]]:
+    rows = []
+    for hero_id in range(1, count + 1):
+        role = ROLES[(hero_id - 1) % len(ROLES)]
+        secondary_role = rng.choice([other for other in ROLES if other != role]) if rng.random() < 0.2 else None
+        name = hero_name(rng, hero_id)
+        row = {
+            "id": hero_id,
+            "name": name,
+            "role": role,
+            "secondary_role": secondary_role,
+            "specialty": "/".join(rng.sample(SPECIALTIES, 2)),
+            "description": None,
+            "skills": json.dumps(skills_payload(rng, name)),
+            "global_rg_win_rate": round(rng.uniform(44.0, 58.0), 2) if rng.random() < 0.7 else None,
+            "global_rg_source": "synthetic",
+        }
+        row.update(compute_hero_features(SimpleNamespace(**row)))
+        rows.append(row)
+    return rows
+
+
+def tier_rows(rng: random.Random, heroes: List[Dict[str, object]]) -> tuple:
+    """An active tier list per lane, ranking every hero that plays it and a few that do not"""
+    tier_lists = []
+    entries = []
+    tiers, weights = zip(*TIER_WEIGHTS.items())
+    for tier_list_id, (lane_name, lane) in enumerate(DraftAI.TIER_LIST_LANE_MAP.items(), 1):
+        tier_lists.append({"id": tier_list_id, "lane": lane, "version": "Synthetic", "is_active": True})
+        for hero in heroes:
+            if lane_name in json.loads(hero["lane_preferences"]) or rng.random() < 0.1:
+                entries.append({"tier_list_id": tier_list_id, "hero_id": hero["id"], "tier": rng.choices(tiers, weights)[0]})
+    return tier_lists, entries
+
+
+def relationship_batches(
+    generator: np.random.Generator,
+    hero_ids: np.ndarray,
+    density: float,
+    symmetric: bool,
+    batch_size: int,
+) -> Iterator[tuple]:
+    """(first ids, second ids, strength codes) for random hero pairs, a block of rows at a time"""
+    count = len(hero_ids)
+    rows_per_block = max(1, batch_size // max(1, int(count * density)) if density > 0 else count)
+    for start in range(0, count, rows_per_block):
+        stop = min(count, start + rows_per_block)
+        chosen = generator.random((stop - start, count)) < density
+        rows, columns = np.nonzero(chosen)
+        rows += start
+        keep = columns > rows if symmetric else columns != rows
+        rows, columns = rows[keep], columns[keep]
+        yield hero_ids[rows], hero_ids[columns], generator.integers(0, 3, len(rows))
+
+
+def insert_batches(connection: Connection, table, rows: List[Dict[str, object]], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        connection.execute(insert(table), rows[start:start + batch_size])
+
+
+def generate_knowledge(
+    connection: Connection,
+    heroes: int,
+    density: float,
+    seed: int = 0,
+    synergy_density: float | None = None,
+    batch_size: int = 20000,
+) -> Dict[str, int]:
+    """Write heroes, tier lists, counters and synergies into empty tables"""
+    rng = random.Random(seed)
+    generator = np.random.default_rng(seed)
+    rows = hero_rows(rng, heroes)
+    insert_batches(connection, Hero, rows, batch_size)
+    tier_lists, entries = tier_rows(rng, rows)
+    insert_batches(connection, TierList, tier_lists, batch_size)
+    insert_batches(connection, TierListEntry, entries, batch_size)
+
+    hero_ids = np.array([row["id"] for row in rows])
+    counts = {"heroes": len(rows), "tier_entries": len(entries), "counters": 0, "synergies": 0}
+    for table, name, relation_density, symmetric, strengths, columns in (
+        (Counter, "counters", density, False, COUNTER_STRENGTHS, ("hero_id", "countered_by_id")),
+        (Synergy, "synergies", density if synergy_density is None else synergy_density, True, SYNERGY_STRENGTHS, ("hero_1_id", "hero_2_id")),
+    ):
+        for first, second, codes in relationship_batches(generator, hero_ids, relation_density, symmetric, batch_size):
+            if len(first):
+                connection.execute(insert(table), [
+                    {columns[0]: first_id, columns[1]: second_id, "strength": strengths[code]}
+                    for first_id, second_id, code in zip(first.tolist(), second.tolist(), codes.tolist())
+                ])
+                counts[name] += len(first)
+    return counts
+
+
+def generate_drafts(
+    connection: Connection,
+    hero_ids: List[int],
+    drafts: int,
+    seed: int = 0,
+    bans_per_team: int = 5,
+    unfinished: float = 0.05,
+    years: float = 3.0,
+    end_date: datetime = datetime(2025, 1, 1),
+    batch_size: int = 20000,
+) -> Dict[str, int]:
+    """Write saved drafts with popularity-weighted picks and winners decided by hidden hero strength"""
+    heroes_per_draft = 2 * (bans_per_team + PICKS_PER_TEAM)
+    if len(hero_ids) < heroes_per_draft:
+        raise ValueError(f"Need at least {heroes_per_draft} heroes for {bans_per_team} bans per team")
+
+    generator = np.random.default_rng([seed, 1])
+    ids = np.array(hero_ids)
+    strength = generator.normal(0.0, 1.0, len(ids))
+    popularity = generator.permutation(1.0 / np.arange(1, len(ids) + 1) ** 0.8)
+    popularity /= popularity.sum()
+
+    span = timedelta(days=365.25 * years)
+    start = end_date - span
+    step = span / max(drafts, 1)
+    counts = {"drafts": 0, "blue_wins": 0, "unfinished": 0}
+
+    # json.dumps output for a list of ints, without its per-call overhead
+    bans_format = "[" + ", ".join(["%d"] * bans_per_team) + "]" if bans_per_team else "[]"
+    picks_format = "[" + ", ".join(["%d"] * PICKS_PER_TEAM) + "]"
+
+    for offset in range(0, drafts, batch_size):
+        size = min(batch_size, drafts - offset)
+        chosen = distinct_draws(generator, popularity, size, heroes_per_draft)
+        bans = ids[chosen[:, :2 * bans_per_team]].tolist()
+        blue = chosen[:, 2 * bans_per_team:2 * bans_per_team + PICKS_PER_TEAM]
+        red = chosen[:, 2 * bans_per_team + PICKS_PER_TEAM:]
+        logits = STRENGTH_LOGIT * (strength[blue].sum(axis=1) - strength[red].sum(axis=1)) + BLUE_SIDE_LOGIT
+        blue_wins = generator.random(size) < 1.0 / (1.0 + np.exp(-logits))
+        finished = generator.random(size) >= unfinished
+        winners = np.where(finished, np.where(blue_wins, "blue", "red"), None).tolist()
+        blue_ids, red_ids = ids[blue].tolist(), ids[red].tolist()
+
+        rows = [
+            {
+                "blue_bans": bans_format % tuple(bans[row][:bans_per_team]),
+                "red_bans": bans_format % tuple(bans[row][bans_per_team:]),
+                "blue_picks": picks_format % tuple(blue_ids[row]),
+                "red_picks": picks_format % tuple(red_ids[row]),
+                "winner": winners[row],
+                "created_at": start + step * (offset + row),
+            }
+            for row in range(size)
+        ]
+        counts["blue_wins"] += int((finished & blue_wins).sum())
+        counts["unfinished"] += int((~finished).sum())
+        connection.execute(insert(Draft), rows)
+        counts["drafts"] += size
+    return counts
+
+
+def distinct_draws(generator: np.random.Generator, popularity: np.ndarray, size: int, count: int) -> np.ndarray:
+    """Row-wise popularity-weighted draws of count distinct hero indexes, in draw order"""
+    draws = generator.choice(len(popularity), size=(size, count * 2), p=popularity)
+    order = np.argsort(draws, axis=1, kind="stable")
+    ordered = np.take_along_axis(draws, order, axis=1)
+    repeated = np.zeros_like(draws, dtype=bool)
+    np.put_along_axis(repeated, order[:, 1:], ordered[:, 1:] == ordered[:, :-1], axis=1)
+    # A stable sort on the repeat flag keeps first occurrences in their original order
+    chosen = np.take_along_axis(draws, np.argsort(repeated, axis=1, kind="stable")[:, :count], axis=1)
+    for row in np.flatnonzero((~repeated).sum(axis=1) < count):
+        chosen[row] = generator.choice(len(popularity), size=count, replace=False, p=popularity)
+    return chosen
+
+
+def enable_fast_sqlite_writes() -> None:
+    """Trade crash safety for speed while generating; the data can always be regenerated"""
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        cursor.close()
+
+
+def generate(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    if engine.dialect.name == "sqlite":
+        enable_fast_sqlite_writes()
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count()).select_from(Hero)).scalar_one()
+        if existing:
+            print(f"Database already has {existing} heroes; pass --reset to replace everything.")
+            return 1
+
+        knowledge = generate_knowledge(
+            connection, args.heroes, args.density, args.seed, args.synergy_density, args.batch_size
+        )
+        print(f"Wrote {knowledge['heroes']} heroes, {knowledge['tier_entries']} tier entries, "
+              f"{knowledge['counters']} counters and {knowledge['synergies']} synergies "
+              f"in {time.perf_counter() - started:.2f}s.")
+
+        if args.drafts:
+            drafts_started = time.perf_counter()
+            drafts = generate_drafts(
+                connection,
+                list(range(1, args.heroes + 1)),
+                args.drafts,
+                seed=args.seed,
+                bans_per_team=args.bans_per_team,
+                unfinished=args.unfinished,
+                years=args.years,
+                end_date=datetime.strptime(args.end_date, "%Y-%m-%d"),
+                batch_size=args.batch_size,
+            )
+            elapsed = time.perf_counter() - drafts_started
+            finished = drafts["drafts"] - drafts["unfinished"]
+            blue_rate = drafts["blue_wins"] / finished if finished else math.nan
+            print(f"Wrote {drafts['drafts']} drafts ({blue_rate:.1%} blue wins, {drafts['unfinished']} unfinished) "
+                  f"in {elapsed:.2f}s ({drafts['drafts'] / elapsed:,.0f} drafts/sec).")
+
+    print(f"Done in {time.perf_counter() - started:.2f}s. Restart the API (or touch the knowledge data) to load it.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(generate(parse_args()))
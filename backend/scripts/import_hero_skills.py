@@ -23,6 +23,7 @@ from sqlalchemy import select
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
+from app.hero_features import apply_hero_features
 from app.models import Hero
 
 
@@ -329,7 +330,9 @@ def import_skills(args: argparse.Namespace) -> int:
                         print(f"  page={page_title} abilities={len(abilities)}")
 
                     if not args.dry_run:
-                        persisted_heroes[hero.name].skills = json.dumps(payload, ensure_ascii=False)
+                        persisted_hero = persisted_heroes[hero.name]
+                        persisted_hero.skills = json.dumps(payload, ensure_ascii=False)
+                        apply_hero_features(persisted_hero)
                     updated += 1
                 except Exception as error:  # noqa: BLE001
                     failed.append(f"{hero.name}: {error}")
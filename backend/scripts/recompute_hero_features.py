@@ -0,0 +1,84 @@
+"""Recompute the derived feature columns of every hero.
+
+Run this after changing trait derivation (and bumping FEATURE_VERSION) or
+after editing hero rows outside the API. Features are computed in a process
+pool and written back with a single bulk update.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+
+from sqlalchemy import select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.hero_features import FEATURE_VERSION, compute_hero_features
+from app.models import Hero
+
+
+SOURCE_COLUMNS = (
+    Hero.id,
+    Hero.name,
+    Hero.role,
+    Hero.secondary_role,
+    Hero.specialty,
+    Hero.description,
+    Hero.skills,
+    Hero.feature_version,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute derived hero features.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes to use.")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Heroes sent to a worker at a time.")
+    parser.add_argument("--only-stale", action="store_true", help=f"Skip heroes already at feature version {FEATURE_VERSION}.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute features without writing to the database.")
+    return parser.parse_args()
+
+
+def compute_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {"id": row["id"], **compute_hero_features(SimpleNamespace(**row))}
+
+
+def recompute_features(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rows = [dict(row._mapping) for row in db.execute(select(*SOURCE_COLUMNS).order_by(Hero.id))]
+        if args.only_stale:
+            rows = [row for row in rows if row["feature_version"] != FEATURE_VERSION]
+        if not rows:
+            print("No heroes need feature updates.")
+            return 0
+
+        if args.workers > 1 and len(rows) > args.chunk_size:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                updates = list(pool.map(compute_row, rows, chunksize=args.chunk_size))
+        else:
+            updates = [compute_row(row) for row in rows]
+
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.bulk_update_mappings(Hero, updates)
+            db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    action = "Computed" if args.dry_run else "Updated"
+    print(f"{action} features for {len(updates)} hero(es) in {elapsed:.2f}s (version {FEATURE_VERSION}).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(recompute_features(parse_args()))
@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, engine, Base
+from app.hero_features import apply_hero_features
 from app.models import Hero, TierList, TierListEntry, Counter, Synergy
 
 # Create tables
@@ -268,10 +269,14 @@ def seed_database():
             print("Seeding heroes...")
             for hero_data in HEROES_DATA:
                 hero = Hero(**hero_data)
+                apply_hero_features(hero)
                 db.add(hero)
             db.commit()
             print(f"Added {len(HEROES_DATA)} heroes")
         
+        # Resolve every hero name below from one query instead of a lookup per name
+        heroes_by_name = {hero.name: hero for hero in db.query(Hero).all()}
+        
         # Create tier lists
         existing_tier_lists = db.query(TierList).count()
         if existing_tier_lists > 0:
@@ -289,7 +294,7 @@ def seed_database():
                 
                 for tier, hero_names in tiers.items():
                     for hero_name in hero_names:
-                        hero = db.query(Hero).filter(Hero.name == hero_name).first()
+                        hero = heroes_by_name.get(hero_name)
                         if hero:
                             entry = TierListEntry(
                                 tier_list_id=tier_list.id,
@@ -308,8 +313,8 @@ def seed_database():
             print("Seeding counters...")
             counter_count = 0
             for counter_data in COUNTERS_DATA:
-                hero = db.query(Hero).filter(Hero.name == counter_data["hero"]).first()
-                counter_hero = db.query(Hero).filter(Hero.name == counter_data["countered_by"]).first()
+                hero = heroes_by_name.get(counter_data["hero"])
+                counter_hero = heroes_by_name.get(counter_data["countered_by"])
                 if hero and counter_hero:
                     counter = Counter(
                         hero_id=hero.id,
@@ -330,8 +335,8 @@ def seed_database():
             print("Seeding synergies...")
             synergy_count = 0
             for synergy_data in SYNERGIES_DATA:
-                hero1 = db.query(Hero).filter(Hero.name == synergy_data["hero_1"]).first()
-                hero2 = db.query(Hero).filter(Hero.name == synergy_data["hero_2"]).first()
+                hero1 = heroes_by_name.get(synergy_data["hero_1"])
+                hero2 = heroes_by_name.get(synergy_data["hero_2"])
                 if hero1 and hero2:
                     synergy = Synergy(
                         hero_1_id=hero1.id,
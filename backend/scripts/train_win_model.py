@@ -0,0 +1,119 @@
+"""Fit the draft win-probability model from saved drafts with a winner.
+
+Features are built against the current knowledge snapshot (traits, roles,
+counter and synergy tables), the model is fitted with NumPy only, and the
+coefficients are written to WIN_MODEL_PATH for the API to load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.knowledge import build_knowledge_snapshot
+from app.models import Draft
+from app.win_model import DraftFeaturizer, WinModel, fit_logistic, parse_hero_ids, sigmoid
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the draft win-probability model.")
+    parser.add_argument("--output", default=settings.WIN_MODEL_PATH, help="Where to write the model artifact.")
+    parser.add_argument("--l2", type=float, default=1.0, help="L2 penalty on every weight except the intercept.")
+    parser.add_argument("--max-iter", type=int, default=50, help="Maximum Newton iterations.")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of drafts held out to report metrics.")
+    parser.add_argument("--limit", type=int, help="Only use the N most recent drafts.")
+    parser.add_argument("--min-drafts", type=int, default=50, help="Refuse to train on fewer drafts.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the holdout split.")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Drafts fetched from the database per round trip.")
+    parser.add_argument("--dry-run", action="store_true", help="Fit and report metrics without writing the artifact.")
+    return parser.parse_args()
+
+
+def evaluate(
+    intercept: float,
+    weights: np.ndarray,
+    features: np.ndarray,
+    outcomes: np.ndarray,
+    chunk_size: int = 65536,
+) -> dict:
+    logits = np.concatenate([
+        intercept + features[start:start + chunk_size].astype(np.float64) @ weights
+        for start in range(0, len(features), chunk_size)
+    ])
+    probability = np.clip(sigmoid(logits), 1e-9, 1 - 1e-9)
+    return {
+        "log_loss": round(float(-np.mean(outcomes * np.log(probability) + (1 - outcomes) * np.log(1 - probability))), 4),
+        "brier": round(float(np.mean((probability - outcomes) ** 2)), 4),
+        "accuracy": round(float(np.mean((probability >= 0.5) == (outcomes == 1))), 4),
+        "samples": int(len(outcomes)),
+    }
+
+
+def train(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        snapshot = build_knowledge_snapshot(db)
+        query = db.query(Draft.blue_picks, Draft.red_picks, Draft.winner).filter(
+            Draft.winner.in_(["blue", "red"])
+        ).order_by(Draft.id.desc())
+        if args.limit:
+            query = query.limit(args.limit)
+        total = query.count()
+        if total < args.min_drafts:
+            print(f"Only {total} draft(s) with a winner; need at least {args.min_drafts}.")
+            return 1
+
+        # Rows are written straight into their holdout-shuffled position, so
+        # the train and test splits below are slices rather than copies
+        holdout = 0 < args.holdout < 1
+        positions = (
+            np.argsort(np.random.default_rng(args.seed).permutation(total)) if holdout else np.arange(total)
+        )
+        featurizer = DraftFeaturizer(snapshot)
+        features = np.empty((total, featurizer.width), dtype=np.float32)
+        outcomes = np.empty(total)
+        loaded = 0
+        for blue_picks, red_picks, winner in query.limit(total).yield_per(args.batch_size):
+            position = positions[loaded]
+            features[position] = featurizer.features(parse_hero_ids(blue_picks), parse_hero_ids(red_picks))
+            outcomes[position] = 1.0 if winner == "blue" else 0.0
+            loaded += 1
+    finally:
+        db.close()
+
+    if loaded < total:
+        print(f"Only {loaded} of {total} drafts could be read; drafts were deleted while loading, run again.")
+        return 1
+    print(f"Built {features.shape[1]} features for {total} drafts in {time.perf_counter() - started:.2f}s.")
+
+    metrics = {}
+    if holdout:
+        split = int(total * (1 - args.holdout))
+        intercept, weights = fit_logistic(features[:split], outcomes[:split], args.l2, args.max_iter)
+        metrics["holdout"] = evaluate(intercept, weights, features[split:], outcomes[split:])
+        print(f"Holdout: {metrics['holdout']}")
+
+    intercept, weights = fit_logistic(features, outcomes, args.l2, args.max_iter)
+    metrics["train"] = evaluate(intercept, weights, features, outcomes)
+    model = WinModel.from_fit(snapshot, intercept, weights, metrics)
+
+    if args.dry_run:
+        print(f"Dry run: model {model.version} not written.")
+    else:
+        model.save(args.output)
+        print(f"Wrote model {model.version} to {args.output}.")
+    print(f"Done in {time.perf_counter() - started:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(train(parse_args()))